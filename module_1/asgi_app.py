@@ -0,0 +1,96 @@
+"""
+ASGI version of the greet API in flask_app.
+
+``app`` serves /api/greet/<name> and /api/cache/greet with the same status
+codes, JSON bodies, ETags and 304 handling as the Flask views, sharing their
+response cache. Requests are handled on the event loop rather than a worker
+thread, so an idle keep-alive connection or a slow client costs a socket and
+a coroutine instead of a thread. Run it under any ASGI server, or the stdlib
+one in asgi_server.py:
+
+    python asgi_server.py --app asgi_app:app --port 8001
+
+/metrics is only served by the Flask app.
+"""
+
+from werkzeug.exceptions import MethodNotAllowed, NotFound
+from werkzeug.http import parse_etags, quote_etag
+
+from flask_app import app as flask_app
+from flask_app import cached_greeting, greet_cache
+
+GREET_PREFIX = "/api/greet/"
+CACHE_STATS_PATH = "/api/cache/greet"
+ALLOWED_METHODS = ("GET", "HEAD", "OPTIONS")
+_JSON_TYPE = flask_app.json.mimetype.encode()
+_HTML_TYPE = b"text/html; charset=utf-8"
+_ALLOW = ", ".join(ALLOWED_METHODS).encode()
+# The same error pages Flask renders
+_NOT_FOUND = NotFound().get_body().encode()
+_METHOD_NOT_ALLOWED = MethodNotAllowed().get_body().encode()
+
+
+async def _respond(send, status, body=b"", headers=(), head=False):
+    """Send a complete response; HEAD responses keep the length but no body."""
+    await send(
+        {
+            "type": "http.response.start",
+            "status": status,
+            "headers": [(b"content-length", b"%d" % len(body)), *headers],
+        }
+    )
+    await send({"type": "http.response.body", "body": b"" if head else body})
+
+
+async def _lifespan(receive, send):
+    """Acknowledge lifespan events; the app has nothing to set up."""
+    while True:
+        message = await receive()
+        if message["type"] == "lifespan.startup":
+            await send({"type": "lifespan.startup.complete"})
+        elif message["type"] == "lifespan.shutdown":
+            await send({"type": "lifespan.shutdown.complete"})
+            return
+
+
+async def app(scope, receive, send):
+    """ASGI entry point."""
+    if scope["type"] == "lifespan":
+        await _lifespan(receive, send)
+        return
+    if scope["type"] != "http":
+        raise ValueError(f"Unsupported ASGI scope type: {scope['type']}")
+
+    path = scope["path"]
+    name = path[len(GREET_PREFIX) :] if path.startswith(GREET_PREFIX) else None
+    if not (name and "/" not in name) and path != CACHE_STATS_PATH:
+        await _respond(send, 404, _NOT_FOUND, [(b"content-type", _HTML_TYPE)])
+        return
+
+    method = scope["method"]
+    if method not in ALLOWED_METHODS:
+        headers = [(b"content-type", _HTML_TYPE), (b"allow", _ALLOW)]
+        await _respond(send, 405, _METHOD_NOT_ALLOWED, headers)
+        return
+    if method == "OPTIONS":
+        await _respond(send, 200, headers=[(b"allow", _ALLOW)])
+        return
+
+    head = method == "HEAD"
+    if name is None:
+        body = f"{flask_app.json.dumps(greet_cache.stats())}\n".encode()
+        await _respond(send, 200, body, [(b"content-type", _JSON_TYPE)], head)
+        return
+
+    body, etag = cached_greeting(name)
+    etag_header = (b"etag", quote_etag(etag).encode())
+    for header, value in scope["headers"]:
+        if header == b"if-none-match":
+            if parse_etags(value.decode("latin-1")).contains_weak(etag):
+                start = {"type": "http.response.start", "status": 304}
+                await send({**start, "headers": [etag_header]})
+                await send({"type": "http.response.body", "body": b""})
+                return
+            break
+    headers = [(b"content-type", _JSON_TYPE), etag_header]
+    await _respond(send, 200, body, headers, head)
@@ -0,0 +1,253 @@
+"""
+Minimal asyncio HTTP/1.1 server for ASGI apps, using only the standard library.
+
+Meant for tests and local benchmarks of asgi_app where no ASGI server such as
+uvicorn is installed. It handles keep-alive connections, Content-Length and
+chunked request bodies, and streamed responses, but not TLS, HTTP/2,
+websockets or lifespan events.
+
+Usage:
+    python asgi_server.py --port 8001
+    python asgi_server.py --app asgi_app:app --port 0 --keep-alive 5
+"""
+
+import argparse
+import asyncio
+import signal
+import sys
+import traceback
+from http import HTTPStatus
+from urllib.parse import unquote
+
+from serve import load_app
+
+# Largest request line plus headers; beyond it the client gets a 431
+MAX_HEADER_BYTES = 65536
+
+
+class BadRequest(Exception):
+    """The request cannot be parsed; the connection is answered with a 400."""
+
+
+def _status_only(status):
+    """Return an empty ``status`` response that closes the connection."""
+    return (
+        f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+        "Content-Length: 0\r\nConnection: close\r\n\r\n"
+    ).encode()
+
+
+class ASGIServer:
+    """
+    Serve an ASGI app over HTTP/1.1 on an asyncio event loop.
+
+    ``close`` stops accepting, closes idle connections and waits for requests
+    in progress to finish. Connections stay open for ``keep_alive`` idle
+    seconds between requests.
+    """
+
+    def __init__(self, app, host="127.0.0.1", port=0, keep_alive=5.0):
+        self.app = app
+        self.host = host
+        self.port = port
+        self.keep_alive = keep_alive
+        self._server = None
+        self._closing = False
+        self._connections = {}  # task -> writer, or None while a request runs
+
+    async def start(self):
+        """Start listening; ``port`` 0 is replaced by the port picked."""
+        self._server = await asyncio.start_server(
+            self._serve_connection, self.host, self.port, limit=MAX_HEADER_BYTES
+        )
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def close(self):
+        """Stop accepting and wait for open requests to finish."""
+        self._closing = True
+        self._server.close()
+        await self._server.wait_closed()
+        for writer in self._connections.values():
+            if writer is not None:
+                writer.close()
+        await asyncio.gather(*self._connections, return_exceptions=True)
+
+    async def _serve_connection(self, reader, writer):
+        task = asyncio.current_task()
+        self._connections[task] = writer
+        try:
+            while not self._closing and await self._serve_request(reader, writer, task):
+                self._connections[task] = writer
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            del self._connections[task]
+            writer.close()
+
+    async def _read_head(self, reader):
+        """Return (method, target, version, headers), or None at end of stream."""
+        try:
+            head = await asyncio.wait_for(
+                reader.readuntil(b"\r\n\r\n"), self.keep_alive
+            )
+        except (asyncio.TimeoutError, asyncio.IncompleteReadError):
+            return None
+        lines = head[:-4].decode("latin-1").split("\r\n")
+        try:
+            method, target, version = lines[0].split(" ")
+        except ValueError:
+            raise BadRequest(lines[0]) from None
+        headers = []
+        for line in lines[1:]:
+            name, sep, value = line.partition(":")
+            if not sep:
+                raise BadRequest(line)
+            name = name.strip().lower().encode("latin-1")
+            headers.append((name, value.strip().encode("latin-1")))
+        return method, target, version, headers
+
+    @staticmethod
+    async def _read_body(reader, fields):
+        if b"chunked" in fields.get(b"transfer-encoding", b"").lower():
+            chunks = []
+            while True:
+                size_line = await reader.readuntil(b"\r\n")
+                try:
+                    size = int(size_line.split(b";")[0], 16)
+                except ValueError:
+                    raise BadRequest(size_line) from None
+                if not size:
+                    while await reader.readuntil(b"\r\n") != b"\r\n":  # trailers
+                        pass
+                    return b"".join(chunks)
+                chunks.append(await reader.readexactly(size))
+                await reader.readexactly(2)
+        try:
+            length = int(fields.get(b"content-length", 0))
+        except ValueError:
+            raise BadRequest("Content-Length") from None
+        return await reader.readexactly(length) if length > 0 else b""
+
+    async def _serve_request(self, reader, writer, task):
+        """Serve one request; return whether the connection stays open."""
+        try:
+            head = await self._read_head(reader)
+            if head is None:
+                return False
+            self._connections[task] = None  # busy: close() must not cut it off
+            method, target, version, headers = head
+            fields = dict(headers)
+            body = await self._read_body(reader, fields)
+        except asyncio.LimitOverrunError:
+            writer.write(_status_only(HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE))
+            return False
+        except BadRequest:
+            writer.write(_status_only(HTTPStatus.BAD_REQUEST))
+            return False
+
+        keep_alive = (
+            version == "HTTP/1.1"
+            and fields.get(b"connection", b"").lower() != b"close"
+            and not self._closing
+        )
+        path, _, query = target.partition("?")
+        peer = writer.get_extra_info("peername")
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0", "spec_version": "2.3"},
+            "http_version": version[5:],
+            "method": method,
+            "scheme": "http",
+            "path": unquote(path),
+            "raw_path": path.encode("latin-1"),
+            "query_string": query.encode("latin-1"),
+            "root_path": "",
+            "headers": headers,
+            "client": peer[:2] if peer else None,
+            "server": (self.host, self.port),
+        }
+
+        received = False
+        disconnected = asyncio.get_running_loop().create_future()
+        state = {"started": False, "chunked": False, "bodyless": False, "done": False}
+
+        async def receive():
+            nonlocal received
+            if not received:
+                received = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            await disconnected
+            return {"type": "http.disconnect"}
+
+        async def send(message):
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                response_headers = list(message.get("headers", ()))
+                names = {name.lower() for name, _ in response_headers}
+                state["bodyless"] = (
+                    status in (204, 304) or status < 200 or method == "HEAD"
+                )
+                if not state["bodyless"] and b"content-length" not in names:
+                    state["chunked"] = True
+                    response_headers.append((b"transfer-encoding", b"chunked"))
+                if not keep_alive:
+                    response_headers.append((b"connection", b"close"))
+                try:
+                    reason = HTTPStatus(status).phrase.encode()
+                except ValueError:
+                    reason = b""
+                lines = [b"HTTP/1.1 %d %s\r\n" % (status, reason)]
+                lines += [b"%s: %s\r\n" % header for header in response_headers]
+                lines.append(b"\r\n")
+                state["head"] = b"".join(lines)
+                state["started"] = True
+            elif message["type"] == "http.response.body":
+                chunk = b"" if state["bodyless"] else message.get("body", b"")
+                more = message.get("more_body", False)
+                if state["chunked"]:
+                    chunk = b"%x\r\n%s\r\n" % (len(chunk), chunk) if chunk else b""
+                    if not more:
+                        chunk += b"0\r\n\r\n"
+                writer.write(state.pop("head", b"") + chunk)
+                await writer.drain()
+                state["done"] = not more
+
+        try:
+            await self.app(scope, receive, send)
+        except Exception:
+            traceback.print_exc()
+            if not state["started"]:
+                writer.write(_status_only(HTTPStatus.INTERNAL_SERVER_ERROR))
+            return False
+        finally:
+            disconnected.set_result(None)
+        return keep_alive and state["done"]
+
+
+async def run(app, host="127.0.0.1", port=8001, keep_alive=5.0):
+    """Serve ``app`` until SIGTERM or SIGINT, then close gracefully."""
+    server = ASGIServer(app, host, port, keep_alive)
+    await server.start()
+    print(f"Listening on http://{server.host}:{server.port}", flush=True)
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(signum, stop.set)
+    await stop.wait()
+    await server.close()
+
+
+def main(argv=None):
+    """Command-line entry point; returns the process exit code."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--app", default="asgi_app:app", help="module:attribute")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument("--keep-alive", type=float, default=5.0, help="idle seconds")
+    args = parser.parse_args(argv)
+    asyncio.run(run(load_app(args.app), args.host, args.port, args.keep_alive))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,234 @@
+"""
+Reusable benchmark harness with JSON results and regression checks.
+
+Benchmarks are registered by suite modules (such as prime_benchmarks.py) with
+the ``register`` decorator. Each one is a factory that takes an input size,
+does its setup, and returns the zero-argument callable to time.
+
+Usage:
+    python benchmark.py run prime_benchmarks -o results.json
+    python benchmark.py run prime_benchmarks --only naive --sizes 1000 10000
+    python benchmark.py compare baseline.json results.json --threshold 0.10
+    python benchmark.py profile prime_benchmarks naive --size 10000
+"""
+
+import argparse
+import cProfile
+import importlib
+import json
+import math
+import platform
+import pstats
+import statistics
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from pstats import SortKey
+
+# name -> (factory, default sizes), filled in by suite modules on import
+BENCHMARKS = {}
+
+
+def register(name, sizes=(1_000, 10_000, 100_000)):
+    """Register ``factory(size) -> callable`` as a benchmark called ``name``."""
+
+    def decorator(factory):
+        BENCHMARKS[name] = (factory, tuple(sizes))
+        return factory
+
+    return decorator
+
+
+def percentile(samples, fraction):
+    """Return the nearest-rank percentile of ``samples`` (fraction in [0, 1])."""
+    ordered = sorted(samples)
+    rank = max(1, math.ceil(fraction * len(ordered)))
+    return ordered[rank - 1]
+
+
+def measure(func, repeat=7, warmup=1, number=1):
+    """
+    Time ``func`` and record its peak traced memory.
+
+    Args:
+        func: Zero-argument callable to benchmark
+        repeat: Number of timed samples
+        warmup: Untimed calls made first, to fill caches
+        number: Calls per sample; the sample is their average
+
+    Returns:
+        dict: median/p95/mean/min/stddev in seconds and peak_bytes
+    """
+    for _ in range(warmup):
+        func()
+
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        samples.append((time.perf_counter() - start) / number)
+
+    # Memory is traced in a separate call so tracing does not skew the timings
+    tracemalloc.start()
+    try:
+        func()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "median_s": statistics.median(samples),
+        "p95_s": percentile(samples, 0.95),
+        "mean_s": statistics.fmean(samples),
+        "min_s": min(samples),
+        "stddev_s": statistics.stdev(samples) if len(samples) > 1 else 0.0,
+        "peak_bytes": peak,
+        "repeat": repeat,
+    }
+
+
+def run(names=None, sizes=None, repeat=7, warmup=1, log=print):
+    """
+    Run registered benchmarks and return a JSON-serializable result document.
+
+    Args:
+        names: Benchmarks to run (default: all registered)
+        sizes: Input sizes overriding each benchmark's defaults
+        repeat: Timed samples per benchmark and size
+        warmup: Untimed warmup calls per benchmark and size
+        log: Called with one progress line per measurement (None to silence)
+
+    Returns:
+        dict: {"meta": {...}, "results": {"name[size]": {...}}}
+    """
+    names = list(BENCHMARKS) if names is None else names
+    unknown = [name for name in names if name not in BENCHMARKS]
+    if unknown:
+        raise KeyError(f"Unknown benchmark(s): {', '.join(unknown)}")
+
+    results = {}
+    for name in names:
+        factory, default_sizes = BENCHMARKS[name]
+        for size in sizes or default_sizes:
+            stats = measure(factory(size), repeat=repeat, warmup=warmup)
+            results[f"{name}[{size}]"] = {"name": name, "size": size, **stats}
+            if log is not None:
+                log(
+                    f"{name}[{size}]: median {stats['median_s'] * 1e3:.3f} ms, "
+                    f"p95 {stats['p95_s'] * 1e3:.3f} ms, "
+                    f"peak {stats['peak_bytes'] / 1024:.1f} KiB"
+                )
+
+    return {
+        "meta": {
+            "created": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "repeat": repeat,
+            "warmup": warmup,
+        },
+        "results": results,
+    }
+
+
+def compare(baseline, current, threshold=0.10, memory_threshold=None):
+    """
+    Compare two result documents and list the regressions.
+
+    A benchmark regresses when its median time grows by more than
+    ``threshold`` (a fraction), or its peak memory by more than
+    ``memory_threshold`` when that is given. Benchmarks present in only one
+    document are ignored.
+
+    Returns:
+        list: (key, metric, old, new, ratio) tuples, one per regression
+    """
+    regressions = []
+    for key, new in current["results"].items():
+        old = baseline["results"].get(key)
+        if old is None:
+            continue
+        checks = [("median_s", threshold)]
+        if memory_threshold is not None:
+            checks.append(("peak_bytes", memory_threshold))
+        for metric, limit in checks:
+            if old[metric] <= 0:
+                continue
+            ratio = new[metric] / old[metric]
+            if ratio > 1 + limit:
+                regressions.append((key, metric, old[metric], new[metric], ratio))
+    return regressions
+
+
+def profile(func, limit=10, sort=SortKey.TIME):
+    """Profile one call of ``func`` in memory and print the top ``limit`` rows."""
+    profiler = cProfile.Profile()
+    profiler.runcall(func)
+    pstats.Stats(profiler).sort_stats(sort).print_stats(limit)
+
+
+def _load_suites(modules):
+    """Import suite modules so their benchmarks register themselves."""
+    for module in modules:
+        importlib.import_module(module)
+
+
+def main(argv=None):
+    """Command-line entry point; returns the process exit code."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_cmd = commands.add_parser("run", help="run benchmarks and save JSON")
+    run_cmd.add_argument("suites", nargs="+", help="modules that register benchmarks")
+    run_cmd.add_argument("--only", nargs="+", help="benchmark names to run")
+    run_cmd.add_argument("--sizes", nargs="+", type=int, help="override input sizes")
+    run_cmd.add_argument("--repeat", type=int, default=7)
+    run_cmd.add_argument("--warmup", type=int, default=1)
+    run_cmd.add_argument("-o", "--output", help="write results to this JSON file")
+
+    compare_cmd = commands.add_parser("compare", help="flag regressions")
+    compare_cmd.add_argument("baseline")
+    compare_cmd.add_argument("current")
+    compare_cmd.add_argument("--threshold", type=float, default=0.10)
+    compare_cmd.add_argument("--memory-threshold", type=float)
+
+    profile_cmd = commands.add_parser("profile", help="cProfile one benchmark")
+    profile_cmd.add_argument("suite")
+    profile_cmd.add_argument("name")
+    profile_cmd.add_argument("--size", type=int, default=10_000)
+    profile_cmd.add_argument("--limit", type=int, default=10)
+
+    args = parser.parse_args(argv)
+
+    if args.command == "run":
+        _load_suites(args.suites)
+        document = run(args.only, args.sizes, args.repeat, args.warmup)
+        if args.output:
+            with open(args.output, "w") as f:
+                json.dump(document, f, indent=2)
+        return 0
+
+    if args.command == "compare":
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        with open(args.current) as f:
+            current = json.load(f)
+        regressions = compare(baseline, current, args.threshold, args.memory_threshold)
+        for key, metric, old, new, ratio in regressions:
+            print(f"REGRESSION {key} {metric}: {old:.6g} -> {new:.6g} ({ratio:.2f}x)")
+        if not regressions:
+            print("No regressions")
+        return 1 if regressions else 0
+
+    _load_suites([args.suite])
+    factory, _ = BENCHMARKS[args.name]
+    profile(factory(args.size), args.limit)
+    return 0
+
+
+if __name__ == "__main__":
+    # Suites do "from benchmark import register"; point them at this registry
+    sys.modules.setdefault("benchmark", sys.modules[__name__])
+    sys.exit(main())
@@ -1,12 +1,123 @@
-from flask import Flask, jsonify
+import threading
+import time
+from collections import OrderedDict
+
+from flask import Flask, jsonify, request
+from werkzeug.http import generate_etag
+
+from request_metrics import RequestMetrics
 
 app = Flask(__name__)
+app.config["METRICS_ENABLED"] = True
+# FLASK_-prefixed environment variables override the defaults above, e.g.
+# FLASK_METRICS_ENABLED=false or FLASK_DEBUG=true
+app.config.from_prefixed_env()
+metrics = RequestMetrics().install(app)
+
+
+class ResponseCache:
+    """
+    Thread-safe LRU cache of serialized response bodies with a time-to-live.
+
+    Each entry keeps the body bytes and their ETag, so a hit skips JSON
+    encoding entirely. Entries expire ``ttl`` seconds after they are stored,
+    and the least recently used entry is evicted beyond ``max_size``.
+    """
+
+    def __init__(self, max_size=1024, ttl=60.0, clock=time.monotonic):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._clock = clock
+        self._entries = OrderedDict()  # key -> (body, etag, expires_at)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        """Return the cached ``(body, etag)`` for ``key``, or None."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[2] > self._clock():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry[0], entry[1]
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def put(self, key, body):
+        """Cache ``body`` under ``key``; return ``(body, etag)``."""
+        etag = generate_etag(body)
+        with self._lock:
+            self._entries[key] = (body, etag, self._clock() + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return body, etag
+
+    def clear(self):
+        """Drop every entry and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self):
+        """Return the entry count, bounds and hit/miss/eviction counters."""
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+greet_cache = ResponseCache(max_size=1024, ttl=60.0)
+metrics.add_metric(
+    "greet_cache_hits_total",
+    "counter",
+    "Greet responses served from the cache.",
+    lambda: greet_cache.hits,
+)
+metrics.add_metric(
+    "greet_cache_misses_total",
+    "counter",
+    "Greet responses built and cached.",
+    lambda: greet_cache.misses,
+)
+
+
+def cached_greeting(name):
+    """Return the JSON greeting body for ``name`` and its ETag, via greet_cache."""
+    cached = greet_cache.get(name)
+    if cached is None:
+        # The bytes jsonify() would produce, built without an app context
+        body = app.json.response(message=f"Hello, {name}!").get_data()
+        cached = greet_cache.put(name, body)
+    return cached
 
 
 @app.route("/api/greet/<name>", methods=["GET"])
 def greet(name):
-    return jsonify(message=f"Hello, {name}!")
+    body, etag = cached_greeting(name)
+
+    response = app.response_class(body, mimetype=app.json.mimetype)
+    response.set_etag(etag)
+    # Answers If-None-Match with an empty 304 when the ETag matches
+    return response.make_conditional(request)
+
+
+@app.route("/api/cache/greet", methods=["GET"])
+def greet_cache_stats():
+    return jsonify(greet_cache.stats())
 
 
 if __name__ == "__main__":
-    app.run(debug=True)
+    # Debug mode (reloader, debugger, slower request handling) is opt-in
+    # through FLASK_DEBUG=true
+    app.run()
@@ -1,15 +1,85 @@
 """
 Test module for flask_app API endpoints.
-This module contains tests for the greeting API functionality.
+This module contains tests for the greeting API functionality. Tests taking
+the ``client`` fixture run against both flask_app and asgi_app.
 """
 
+import asyncio
+import http.client
+import socket
+import threading
+import time
+from urllib.parse import quote
+
+import asgi_app
 import pytest
-from flask_app import app
+from asgi_server import ASGIServer
+from flask import Flask, jsonify
+from flask_app import ResponseCache, app, greet_cache
+from request_metrics import RequestMetrics
+from serve import PooledWSGIServer, bench, main as serve_main
+from werkzeug.wrappers import Response
+
+
+class ASGITestClient:
+    """Calls an ASGI app directly; offers the part of Flask's test client used here."""
+
+    def __init__(self, asgi):
+        self.asgi = asgi
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        pass
+
+    def get(self, path, headers=None):
+        return asyncio.run(self._request("GET", path, headers or {}))
+
+    async def _request(self, method, path, headers):
+        path, _, query = path.partition("?")
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": method,
+            "scheme": "http",
+            "path": path,
+            "raw_path": quote(path).encode(),
+            "query_string": query.encode(),
+            "root_path": "",
+            "headers": [(k.lower().encode(), v.encode()) for k, v in headers.items()],
+            "client": ("127.0.0.1", 0),
+            "server": ("localhost", 80),
+        }
+        sent = []
+
+        async def receive():
+            return {"type": "http.request", "body": b"", "more_body": False}
+
+        async def send(message):
+            sent.append(message)
+
+        await self.asgi(scope, receive, send)
+        start, *bodies = sent
+        return Response(
+            b"".join(message.get("body", b"") for message in bodies),
+            status=start["status"],
+            headers=[(k.decode(), v.decode()) for k, v in start["headers"]],
+        )
 
 
-def test_greet_basic():
+@pytest.fixture(params=["wsgi", "asgi"])
+def client(request):
+    """A test client for the Flask app or for its ASGI counterpart."""
+    if request.param == "wsgi":
+        return app.test_client()
+    return ASGITestClient(asgi_app.app)
+
+
+def test_greet_basic(client):
     """Test basic functionality of the greeting endpoint with standard names."""
-    with app.test_client() as client:
+    with client:
         test_names = ["David", "Alice", "Bob"]
 
         for name in test_names:
@@ -20,9 +90,9 @@ def test_greet_basic():
             assert data["message"] == f"Hello, {name}!"
 
 
-def test_greet_special_chars():
+def test_greet_special_chars(client):
     """Test handling of names containing special characters."""
-    with app.test_client() as client:
+    with client:
         special_names = ["John Doe", "Jane-Smith", "O'Reilly"]
 
         for name in special_names:
@@ -33,9 +103,9 @@ def test_greet_special_chars():
             assert data["message"] == f"Hello, {name}!"
 
 
-def test_greet_empty_name():
+def test_greet_empty_name(client):
     """Test behavior when empty or blank names are provided."""
-    with app.test_client() as client:
+    with client:
         # Testing with empty string - this will actually result in a 404
         # as Flask won't match the route, so removed from tests
 
@@ -47,9 +117,9 @@ def test_greet_empty_name():
         assert data["message"] == f"Hello,  !"
 
 
-def test_greet_long_name():
+def test_greet_long_name(client):
     """Test the endpoint with unusually long name parameters."""
-    with app.test_client() as client:
+    with client:
         long_names = ["A" * 100, "B" * 200]
 
         for name in long_names:
@@ -60,9 +130,9 @@ def test_greet_long_name():
             assert data["message"] == f"Hello, {name}!"
 
 
-def test_greet_content_type():
+def test_greet_content_type(client):
     """Verify the API returns the correct content type (application/json)."""
-    with app.test_client() as client:
+    with client:
         response = client.get("/api/greet/David")
 
         assert response.status_code == 200
@@ -70,11 +140,318 @@ def test_greet_content_type():
 
 
 @pytest.mark.xfail(reason="Flask will return 404 for empty name route")
-def test_greet_empty_route():
+def test_greet_empty_route(client):
     """
     Test behavior when accessing the route with no name parameter.
     This test is expected to fail as Flask will return 404 for this route.
     """
-    with app.test_client() as client:
+    with client:
         response = client.get("/api/greet/")
         assert response.status_code == 404
+
+
+def test_greet_cache_hits_return_same_response(client):
+    """Verify a repeated name is served from the cache with identical bytes."""
+    greet_cache.clear()
+    with client:
+        first = client.get("/api/greet/David")
+        second = client.get("/api/greet/David")
+
+        assert first.data == second.data
+        assert first.headers["ETag"] == second.headers["ETag"]
+        assert second.get_json()["message"] == "Hello, David!"
+        assert greet_cache.stats()["hits"] == 1
+        assert greet_cache.stats()["misses"] == 1
+
+        # The cached body is exactly what jsonify would produce
+        with app.app_context():
+            assert second.data == jsonify(message="Hello, David!").get_data()
+
+
+def test_greet_cache_special_chars(client):
+    """Verify cached responses stay correct and distinct for special characters."""
+    greet_cache.clear()
+    with client:
+        names = ["O'Reilly", "John Doe", "Jane-Smith", "José", "Jose", "名前", "<b>&"]
+
+        for _ in range(2):
+            for name in names:
+                response = client.get(f"/api/greet/{name}")
+                assert response.status_code == 200
+                assert response.get_json()["message"] == f"Hello, {name}!"
+
+        stats = greet_cache.stats()
+        assert stats["misses"] == len(names)
+        assert stats["hits"] == len(names)
+
+
+def test_greet_cache_long_names(client):
+    """Verify long names are cached and served correctly."""
+    greet_cache.clear()
+    with client:
+        long_names = ["A" * 100, "B" * 2000, "A" * 101]
+
+        for _ in range(2):
+            for name in long_names:
+                response = client.get(f"/api/greet/{name}")
+                assert response.status_code == 200
+                assert response.get_json()["message"] == f"Hello, {name}!"
+
+        assert greet_cache.stats()["hits"] == len(long_names)
+
+
+def test_greet_if_none_match_returns_304(client):
+    """Verify a matching If-None-Match gets an empty 304, a stale one a 200."""
+    greet_cache.clear()
+    with client:
+        etag = client.get("/api/greet/Alice").headers["ETag"]
+
+        response = client.get("/api/greet/Alice", headers={"If-None-Match": etag})
+        assert response.status_code == 304
+        assert response.data == b""
+        assert response.headers["ETag"] == etag
+
+        response = client.get("/api/greet/Alice", headers={"If-None-Match": '"stale"'})
+        assert response.status_code == 200
+        assert response.get_json()["message"] == "Hello, Alice!"
+
+        response = client.get("/api/greet/Bob", headers={"If-None-Match": etag})
+        assert response.status_code == 200
+
+
+def test_greet_cache_stats_endpoint(client):
+    """Verify the hit/miss counters are exposed over HTTP."""
+    greet_cache.clear()
+    with client:
+        client.get("/api/greet/Alice")
+        client.get("/api/greet/Alice")
+        data = client.get("/api/cache/greet").get_json()
+
+        assert data["hits"] == 1
+        assert data["misses"] == 1
+        assert data["size"] == 1
+
+
+def test_response_cache_lru_and_ttl():
+    """Verify size-bounded LRU eviction and expiry after the TTL."""
+    now = [0.0]
+    cache = ResponseCache(max_size=2, ttl=10, clock=lambda: now[0])
+    cache.put("a", b"A")
+    cache.put("b", b"B")
+    assert cache.get("a")[0] == b"A"  # "b" is now least recently used
+    cache.put("c", b"C")
+
+    assert cache.get("b") is None
+    assert cache.get("c")[0] == b"C"
+    assert cache.stats()["evictions"] == 1
+
+    now[0] = 10.0
+    assert cache.get("a") is None
+    assert cache.stats() == {
+        "size": 1,
+        "max_size": 2,
+        "ttl": 10,
+        "hits": 2,
+        "misses": 2,
+        "evictions": 1,
+    }
+
+
+def read_metric(client, sample):
+    """Return the value of one ``name{labels}`` sample from /metrics (0 if absent)."""
+    for line in client.get("/metrics").get_data(as_text=True).splitlines():
+        if line.startswith(sample + " "):
+            return float(line.rsplit(" ", 1)[1])
+    return 0.0
+
+
+def test_metrics_count_requests_per_endpoint():
+    """Verify request counts, latency histogram and sizes per endpoint."""
+    with app.test_client() as client:
+        ok = 'http_requests_total{endpoint="greet",method="GET",status="200"}'
+        missing = 'http_requests_total{endpoint="unmatched",method="GET",status="404"}'
+        count = 'http_request_duration_seconds_count{endpoint="greet"}'
+        before = [read_metric(client, s) for s in (ok, missing, count)]
+
+        for name in ["Alice", "Bob", "Alice"]:
+            client.get(f"/api/greet/{name}")
+        client.get("/no/such/route")
+
+        after = [read_metric(client, s) for s in (ok, missing, count)]
+        assert [b - a for a, b in zip(before, after)] == [3, 1, 3]
+
+        text = client.get("/metrics").get_data(as_text=True)
+        assert client.get("/metrics").content_type.startswith("text/plain")
+        buckets = [
+            float(line.rsplit(" ", 1)[1])
+            for line in text.splitlines()
+            if line.startswith('http_request_duration_seconds_bucket{endpoint="greet"')
+        ]
+        assert buckets == sorted(buckets)
+        assert buckets[-1] == read_metric(client, count)
+        assert read_metric(client, 'http_response_size_bytes_sum{endpoint="greet"}') > 0
+        assert read_metric(client, "greet_cache_hits_total") == greet_cache.hits
+
+
+def test_metrics_can_be_disabled():
+    """Verify METRICS_ENABLED=False stops recording and hides /metrics."""
+    with app.test_client() as client:
+        sample = 'http_requests_total{endpoint="greet",method="GET",status="200"}'
+        before = read_metric(client, sample)
+        app.config["METRICS_ENABLED"] = False
+        try:
+            client.get("/api/greet/Alice")
+            assert client.get("/metrics").status_code == 404
+        finally:
+            app.config["METRICS_ENABLED"] = True
+        assert read_metric(client, sample) == before
+
+
+@pytest.mark.parametrize("testing", [False, True])
+def test_metrics_record_unhandled_errors(testing):
+    """Verify a crashing view is counted as a 500 and leaves no request in flight."""
+    broken = Flask("broken")
+    broken.testing = testing
+
+    @broken.route("/boom")
+    def boom():
+        raise RuntimeError("boom")
+
+    RequestMetrics().install(broken)
+    with broken.test_client() as client:
+        if testing:
+            with pytest.raises(RuntimeError):
+                client.get("/boom")
+        else:
+            assert client.get("/boom").status_code == 500
+
+        sample = 'http_requests_total{endpoint="boom",method="GET",status="500"}'
+        assert read_metric(client, sample) == 1
+        assert read_metric(client, "http_requests_in_flight") == 1  # the scrape itself
+
+
+def check_keep_alive(port):
+    """Exercise a live server on ``port`` over one keep-alive connection."""
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=5)
+    conn.request("GET", "/api/greet/Alice")
+    response = conn.getresponse()
+    assert response.status == 200
+    assert response.read() == b'{"message":"Hello, Alice!"}\n'
+    sock = conn.sock
+
+    # An unread request body is skipped before the next request
+    conn.request("POST", "/api/greet/Bob", body=b"x" * 10_000)
+    response = conn.getresponse()
+    response.read()
+    assert response.status == 405
+
+    conn.request("GET", "/api/greet/Bob", headers={"If-None-Match": "*"})
+    response = conn.getresponse()
+    assert response.status == 304
+    assert response.read() == b""
+    assert conn.sock is sock
+
+    result = bench(f"http://127.0.0.1:{port}", requests=200, concurrency=4)
+    assert result["ok"] == 200
+    assert result["errors"] == 0
+    return conn
+
+
+def test_pooled_server_keeps_connections_alive():
+    """Test that the production server reuses connections and drains cleanly."""
+    listener = socket.create_server(("127.0.0.1", 0))
+    server = PooledWSGIServer(listener, app, threads=2)
+    thread = threading.Thread(target=server.serve_forever)
+    thread.start()
+    try:
+        conn = check_keep_alive(server.server_port)
+    finally:
+        server.drain()
+        thread.join()
+        server.server_close()
+    # The idle keep-alive connection was closed by the drain
+    with pytest.raises((http.client.HTTPException, OSError)):
+        conn.request("GET", "/api/greet/Alice")
+        conn.getresponse()
+
+
+@pytest.fixture
+def pooled_server():
+    """Run a PooledWSGIServer with two threads; yield a function to connect."""
+    listener = socket.create_server(("127.0.0.1", 0))
+    server = PooledWSGIServer(listener, app, threads=2, keep_alive=1.0)
+    thread = threading.Thread(target=server.serve_forever)
+    thread.start()
+    port = server.server_port
+    yield lambda: http.client.HTTPConnection("127.0.0.1", port, timeout=5)
+    server.drain()
+    thread.join()
+    server.server_close()
+
+
+def test_pooled_server_idle_connections_hold_no_threads(pooled_server):
+    """Test that more idle keep-alive connections than threads block nobody."""
+    idle = []
+    for name in ["Alice", "Bob", "Carol", "David"]:
+        conn = pooled_server()
+        conn.request("GET", f"/api/greet/{name}")
+        assert conn.getresponse().read() == f'{{"message":"Hello, {name}!"}}\n'.encode()
+        idle.append(conn)
+
+    start = time.perf_counter()
+    conn = pooled_server()
+    conn.request("GET", "/api/greet/Eve")
+    assert conn.getresponse().status == 200
+    assert time.perf_counter() - start < 0.5
+
+    # The idle connections are still open and served when they speak again
+    for conn in idle:
+        sock = conn.sock
+        conn.request("GET", "/api/greet/Alice")
+        assert conn.getresponse().status == 200
+        assert conn.sock is sock
+
+
+def test_pooled_server_pipelined_and_expired_connections(pooled_server):
+    """Test requests sent back to back in one write, then the idle timeout."""
+    conn = pooled_server()
+    conn.connect()
+    request = b"GET /api/greet/Alice HTTP/1.1\r\nHost: x\r\n\r\n"
+    conn.sock.sendall(request * 3)
+    body = b'{"message":"Hello, Alice!"}\n'
+    received = b""
+    while received.count(body) < 3:
+        received += conn.sock.recv(65536)
+    assert received.count(b"HTTP/1.1 200 OK") == 3
+
+    # Left idle past keep_alive, the server closes the connection
+    start = time.perf_counter()
+    assert conn.sock.recv(65536) == b""
+    assert 0.5 < time.perf_counter() - start < 2.5
+
+
+def test_bench_reports_unreachable_server(capsys):
+    """Test that a benchmark where every request fails reports the errors."""
+    with socket.create_server(("127.0.0.1", 0)) as listener:
+        port = listener.getsockname()[1]
+    url = f"http://127.0.0.1:{port}"
+
+    assert serve_main(["bench", "--url", url, "--requests", "5"]) == 1
+    assert "0 requests" in capsys.readouterr().out
+
+
+def test_asgi_server_keeps_connections_alive():
+    """Test asgi_app behind the asyncio server, including a graceful close."""
+
+    async def scenario():
+        server = ASGIServer(asgi_app.app)
+        await server.start()
+        try:
+            return await asyncio.to_thread(check_keep_alive, server.port)
+        finally:
+            await server.close()
+
+    conn = asyncio.run(scenario())
+    with pytest.raises((http.client.HTTPException, OSError)):
+        conn.request("GET", "/api/greet/Alice")
+        conn.getresponse()
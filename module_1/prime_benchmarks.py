@@ -0,0 +1,162 @@
+"""Benchmarks for the primality and prime-sum strategies.
+
+The ``register``-ed benchmarks below are run through the harness, e.g.
+``python benchmark.py run prime_benchmarks -o results.json``. Each one uses
+its own PrimeTable so results do not depend on the order they run in.
+
+Run ``python prime_benchmarks.py`` to print three crossover tables: where trial division
+stops beating Miller-Rabin, where sieving stops beating a per-number test as
+inputs get sparser, and how sum_of_primes_parallel scales with the number of
+workers.
+``TRIAL_DIVISION_LIMIT`` and the ``*_NS_*`` cost constants used by
+``choose_strategy`` in prime_numbers.py are read off these tables.
+"""
+
+import os
+import random
+import timeit
+
+import numpy as np
+
+from benchmark import register
+from prime_numbers import (
+    TABLE_LIMIT,
+    PrimeTable,
+    choose_strategy,
+    miller_rabin,
+    sum_of_primes_naive,
+    sum_of_primes_numpy,
+    sum_of_primes_optimized,
+    sum_of_primes_parallel,
+    sum_primes_in_range,
+    trial_division,
+)
+
+STRATEGIES = ("table", "windowed", "test")
+
+
+def random_numbers(size, seed=0):
+    """Return ``size`` reproducible random integers below ``10 * size``."""
+    rng = random.Random(seed)
+    return [rng.randrange(1, 10 * size) for _ in range(size)]
+
+
+@register("naive")
+def bench_naive(size):
+    """Per-number is_prime over random input."""
+    numbers = random_numbers(size)
+    return lambda: sum_of_primes_naive(numbers)
+
+
+@register("optimized_cold")
+def bench_optimized_cold(size):
+    """Sieve-based sum including the cost of building a fresh table."""
+    numbers = random_numbers(size)
+    return lambda: sum_of_primes_optimized(numbers, table=PrimeTable())
+
+
+@register("optimized_warm")
+def bench_optimized_warm(size):
+    """Sieve-based sum against a table that already covers the input."""
+    numbers = random_numbers(size)
+    table = PrimeTable()
+    table.extend(max(numbers))
+    return lambda: sum_of_primes_optimized(numbers, table=table)
+
+
+@register("numpy")
+def bench_numpy(size):
+    """Vectorized sum over an int64 array."""
+    numbers = np.array(random_numbers(size), dtype=np.int64)
+    return lambda: sum_of_primes_numpy(numbers)
+
+
+@register("range_query", sizes=(10_000, 1_000_000, 10_000_000))
+def bench_range_query(size):
+    """Prefix-sum query for range(1, size) on a covering table."""
+    table = PrimeTable()
+    table.sum_upto(size)
+    return lambda: sum_primes_in_range(1, size, table)
+
+
+def best_time(func, number=1, repeat=3):
+    """Return the best per-call time of ``func`` in seconds."""
+    return min(timeit.repeat(func, number=number, repeat=repeat)) / number
+
+
+def next_prime(n):
+    """Return the smallest prime greater than or equal to ``n``."""
+    while not miller_rabin(n):
+        n += 1
+    return n
+
+
+def primality_crossover(exponents=range(3, 19), trial_max_exponent=12):
+    """Print the per-call cost of each primality test on primes near 10**e.
+
+    Primes are the worst case for both tests, since neither can exit early.
+    """
+    print(f"{'n':>8} {'trial (us)':>14} {'miller-rabin (us)':>18}")
+    for e in exponents:
+        n = next_prime(10**e)
+        if e <= trial_max_exponent:
+            trial = f"{best_time(lambda: trial_division(n)) * 1e6:14.2f}"
+        else:
+            trial = f"{'-':>14}"
+        mr = best_time(lambda: miller_rabin(n), number=200) * 1e6
+        print(f"{'1e' + str(e):>8} {trial} {mr:18.2f}")
+
+
+def strategy_crossover(magnitude, counts, seed=0):
+    """Print the cost of each sum strategy for random inputs below ``magnitude``.
+
+    Every run starts from an empty PrimeTable, so 'table' includes the cost of
+    growing it. The last column is what choose_strategy picks.
+    """
+    rng = random.Random(seed)
+    header = "".join(f"{name + ' (ms)':>16}" for name in STRATEGIES)
+    print(f"\nmax ~ {magnitude:.0e}\n{'count':>8}{header}{'chosen':>10}")
+    for count in counts:
+        numbers = [rng.randrange(magnitude) for _ in range(count)]
+        cells = []
+        for strategy in STRATEGIES:
+            if strategy == "table" and magnitude > TABLE_LIMIT:
+                cells.append(f"{'-':>16}")
+                continue
+            seconds = best_time(
+                lambda: sum_of_primes_optimized(
+                    numbers, table=PrimeTable(), strategy=strategy
+                ),
+                repeat=1,
+            )
+            cells.append(f"{seconds * 1e3:16.2f}")
+        chosen = choose_strategy(count, max(numbers), PrimeTable())
+        print(f"{count:>8}{''.join(cells)}{chosen:>10}")
+
+
+def parallel_scaling(hi=10**8, worker_counts=None):
+    """Print the speedup of sum_of_primes_parallel over ``range(1, hi)``.
+
+    The baseline sieves the same windows in this process, with a table that
+    cannot grow, so every row does the same work.
+    """
+    if worker_counts is None:
+        cpus = os.cpu_count() or 1
+        worker_counts = sorted({2, 4, 8, 16, 32, cpus} & set(range(2, cpus + 1)))
+    baseline = best_time(
+        lambda: sum_primes_in_range(1, hi, PrimeTable(max_limit=0)), repeat=1
+    )
+    print(f"\nrange(1, {hi:.0e})\n{'workers':>8}{'time (s)':>12}{'speedup':>10}")
+    print(f"{'serial':>8}{baseline:12.3f}{1:10.2f}")
+    for workers in worker_counts:
+        seconds = best_time(
+            lambda: sum_of_primes_parallel(range(1, hi), workers=workers), repeat=1
+        )
+        print(f"{workers:>8}{seconds:12.3f}{baseline / seconds:10.2f}")
+
+
+if __name__ == "__main__":
+    primality_crossover()
+    strategy_crossover(10**7, (10, 100, 1_000, 10_000, 100_000))
+    strategy_crossover(10**9, (10, 100, 1_000))
+    parallel_scaling()
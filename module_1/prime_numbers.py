@@ -1,10 +1,52 @@
-import cProfile
-import pstats
-from pstats import SortKey
+import mmap
+import os
+import struct
+from array import array
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from itertools import compress, islice
+from math import isqrt, log
+from multiprocessing.shared_memory import SharedMemory
+from operator import eq
+
+import numpy as np
+
+
+# Below this bound 6k±1 trial division is cheaper than the modular
+# exponentiations of Miller-Rabin (see prime_benchmarks.py for the crossover).
+TRIAL_DIVISION_LIMIT = 1 << 17
+
+# (bound, witnesses): Miller-Rabin with these bases is exact for every n < bound
+MILLER_RABIN_WITNESSES = (
+    (3_215_031_751, (2, 3, 5, 7)),
+    (3_474_749_660_383, (2, 3, 5, 7, 11, 13)),
+    (341_550_071_728_321, (2, 3, 5, 7, 11, 13, 17)),
+    (3_825_123_056_546_413_051, (2, 3, 5, 7, 11, 13, 17, 19, 23)),
+    (318_665_857_834_031_151_167_461, (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37)),
+    (
+        3_317_044_064_679_887_385_961_981,
+        (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41),
+    ),
+)
 
 
 def is_prime(n):
-    """Check if a number is prime."""
+    """Check if a number is prime.
+
+    Values covered by the shared prime table are answered by lookup, other
+    small values by trial division and large values by Miller-Rabin.
+    """
+    if n <= 1:
+        return False
+    if n <= prime_table.limit:
+        return prime_table.is_prime(n)
+    if n < TRIAL_DIVISION_LIMIT:
+        return trial_division(n)
+    return miller_rabin(n)
+
+
+def trial_division(n):
+    """Check if a number is prime by 6k±1 trial division."""
     if n <= 1:
         return False
     if n <= 3:
@@ -19,8 +61,46 @@ def is_prime(n):
     return True
 
 
+def miller_rabin(n):
+    """Check if a number is prime with the Miller-Rabin test.
+
+    The result is exact for n < 3.3 * 10**24. Above that bound the full witness
+    set is used and a True result means "strong probable prime".
+    """
+    if n < 5:
+        return n in (2, 3)
+    if n % 2 == 0:
+        return False
+
+    d, s = n - 1, 0
+    while d % 2 == 0:
+        d //= 2
+        s += 1
+
+    for bound, witnesses in MILLER_RABIN_WITNESSES:
+        if n < bound:
+            break
+    for a in witnesses:
+        if a % n == 0:
+            continue
+        x = pow(a, d, n)
+        if x == 1 or x == n - 1:
+            continue
+        for _ in range(s - 1):
+            x = x * x % n
+            if x == n - 1:
+                break
+        else:
+            return False
+    return True
+
+
 def sum_of_primes_naive(numbers):
-    """Calculate the sum of prime numbers in a list using a naive approach."""
+    """Calculate the sum of prime numbers in a list using a naive approach.
+
+    Each number is tested on its own; ``is_prime`` picks lookup, trial
+    division or Miller-Rabin from the number's magnitude.
+    """
     total = 0
     for number in numbers:
         if is_prime(number):
@@ -28,45 +108,669 @@ def sum_of_primes_naive(numbers):
     return total
 
 
-def sum_of_primes_optimized(numbers):
-    """Calculate the sum of prime numbers using a sieve approach."""
+# Number of odd candidates held in one sieve window. One byte per odd number
+# keeps a window at 32 KiB, which fits comfortably in L1/L2 cache.
+SEGMENT_SIZE = 1 << 15
+
+
+def base_primes(limit):
+    """Return the list of primes up to and including ``limit``.
+
+    Uses an odd-only bytearray sieve: index ``i`` stands for ``2 * i + 1``.
+    """
+    if limit < 2:
+        return []
+    size = (limit + 1) // 2
+    flags = bytearray(b"\x01") * size
+    flags[0] = 0  # 1 is not prime
+    for i in range(1, (isqrt(limit) - 1) // 2 + 1):
+        if flags[i]:
+            p = 2 * i + 1
+            start = p * p // 2
+            flags[start::p] = bytes(len(range(start, size, p)))
+    return [2] + list(compress(range(1, 2 * size, 2), flags))
+
+
+def sieve_segment(low, high, primes):
+    """Sieve the odd numbers in the window ``[low, high)``.
+
+    Args:
+        low: Odd lower bound of the window
+        high: Exclusive upper bound of the window
+        primes: Ascending primes covering at least ``isqrt(high - 1)``
+
+    Returns:
+        bytearray: ``flags[i]`` is 1 when ``low + 2 * i`` is prime
+    """
+    size = (high - low + 1) // 2
+    flags = bytearray(b"\x01") * size
+    if low <= 1 < high:
+        flags[(1 - low) // 2] = 0
+    for p in primes:
+        if p == 2:
+            continue
+        square = p * p
+        if square >= high:
+            break
+        # First odd multiple of p inside the window, never below p * p
+        start = max(square, (low + p - 1) // p * p)
+        if start % 2 == 0:
+            start += p
+        index = (start - low) // 2
+        if index < size:
+            flags[index::p] = bytes(len(range(index, size, p)))
+    return flags
+
+
+def iter_prime_segments(limit, segment_size=SEGMENT_SIZE):
+    """Yield ``(low, flags)`` windows that together cover ``[1, limit]``.
+
+    Only the base primes up to ``isqrt(limit)`` and a single window are held
+    in memory at a time.
+    """
+    primes = base_primes(isqrt(limit))
+    span = 2 * segment_size
+    for low in range(1, limit + 1, span):
+        yield low, sieve_segment(low, min(low + span, limit + 1), primes)
+
+
+# Largest value the shared table grows to on its own. Bigger inputs fall back
+# to windowed sieving so one outlier cannot pin hundreds of MiB of flags.
+TABLE_LIMIT = 1 << 26
+
+# Odd slots between two prefix-sum checkpoints. A range query adds at most one
+# stride of flags to a checkpoint, while the index costs 8 bytes per stride.
+PREFIX_STRIDE = 64
+
+
+class PrimeTable:
+    """Growable odd-only prime table shared across calls to the prime sums.
+
+    Flag ``i`` is 1 when ``2 * i + 1`` is prime. The table extends itself one
+    window at a time when a larger value is requested. When ``path`` is given
+    the flags live in a memory-mapped file, so a warm restart reuses them
+    instead of sieving again.
+    """
+
+    _HEADER = struct.Struct("<4sQ")
+    _MAGIC = b"PTBL"
+
+    def __init__(self, path=None, max_limit=TABLE_LIMIT):
+        """Initialize an empty table, or map an existing table file."""
+        self.path = path
+        self.max_limit = max_limit
+        self._flags = bytearray()
+        self._mmap = None
+        self._prefix = np.zeros(1, dtype=np.int64)
+        if path is not None and os.path.exists(path):
+            self._map()
+
+    @property
+    def flags(self):
+        """Odd-only flag buffer: a bytearray, or a memoryview when file-backed."""
+        return self._flags
+
+    @property
+    def limit(self):
+        """Largest value whose primality is answered by lookup."""
+        return 2 * len(self._flags)
+
+    def is_prime(self, n):
+        """Check if a number is prime, by lookup when the table covers it."""
+        if n > self.limit:
+            return is_prime(n)
+        if n % 2 == 0:
+            return n == 2
+        return n > 1 and self._flags[n // 2] == 1
+
+    def primes(self, limit):
+        """Return the list of primes up to and including ``limit``."""
+        self.extend(limit)
+        if limit < 2:
+            return []
+        size = (limit + 1) // 2
+        return [2] + list(compress(range(1, 2 * size, 2), self._flags[:size]))
+
+    def sum_upto(self, n):
+        """Return the sum of all primes up to and including ``n``.
+
+        Answers from the nearest prefix checkpoint plus at most one stride of
+        flags, so the cost does not depend on ``n``.
+        """
+        if n < 2:
+            return 0
+        self.extend(n)
+        self._update_prefix()
+        slots = (n + 1) // 2
+        block = min(slots // PREFIX_STRIDE, len(self._prefix) - 1)
+        first = block * PREFIX_STRIDE
+        tail = compress(range(2 * first + 1, 2 * slots, 2), self._flags[first:slots])
+        return 2 + int(self._prefix[block]) + sum(tail)
+
+    def sum_in_range(self, lo, hi):
+        """Return the sum of primes in ``[lo, hi)``, matching ``range(lo, hi)``."""
+        if hi <= lo:
+            return 0
+        return self.sum_upto(hi - 1) - self.sum_upto(lo - 1)
+
+    def _update_prefix(self):
+        """Extend the prefix-sum checkpoints over any newly sieved blocks.
+
+        ``_prefix[k]`` is the sum of the primes held in the first
+        ``k * PREFIX_STRIDE`` odd slots.
+        """
+        done = len(self._prefix) - 1
+        blocks = len(self._flags) // PREFIX_STRIDE
+        if blocks <= done:
+            return
+        flags = np.frombuffer(self._flags, dtype=np.uint8)
+        chunk = SEGMENT_SIZE // PREFIX_STRIDE * 32
+        sums = [self._prefix]
+        running = self._prefix[-1]
+        for start in range(done, blocks, chunk):
+            stop = min(start + chunk, blocks)
+            lo, hi = start * PREFIX_STRIDE, stop * PREFIX_STRIDE
+            values = np.arange(2 * lo + 1, 2 * hi, 2, dtype=np.int64) * flags[lo:hi]
+            block_sums = np.cumsum(values.reshape(-1, PREFIX_STRIDE).sum(axis=1))
+            sums.append(block_sums + running)
+            running = sums[-1][-1]
+        self._prefix = np.concatenate(sums)
+
+    def extend(self, limit):
+        """Grow the table so it covers every number up to ``limit``.
+
+        Growth is geometric (capped at ``max_limit``) so a slowly rising
+        maximum does not trigger a re-sieve on every call.
+        """
+        if limit <= self.limit:
+            return
+        target = max(limit, min(2 * self.limit, self.max_limit))
+        old_size = len(self._flags)
+        new_size = (target + 1) // 2
+        high = 2 * new_size
+        primes = base_primes(isqrt(high - 1))
+        span = 2 * SEGMENT_SIZE
+        segments = (
+            sieve_segment(low, min(low + span, high), primes)
+            for low in range(2 * old_size + 1, high, span)
+        )
+        if self.path is None:
+            for flags in segments:
+                self._flags += flags
+        else:
+            self._append(segments, old_size, new_size)
+
+    def close(self):
+        """Release the memory map, if any."""
+        if self._mmap is not None:
+            self._prefix = np.zeros(1, dtype=np.int64)
+            self._flags.release()
+            self._mmap.close()
+            self._mmap = None
+            self._flags = bytearray()
+
+    def _map(self):
+        """Map the table file, ignoring it if the header is not valid."""
+        with open(self.path, "rb") as f:
+            if os.fstat(f.fileno()).st_size <= self._HEADER.size:
+                return
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, size = self._HEADER.unpack_from(mapped)
+        if magic != self._MAGIC or len(mapped) < self._HEADER.size + size:
+            mapped.close()
+            return
+        self._mmap = mapped
+        self._flags = memoryview(mapped)[self._HEADER.size : self._HEADER.size + size]
+
+    def _append(self, segments, old_size, new_size):
+        """Write new windows to the table file and remap it.
+
+        The header is rewritten last, so a crash mid-extend leaves the file
+        describing only the flags that were fully written.
+        """
+        self.close()
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        with os.fdopen(fd, "r+b") as f:
+            f.seek(self._HEADER.size + old_size)
+            for flags in segments:
+                f.write(flags)
+            f.truncate()
+            f.flush()
+            os.fsync(f.fileno())
+            f.seek(0)
+            f.write(self._HEADER.pack(self._MAGIC, new_size))
+        self._map()
+
+
+# Module-level table reused by sum_of_primes_optimized unless one is injected
+prime_table = PrimeTable()
+
+
+def _sum_windowed(counts, primes):
+    """Sum ``n * counts[n]`` over the prime keys of ``counts``, window by window.
+
+    Only windows that contain a candidate are sieved.
+    """
+    total = 2 * counts.get(2, 0)
+    candidates = sorted(n for n in counts if n % 2)
+    span = 2 * SEGMENT_SIZE
+    i = 0
+    while i < len(candidates):
+        low = candidates[i] // span * span + 1
+        high = low + span
+        flags = sieve_segment(low, min(high, candidates[-1] + 1), primes)
+        while i < len(candidates) and candidates[i] < high:
+            num = candidates[i]
+            if flags[(num - low) // 2]:
+                total += num * counts[num]
+            i += 1
+    return total
+
+
+def _sum_range_windowed(lo, hi, primes):
+    """Sum the primes in ``[lo, hi)`` by sieving every window of the range."""
+    total = 2 if lo <= 2 < hi else 0
+    span = 2 * SEGMENT_SIZE
+    start = max(lo, 1) | 1
+    for low in range(start, hi, span):
+        flags = sieve_segment(low, min(low + span, hi), primes)
+        total += sum(compress(range(low, low + 2 * len(flags), 2), flags))
+    return total
+
+
+def sum_primes_in_range(lo, hi, table=None):
+    """Return the sum of the primes in ``range(lo, hi)``.
+
+    Once the table covers ``hi``, the answer comes from its prefix-sum
+    checkpoints in constant time. Ranges the table should not grow to are
+    sieved window by window, or tested number by number when short and huge.
+
+    Args:
+        lo: Inclusive lower bound
+        hi: Exclusive upper bound
+        table: PrimeTable to reuse; defaults to the shared ``prime_table``
+    """
+    if table is None:
+        table = prime_table
+    lo = max(lo, 2)
+    if hi <= lo:
+        return 0
+    windows = (hi - lo) // (2 * SEGMENT_SIZE) + 1
+    strategy = choose_strategy(hi - lo, hi - 1, table, windows)
+    if strategy == "table":
+        return table.sum_in_range(lo, hi)
+    if strategy == "windowed":
+        return _sum_range_windowed(lo, hi, table.primes(isqrt(hi - 1)))
+    return sum(num for num in range(lo, hi) if is_prime(num))
+
+
+def _contiguous_range(numbers):
+    """Return ``numbers`` as a ``range`` if it is one ascending run, else None."""
+    if isinstance(numbers, range):
+        return numbers if numbers.step == 1 else None
+    if not isinstance(numbers, (list, tuple)):
+        return None
+    first, last = numbers[0], numbers[-1]
+    if not isinstance(first, int) or last - first + 1 != len(numbers):
+        return None
+    candidate = range(first, last + 1)
+    return candidate if all(map(eq, numbers, candidate)) else None
+
+
+def numpy_sieve(limit):
+    """Return an odd-only ``np.bool_`` sieve covering ``[0, limit]``.
+
+    Entry ``i`` is True when ``2 * i + 1`` is prime; multiples are crossed off
+    with strided slice assignment.
+    """
+    size = (limit + 1) // 2
+    sieve = np.ones(size, dtype=np.bool_)
+    if size:
+        sieve[0] = False  # 1 is not prime
+    for i in range(1, (isqrt(max(limit, 0)) - 1) // 2 + 1):
+        if sieve[i]:
+            p = 2 * i + 1
+            sieve[p * p // 2 :: p] = False
+    return sieve
+
+
+def sum_of_primes_numpy(numbers, sieve=None):
+    """Calculate the sum of prime numbers with vectorized NumPy operations.
+
+    Primes are picked out by fancy indexing into an odd-only sieve and added
+    with ``np.sum``. The sum stays in int64 when it provably cannot overflow
+    and switches to Python integers otherwise. Inputs above ``TABLE_LIMIT``
+    or held as Python objects go through sum_of_primes_optimized instead.
+
+    Args:
+        numbers: Integer ndarray or sequence of integers
+        sieve: Optional ``numpy_sieve`` result to reuse across calls
+
+    Returns:
+        int: Sum of the primes in ``numbers``
+    """
+    values = np.asarray(numbers)
+    if values.size == 0:
+        return 0
+    if values.dtype == object:
+        return sum_of_primes_optimized(values.tolist())
+    if values.dtype.kind not in "iu":
+        raise TypeError(f"Expected integers, got {values.dtype}")
+
+    values = values[values > 1]
+    if values.size == 0:
+        return 0
+    max_num = int(values.max())
+    if max_num > TABLE_LIMIT:
+        return sum_of_primes_optimized(values.tolist())
+    if sieve is None or len(sieve) < (max_num + 1) // 2:
+        sieve = numpy_sieve(max_num)
+
+    odd = values[(values & 1) == 1]
+    primes = odd[sieve[odd >> 1]]
+    total = 2 * int(np.count_nonzero(values == 2))
+    if max_num * primes.size < 2**63:
+        return total + int(np.sum(primes, dtype=np.int64))
+    return total + int(np.sum(primes.astype(object)))
+
+
+# Rough costs in nanoseconds on a single core, measured with prime_benchmarks.py
+# (the per-number test cost is for typical, mostly composite, inputs).
+# Only their ratios matter to choose_strategy.
+SIEVE_NS_PER_NUMBER = 5
+MARK_NS_PER_PRIME = 1_000
+TEST_NS_PER_NUMBER = 2_000
+
+
+def choose_strategy(count, max_num, table=None, windows=None):
+    """Pick how sum_of_primes_optimized should test an input of this shape.
+
+    Compares the estimated cost of sieving against testing each number on its
+    own, from the input size, its magnitude and how sparse it is.
+
+    Args:
+        count: Number of input values
+        max_num: Largest input value
+        table: PrimeTable that would be reused; defaults to ``prime_table``
+        windows: Sieve windows the input touches, when known (e.g. for a
+            contiguous range); otherwise every value is assumed to need its own
+
+    Returns:
+        str: 'table' (grow the table and look up), 'windowed' (sieve only the
+        windows that hold a value) or 'test' (per-number primality test)
+    """
+    if table is None:
+        table = prime_table
+    if max_num <= table.limit:
+        return "table"
+
+    test_cost = count * TEST_NS_PER_NUMBER
+    if max_num <= table.max_limit:
+        grow_cost = (max_num - table.limit) * SIEVE_NS_PER_NUMBER
+        return "table" if grow_cost <= test_cost else "test"
+
+    root = isqrt(max_num)
+    if root > table.max_limit:
+        return "test"
+    span = 2 * SEGMENT_SIZE
+    if windows is None:
+        windows = min(count, max_num // span + 1)
+    marks = root / max(log(root), 1)  # base primes crossed off per window
+    window_cost = span * SIEVE_NS_PER_NUMBER + marks * MARK_NS_PER_PRIME
+    sieve_cost = windows * window_cost + root * SIEVE_NS_PER_NUMBER
+    return "windowed" if sieve_cost <= test_cost else "test"
+
+
+def sum_of_primes_optimized(numbers, table=None, strategy=None):
+    """Calculate the sum of prime numbers using a sieve approach.
+
+    NumPy arrays go to sum_of_primes_numpy. Contiguous runs are answered from
+    the prefix-sum index. Otherwise ``choose_strategy`` decides between looking
+    values up in the (growing) table, sieving only the fixed windows that
+    contain an input value, and testing each value with ``is_prime`` when the
+    input is sparse and huge.
+
+    Args:
+        numbers: Integers to scan
+        table: PrimeTable to reuse; defaults to the shared ``prime_table``
+        strategy: Force 'table', 'windowed' or 'test' instead of choosing
+    """
+    if isinstance(numbers, np.ndarray):
+        return sum_of_primes_numpy(numbers)
     if not numbers:
         return 0
 
-    # Find the maximum number to create an appropriate sieve
+    if table is None:
+        table = prime_table
+
+    # Contiguous input such as range(1, N) is a prefix-sum query
+    span = _contiguous_range(numbers) if strategy is None else None
+    if span is not None:
+        return sum_primes_in_range(span.start, span.stop, table)
+
     max_num = max(numbers)
+    if max_num < 2:
+        return 0
+    if strategy is None:
+        strategy = choose_strategy(len(numbers), max_num, table)
 
-    # Create a sieve (True means potentially prime)
-    sieve = [True] * (max_num + 1)
-    sieve[0] = sieve[1] = False
+    if strategy == "table":
+        table.extend(max_num)
+        flags = table.flags
+        return sum(
+            num
+            for num in numbers
+            if num > 1 and (flags[num >> 1] if num & 1 else num == 2)
+        )
+
+    # Tally each candidate once; duplicates count towards the sum
+    counts = Counter(n for n in numbers if n > 1)
+    if strategy == "windowed":
+        return _sum_windowed(counts, table.primes(isqrt(max_num)))
+    if strategy == "test":
+        return sum(num * count for num, count in counts.items() if is_prime(num))
+    raise ValueError(f"Unknown strategy: {strategy!r}")
+
+
+# Integers summed per step of a stream, and bytes read per file block
+STREAM_CHUNK_SIZE = 1 << 16
+STREAM_BLOCK_SIZE = 1 << 20
+
+
+def _iter_file_chunks(path, block_size=STREAM_BLOCK_SIZE):
+    """Yield lists of the integers in a whitespace/newline-delimited file.
+
+    The file is read in fixed-size blocks; a number split across two blocks is
+    carried over to the next one.
+    """
+    with open(path, "rb") as f:
+        tail = b""
+        while True:
+            block = f.read(block_size)
+            if not block:
+                break
+            block = tail + block
+            cut = block.rfind(b"\n") + 1
+            tail = block[cut:]
+            if cut:
+                yield list(map(int, block[:cut].split()))
+        if tail.strip():
+            yield list(map(int, tail.split()))
 
-    # Apply the sieve
-    for i in range(2, int(max_num**0.5) + 1):
-        if sieve[i]:
-            # Mark all multiples as non-prime
-            for j in range(i * i, max_num + 1, i):
-                sieve[j] = False
 
-    # Sum the primes in our input list
-    return sum(num for num in numbers if sieve[num])
+def _iter_chunks(numbers, chunk_size):
+    """Yield lists of at most ``chunk_size`` integers from any iterable."""
+    iterator = iter(numbers)
+    while chunk := list(islice(iterator, chunk_size)):
+        yield chunk
+
+
+def iter_prime_sums(source, chunk_size=STREAM_CHUNK_SIZE, table=None):
+    """Yield the running sum of primes as a stream of integers is consumed.
+
+    Only one chunk is held at a time. Values the table may grow to are looked
+    up in it, so the sieve grows lazily as larger values appear; values above
+    ``table.max_limit`` are handled apart so one outlier does not change how
+    the rest of its chunk is summed.
+
+    Args:
+        source: Iterable of integers, or path to a file of newline-delimited
+            integers
+        chunk_size: Integers per step for iterables (files go by block)
+        table: PrimeTable to reuse; defaults to the shared ``prime_table``
+
+    Yields:
+        int: Sum of the primes seen so far, once per chunk
+    """
+    if table is None:
+        table = prime_table
+    if isinstance(source, (str, bytes, os.PathLike)):
+        chunks = _iter_file_chunks(source)
+    else:
+        chunks = _iter_chunks(source, chunk_size)
+
+    total = 0
+    for chunk in chunks:
+        small = [n for n in chunk if n <= table.max_limit]
+        if len(small) < len(chunk):
+            large = [n for n in chunk if n > table.max_limit]
+            total += sum_of_primes_optimized(large, table)
+        total += sum_of_primes_optimized(small, table)
+        yield total
+
+
+def sum_of_primes_stream(source, chunk_size=STREAM_CHUNK_SIZE, table=None):
+    """Calculate the sum of prime numbers in a stream in bounded memory.
+
+    Accepts the same arguments as iter_prime_sums and returns its last total.
+    """
+    total = 0
+    for total in iter_prime_sums(source, chunk_size, table):
+        pass
+    return total
+
+
+# Base primes seen by a pool worker, attached once per process by
+# _attach_base_primes rather than pickled into every task.
+_worker_shm = None
+_worker_primes = ()
+
+
+def _attach_base_primes(name, count):
+    """Pool initializer: map the shared base primes into this worker."""
+    global _worker_shm, _worker_primes
+    _worker_shm = SharedMemory(name=name)
+    _worker_primes = _worker_shm.buf.cast("Q")[:count]
+
+
+def _range_worker(bounds):
+    """Sum the primes in one ``[lo, hi)`` slice of a contiguous input."""
+    return _sum_range_windowed(*bounds, _worker_primes)
+
+
+def _windowed_worker(items):
+    """Sum the primes among a chunk of ``(number, count)`` pairs by sieving."""
+    return _sum_windowed(dict(items), _worker_primes)
+
+
+def _test_worker(items):
+    """Sum the primes among a chunk of ``(number, count)`` pairs by testing."""
+    return sum(num * count for num, count in items if is_prime(num))
+
+
+def _split_range(lo, hi, parts):
+    """Split ``[lo, hi)`` into at most ``parts`` window-aligned slices."""
+    span = 2 * SEGMENT_SIZE
+    step = max(span, -(-(hi - lo) // parts) // span * span)
+    return [(start, min(start + step, hi)) for start in range(lo, hi, step)]
+
+
+def _split_items(items, parts):
+    """Split sorted ``(number, count)`` pairs into about ``parts`` chunks.
+
+    Chunks are cut only between sieve windows, so no window is sieved twice.
+    """
+    span = 2 * SEGMENT_SIZE
+    size = -(-len(items) // parts)
+    chunks, chunk = [], []
+    for item in items:
+        if len(chunk) >= size and item[0] // span != chunk[-1][0] // span:
+            chunks.append(chunk)
+            chunk = []
+        chunk.append(item)
+    if chunk:
+        chunks.append(chunk)
+    return chunks
+
+
+def sum_of_primes_parallel(numbers, workers=None, chunks_per_worker=4):
+    """Calculate the sum of prime numbers across a pool of processes.
+
+    Contiguous input is split into slices of the range; other input is split
+    into chunks of its distinct values, cut at sieve-window boundaries. The
+    base primes up to ``isqrt(max(numbers))`` are sieved once and shared with
+    the workers through shared memory. Starting the pool costs tens of
+    milliseconds, so this only pays off for large inputs.
+
+    Args:
+        numbers: Integers to scan
+        workers: Number of processes; defaults to ``os.cpu_count()``
+        chunks_per_worker: Tasks queued per worker, to even out the load
+
+    Returns:
+        int: The same total as ``sum_of_primes_naive(numbers)``
+    """
+    if isinstance(numbers, np.ndarray):
+        numbers = numbers.tolist()
+    if not numbers:
+        return 0
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        return sum_of_primes_optimized(numbers)
+    parts = workers * chunks_per_worker
 
+    span = _contiguous_range(numbers)
+    if span is not None:
+        lo, hi = max(span.start, 2), span.stop
+        if hi <= lo:
+            return 0
+        windows = (hi - lo) // (2 * SEGMENT_SIZE) + 1
+        if choose_strategy(hi - lo, hi - 1, windows=windows) == "test":
+            span = None
+    if span is not None:
+        max_num, worker, tasks = hi - 1, _range_worker, _split_range(lo, hi, parts)
+    else:
+        counts = Counter(n for n in numbers if n > 1)
+        if not counts:
+            return 0
+        max_num = max(counts)
+        tasks = _split_items(sorted(counts.items()), parts)
+        if choose_strategy(len(numbers), max_num) == "test":
+            worker = _test_worker
+        else:
+            worker = _windowed_worker
 
-# Create test data
-numbers = list(range(1, 10000))
+    primes = base_primes(isqrt(max_num)) if worker is not _test_worker else []
+    shm = SharedMemory(create=True, size=max(8, 8 * len(primes)))
+    try:
+        shm.buf.cast("Q")[: len(primes)] = array("Q", primes)
+        with ProcessPoolExecutor(
+            max_workers=min(workers, len(tasks)),
+            initializer=_attach_base_primes,
+            initargs=(shm.name, len(primes)),
+        ) as pool:
+            return sum(pool.map(worker, tasks))
+    finally:
+        shm.close()
+        shm.unlink()
 
-# Run the profiler for both implementations
-print("Profiling naive implementation:")
-cProfile.run("sum_of_primes_naive(numbers)", "naive_stats")
-p1 = pstats.Stats("naive_stats")
-p1.sort_stats(SortKey.TIME).print_stats(5)
 
-print("\nProfiling optimized implementation:")
-cProfile.run("sum_of_primes_optimized(numbers)", "optimized_stats")
-p2 = pstats.Stats("optimized_stats")
-p2.sort_stats(SortKey.TIME).print_stats(5)
+if __name__ == "__main__":
+    # Timings and profiles live in benchmark.py; see prime_benchmarks.py
+    numbers = list(range(1, 10000))
 
-# Compare results to ensure they match
-result1 = sum_of_primes_naive(numbers)
-result2 = sum_of_primes_optimized(numbers)
-print(f"\nResults match: {result1 == result2}")
-print(f"Sum of primes: {result1}")
+    # Compare results to ensure they match
+    result1 = sum_of_primes_naive(numbers)
+    result2 = sum_of_primes_optimized(numbers)
+    print(f"Results match: {result1 == result2}")
+    print(f"Sum of primes: {result1}")
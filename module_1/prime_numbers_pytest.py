@@ -0,0 +1,281 @@
+import pytest
+import math
+import random
+
+import numpy as np
+
+from prime_numbers import (
+    MILLER_RABIN_WITNESSES,
+    SEGMENT_SIZE,
+    STREAM_BLOCK_SIZE,
+    PrimeTable,
+    base_primes,
+    choose_strategy,
+    is_prime,
+    iter_prime_sums,
+    miller_rabin,
+    sum_of_primes_naive,
+    sum_of_primes_numpy,
+    sum_of_primes_optimized,
+    sum_of_primes_parallel,
+    sum_of_primes_stream,
+    sum_primes_in_range,
+    trial_division,
+)
+
+WINDOW = 2 * SEGMENT_SIZE
+
+
+def expected_sum(numbers):
+    """Sum the primes in ``numbers`` with trial division, the reference."""
+    return sum(n for n in numbers if trial_division(n))
+
+
+def scattered_numbers(count, high, seed=0):
+    """Return random integers up to ``high`` with duplicates and edge values."""
+    rng = random.Random(seed)
+    numbers = [rng.randrange(-5, high) for _ in range(count)]
+    # Values on both sides of sieve window boundaries, and repeats
+    numbers += [k * WINDOW + d for k in range(1, 4) for d in (-2, -1, 1, 2)]
+    numbers += [-1, 0, 1, 2, 2, 3, 4]
+    rng.shuffle(numbers)
+    return numbers
+
+
+@pytest.fixture
+def table():
+    """Create a fresh in-memory PrimeTable for each test."""
+    return PrimeTable()
+
+
+def test_base_primes_match_trial_division():
+    """Test the odd-only sieve against trial division, including tiny limits."""
+    for limit in [-1, 0, 1, 2, 3, 4, 5, 97, 1000]:
+        assert base_primes(limit) == [n for n in range(limit + 1) if trial_division(n)]
+
+
+@pytest.mark.parametrize("strategy", [None, "table", "windowed", "test"])
+def test_sum_of_primes_optimized_strategies(table, strategy):
+    """Test that every strategy agrees with trial division."""
+    numbers = scattered_numbers(3000, 3 * WINDOW + 100)
+
+    result = sum_of_primes_optimized(numbers, table=table, strategy=strategy)
+    assert result == expected_sum(numbers)
+
+
+def test_sum_of_primes_optimized_unknown_strategy(table):
+    """Test that an unknown strategy name is rejected."""
+    with pytest.raises(ValueError):
+        sum_of_primes_optimized([5, 7], table=table, strategy="guess")
+
+
+@pytest.mark.parametrize(
+    "max_limit, numbers, strategy",
+    [
+        (1 << 20, list(range(7, 10**6, 300)), "table"),
+        (1 << 10, list(range(10**6, 10**6 + 20_000, 3)), "windowed"),
+        (1 << 10, [10**12 + 39, 10**12 + 40, 10**12 + 61, 7], "test"),
+    ],
+)
+def test_choose_strategy_paths(max_limit, numbers, strategy):
+    """Test that each automatic choice is reached and sums correctly."""
+    table = PrimeTable(max_limit=max_limit)
+    assert choose_strategy(len(numbers), max(numbers), table) == strategy
+    assert sum_of_primes_optimized(numbers, table=table) == expected_sum(numbers)
+
+
+@pytest.mark.parametrize(
+    "lo, hi",
+    [
+        (0, 0),
+        (10, 5),
+        (-10, 3),
+        (2, 3),
+        (1, 100),
+        (97, 98),
+        (WINDOW - 3, WINDOW + 3),
+        (12_345, 3 * WINDOW + 17),
+    ],
+)
+@pytest.mark.parametrize("max_limit", [1 << 26, 1 << 10])
+def test_sum_primes_in_range(lo, hi, max_limit):
+    """Test range sums from the prefix index and from windowed sieving."""
+    table = PrimeTable(max_limit=max_limit)
+    assert sum_primes_in_range(lo, hi, table) == expected_sum(range(lo, hi))
+    # Asked again, the answer comes from the grown table
+    assert sum_primes_in_range(lo, hi, table) == expected_sum(range(lo, hi))
+
+
+def test_sum_primes_in_range_huge_short_range():
+    """Test that a short range of huge numbers is tested number by number."""
+    lo = 10**12
+    assert sum_primes_in_range(lo, lo + 200) == expected_sum(range(lo, lo + 200))
+
+
+@pytest.mark.parametrize("lo, hi", [(1, 2), (-3, 50), (1, 10_000), (5000, 2 * WINDOW)])
+def test_contiguous_input(table, lo, hi):
+    """Test that lists, tuples and ranges of consecutive integers sum correctly."""
+    expected = expected_sum(range(lo, hi))
+    assert sum_of_primes_optimized(range(lo, hi), table=table) == expected
+    assert sum_of_primes_optimized(list(range(lo, hi)), table=table) == expected
+    assert sum_of_primes_optimized(tuple(range(lo, hi)), table=table) == expected
+
+
+def test_non_contiguous_input(table):
+    """Test inputs that only look like ranges: steps, gaps and repeats."""
+    for numbers in [
+        range(1, 1000, 2),
+        list(range(1, 50)) + [7],
+        [2, 3, 4, 4, 6],
+        [5, 4, 3, 2],
+        [1],
+        [],
+    ]:
+        assert sum_of_primes_optimized(numbers, table=table) == expected_sum(numbers)
+
+
+@pytest.mark.parametrize("dtype", [np.int64, np.int32, np.uint32, np.int8, object])
+def test_sum_of_primes_numpy(dtype):
+    """Test the NumPy backend across integer dtypes against trial division."""
+    numbers = [n for n in scattered_numbers(2000, 20_000) if n >= 0]
+    if dtype is np.int8:
+        numbers = [n % 128 for n in numbers]
+    values = np.array(numbers, dtype=dtype)
+
+    assert sum_of_primes_numpy(values) == expected_sum(numbers)
+    assert sum_of_primes_optimized(values) == expected_sum(numbers)
+
+
+def test_sum_of_primes_numpy_edge_cases():
+    """Test empty and non-prime arrays, sieve reuse, large values and floats."""
+    assert sum_of_primes_numpy(np.array([], dtype=np.int64)) == 0
+    assert sum_of_primes_numpy(np.array([-7, 0, 1, 4])) == 0
+
+    sieve = np.ones(1, dtype=np.bool_)  # too short, so it is rebuilt
+    assert sum_of_primes_numpy(np.arange(100), sieve=sieve) == expected_sum(range(100))
+
+    large = [2**31 - 1, 2**31 + 11, 10**12 + 39]
+    assert sum_of_primes_numpy(np.array(large, dtype=np.int64)) == expected_sum(large)
+
+    with pytest.raises(TypeError):
+        sum_of_primes_numpy(np.array([2.0, 3.0]))
+
+
+@pytest.mark.parametrize("n", [bound for bound, _ in MILLER_RABIN_WITNESSES[:-1]])
+def test_miller_rabin_rejects_strong_pseudoprimes(n):
+    """Test each witness-set bound, a strong pseudoprime to the smaller set."""
+    assert not miller_rabin(n)
+    assert not is_prime(n)
+
+
+def test_miller_rabin_matches_trial_division():
+    """Test Miller-Rabin against trial division, Carmichael numbers included."""
+    rng = random.Random(0)
+    samples = list(range(-2, 3000))
+    samples += [rng.randrange(10**6, 10**12) for _ in range(300)]
+    samples += [561, 1105, 1729, 41041, 825265, 321197185, 2047, 1373653]
+    for n in samples:
+        assert miller_rabin(n) == trial_division(n), n
+
+    for p in [2**31 - 1, 2**61 - 1, 10**12 + 39]:
+        assert miller_rabin(p)
+        assert not miller_rabin(p * 3)
+
+
+def test_is_prime_across_limits():
+    """Test is_prime below, around and above the table and trial limits."""
+    for n in [-1, 0, 1, 2, 3, 4, 131_071, 131_072, 131_101, 1_000_003, 10**12 + 39]:
+        assert is_prime(n) == trial_division(n), n
+    assert sum_of_primes_naive(range(500)) == expected_sum(range(500))
+
+
+def test_prime_table_sums(table):
+    """Test prefix sums as the table grows in several steps."""
+    for n in [1, 2, 3, 100, 127, 128, 129, 5000, WINDOW + 1, 3 * WINDOW]:
+        assert table.sum_upto(n) == expected_sum(range(n + 1)), n
+    assert table.primes(100) == base_primes(100)
+    assert table.sum_in_range(50, 40) == 0
+    assert table.sum_in_range(10, 5000) == expected_sum(range(10, 5000))
+
+
+def test_file_backed_prime_table_reopens_and_grows(tmp_path):
+    """Test that a file-backed table is reused on reopen and keeps growing."""
+    path = str(tmp_path / "primes.tbl")
+    memory = PrimeTable()
+    memory.extend(3 * WINDOW)
+
+    first = PrimeTable(path)
+    first.extend(10_000)
+    limit = first.limit
+    assert first.sum_upto(10_000) == expected_sum(range(10_001))
+    first.close()
+
+    second = PrimeTable(path)
+    assert second.limit == limit
+    assert bytes(second.flags) == bytes(memory.flags[: len(second.flags)])
+    second.extend(3 * WINDOW)
+    assert second.limit >= 3 * WINDOW
+    assert second.sum_upto(3 * WINDOW) == memory.sum_upto(3 * WINDOW)
+    assert second.is_prime(3 * WINDOW - 1) == trial_division(3 * WINDOW - 1)
+    grown = second.limit
+    second.close()
+
+    third = PrimeTable(path)
+    assert third.limit == grown
+    assert bytes(third.flags) == bytes(memory.flags[: len(third.flags)])
+    third.close()
+
+
+def test_file_backed_prime_table_ignores_bad_file(tmp_path):
+    """Test that a file without a valid header is rebuilt rather than trusted."""
+    path = tmp_path / "primes.tbl"
+    path.write_bytes(b"not a prime table at all")
+
+    table = PrimeTable(str(path))
+    assert table.limit == 0
+    assert table.sum_upto(1000) == expected_sum(range(1001))
+    table.close()
+
+
+def test_sum_of_primes_stream_file_across_blocks(tmp_path):
+    """Test a file larger than one read block, with a number split between two."""
+    rng = random.Random(0)
+    numbers = [5] + [rng.randrange(1_000_000, 10_000_000) for _ in range(140_000)]
+    text = "\n".join(map(str, numbers))  # no trailing newline
+    # Every number after the first takes 8 bytes, so the block boundary falls
+    # inside a number
+    assert text[STREAM_BLOCK_SIZE - 1 : STREAM_BLOCK_SIZE + 1].isdigit()
+    path = tmp_path / "numbers.txt"
+    path.write_text(text)
+
+    assert sum_of_primes_stream(str(path)) == expected_sum(numbers)
+    assert sum_of_primes_stream(path) == expected_sum(numbers)
+
+
+def test_sum_of_primes_stream_iterable():
+    """Test running totals over a generator, with values above the table limit."""
+    numbers = scattered_numbers(5000, 50_000) + [10**12 + 39, 10**12 + 40]
+    table = PrimeTable(max_limit=1 << 12)
+
+    totals = list(iter_prime_sums(iter(numbers), chunk_size=700, table=table))
+    assert len(totals) == math.ceil(len(numbers) / 700)
+    assert totals == sorted(totals)
+    assert totals[-1] == expected_sum(numbers)
+    assert sum_of_primes_stream(iter([]), table=table) == 0
+
+
+@pytest.mark.parametrize(
+    "numbers",
+    [
+        pytest.param(list(range(1, 5 * WINDOW)), id="range"),
+        pytest.param(scattered_numbers(20_000, 5 * WINDOW), id="scattered"),
+        pytest.param([10**12 + d for d in range(0, 400, 3)], id="sparse-huge"),
+        pytest.param(np.arange(-5, 30_000), id="ndarray"),
+        pytest.param([0, 1], id="no-primes"),
+        pytest.param([], id="empty"),
+    ],
+)
+def test_sum_of_primes_parallel(numbers):
+    """Test the process-pool sum with two workers against trial division."""
+    expected = expected_sum(np.asarray(numbers).tolist())
+    assert sum_of_primes_parallel(numbers, workers=2) == expected
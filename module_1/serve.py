@@ -0,0 +1,679 @@
+"""
+Production server for flask_app: pre-forked worker processes with thread pools.
+
+Usage:
+    python serve.py serve --port 8000 --workers 4 --threads 8
+    python serve.py serve --app flask_app:app --keep-alive 5 --access-log
+    python serve.py bench --requests 20000 --concurrency 16 --workers 2
+    python serve.py bench --url http://127.0.0.1:8000 --names Alice Bob
+    python serve.py bench --stack asgi --concurrency 256
+
+``serve`` binds the listening socket in the parent process, then forks
+``--workers`` children that all accept on it, so the kernel spreads
+connections between them. A child that dies is replaced. Each worker runs
+requests on a fixed pool of ``--threads`` threads and keeps HTTP/1.1
+connections open for ``--keep-alive`` idle seconds; idle connections wait
+in a selector rather than on a pool thread. On SIGTERM or SIGINT the
+workers stop accepting, close idle connections and finish in-flight
+requests; any still running after ``--graceful-timeout`` seconds are killed.
+Each worker has its own caches and /metrics counters.
+
+``bench`` sends GET /api/greet/<name> requests over keep-alive
+``http.client`` connections, one per client thread, and reports
+requests per second and latency percentiles. Without ``--url`` it starts
+a server on a free local port first and stops it afterwards: this one by
+default, or with ``--stack asgi`` asgi_server.py running asgi_app.
+"""
+
+import argparse
+import http.client
+import importlib
+import io
+import os
+import selectors
+import signal
+import socket
+import socketserver
+import subprocess
+import sys
+import threading
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler
+from urllib.parse import quote, unquote, urlsplit
+from wsgiref.handlers import SimpleHandler
+
+from werkzeug.serving import DechunkedInput
+from werkzeug.wsgi import LimitedStream
+
+from benchmark import percentile
+
+# Names the load benchmark cycles through
+NAMES = ("Alice", "Bob", "Carol", "David")
+# Seconds a pool thread waits for the next request on a keep-alive
+# connection before handing it to the idle thread. Clients sending requests
+# back to back keep their thread; idle ones hold it no longer than this.
+IDLE_POLL_SECONDS = 0.002
+
+
+class _ServerHandler(SimpleHandler):
+    """wsgiref handler writing HTTP/1.1 responses for KeepAliveRequestHandler."""
+
+    http_version = "1.1"
+    os_environ = {}  # unlike CGI, requests do not inherit the process environment
+
+    def __init__(self, request_handler, stdin, environ):
+        super().__init__(
+            stdin,
+            request_handler.wfile,
+            sys.stderr,
+            environ,
+            multithread=True,
+            multiprocess=request_handler.server.multiprocess,
+        )
+        self.request_handler = request_handler
+
+    def cleanup_headers(self):
+        super().cleanup_headers()
+        # Without a Content-Length the body ends when the connection closes
+        framed = (
+            "Content-Length" in self.headers
+            or self.status[:3] in ("204", "304")
+            or self.environ["REQUEST_METHOD"] == "HEAD"
+        )
+        if not framed or self.request_handler.close_connection:
+            self.request_handler.close_connection = True
+            self.headers["Connection"] = "close"
+
+    def close(self):
+        try:
+            code = self.status.split(" ", 1)[0]
+            self.request_handler.log_request(code, self.bytes_sent)
+        finally:
+            super().close()
+
+
+class KeepAliveRequestHandler(BaseHTTPRequestHandler):
+    """
+    Runs a WSGI app for each request on an HTTP/1.1 keep-alive connection.
+
+    A connection is closed when the client asks for it, after HTTP/1.0
+    requests and chunked request bodies, after a response without a
+    Content-Length, once the server is draining, or when a request stalls
+    for ``timeout`` seconds. The unread rest of a request body is discarded
+    so the next request starts at the right place. (Werkzeug's development
+    handler closes every connection, waiting 10 ms after each response to
+    drain the socket.)
+
+    When no further request has arrived after a response, ``handle``
+    returns with ``idle`` set and the connection left open; the server
+    waits for it to become readable and then calls ``resume``.
+    """
+
+    protocol_version = "HTTP/1.1"
+    server_version = "serve.py"
+    wbufsize = io.DEFAULT_BUFFER_SIZE  # status line and headers in one write
+    access_log = False
+    idle = False
+
+    def setup(self):
+        super().setup()
+        self.server.track(self.connection)
+
+    def handle(self):
+        self.idle = False
+        while True:
+            self.handle_one_request()
+            if self.close_connection:
+                return
+            if not self._request_waiting():
+                self.idle = True
+                return
+
+    def resume(self):
+        """Serve the requests that arrived on an idle connection."""
+        try:
+            self.handle()
+        finally:
+            self.finish()
+
+    def finish(self):
+        if self.idle:
+            return  # the server keeps the connection until it is readable
+        self.server.untrack(self.connection)
+        super().finish()
+
+    def close(self):
+        """Close an idle connection's files; the server closes the socket."""
+        self.idle = False
+        self.finish()
+
+    def _request_waiting(self):
+        """
+        Return True if the next request arrives within IDLE_POLL_SECONDS.
+
+        Bytes already buffered in ``rfile`` count, and so do end of file and
+        socket errors, which handle_one_request then closes the connection on.
+        """
+        self.connection.settimeout(0)
+        try:
+            if self.rfile.peek(1):
+                return True
+            self.connection.settimeout(IDLE_POLL_SECONDS)
+            self.connection.recv(1, socket.MSG_PEEK)
+            return True
+        except TimeoutError:
+            return False
+        except OSError:
+            return True
+        finally:
+            self.connection.settimeout(self.timeout)
+
+    def handle_one_request(self):
+        try:
+            self.raw_requestline = self.rfile.readline(65537)
+        except (TimeoutError, ConnectionError):
+            self.close_connection = True
+            return
+        if len(self.raw_requestline) > 65536:
+            self.requestline = self.request_version = self.command = ""
+            self.send_error(HTTPStatus.REQUEST_URI_TOO_LONG)
+            return
+        if not self.raw_requestline:
+            self.close_connection = True
+            return
+        if not self.parse_request():
+            return
+        if self.request_version != "HTTP/1.1" or self.server.draining:
+            self.close_connection = True
+
+        if "Transfer-Encoding" in self.headers:
+            body = DechunkedInput(self.rfile)
+            self.close_connection = True
+        else:
+            try:
+                length = int(self.headers.get("Content-Length") or 0)
+            except ValueError:
+                self.send_error(HTTPStatus.BAD_REQUEST, "Bad Content-Length")
+                return
+            body = LimitedStream(self.rfile, length)
+        try:
+            _ServerHandler(self, body, self.get_environ()).run(self.server.app)
+            if not self.close_connection:
+                body.exhaust()
+            self.wfile.flush()
+        except (TimeoutError, ConnectionError):
+            self.close_connection = True
+
+    def get_environ(self):
+        """Return the CGI variables of the WSGI environ for this request."""
+        path, _, query = self.path.partition("?")
+        environ = {
+            "REQUEST_METHOD": self.command,
+            "SCRIPT_NAME": "",
+            "PATH_INFO": unquote(path, "iso-8859-1"),
+            "QUERY_STRING": query,
+            "SERVER_NAME": self.server.server_name,
+            "SERVER_PORT": str(self.server.server_port),
+            "SERVER_PROTOCOL": self.request_version,
+            "REMOTE_ADDR": self.client_address[0],
+            "REMOTE_PORT": str(self.client_address[1]),
+        }
+        for key, value in self.headers.items():
+            key = key.upper().replace("-", "_")
+            if key not in ("CONTENT_TYPE", "CONTENT_LENGTH"):
+                key = "HTTP_" + key
+            if key in environ:
+                value = f"{environ[key]},{value}"
+            environ[key] = value
+        return environ
+
+    def log_request(self, code="-", size="-"):
+        if self.access_log:
+            super().log_request(code, size)
+
+
+class PooledWSGIServer(socketserver.TCPServer):
+    """
+    WSGI server on an already listening socket, with a fixed thread pool.
+
+    Unlike a threading server, which starts a thread per connection, at
+    most ``threads`` requests are served at once; later ones wait in the
+    pool's queue. Connections waiting for their next request hold no pool
+    thread: an ``http-idle`` thread watches them with a selector, hands a
+    connection to the pool once it is readable and closes it after
+    ``keep_alive`` idle seconds.
+    """
+
+    multiprocess = False
+
+    def __init__(self, listener, app, threads=8, keep_alive=5.0, access_log=False):
+        handler = type(
+            "RequestHandler",
+            (KeepAliveRequestHandler,),
+            {"timeout": keep_alive, "access_log": access_log},
+        )
+        super().__init__(listener.getsockname(), handler, bind_and_activate=False)
+        self.socket.close()
+        self.socket = listener
+        self.server_name = socket.getfqdn(self.server_address[0])
+        self.server_port = self.server_address[1]
+        self.app = app
+        self.keep_alive = keep_alive
+        self.draining = False
+        self._pool = ThreadPoolExecutor(threads, thread_name_prefix="http")
+        self._connections = set()
+        self._lock = threading.Lock()
+        # Connections parked since the idle thread last looked, and its wakeup
+        self._parked = []
+        self._stopping = False
+        self._wakeup, self._waker = socket.socketpair()
+        self._wakeup.setblocking(False)
+        self._waker.setblocking(False)
+        self._idle_thread = threading.Thread(
+            target=self._watch_idle, name="http-idle", daemon=True
+        )
+        self._idle_thread.start()
+
+    def process_request(self, request, client_address):
+        # A new connection waits for its first request like an idle one
+        if not self._park(request, client_address, None):
+            self.shutdown_request(request)
+
+    def _process_request(self, request, client_address, handler):
+        """Serve a readable connection until it closes or goes idle again."""
+        try:
+            if handler is None:
+                handler = self.RequestHandlerClass(request, client_address, self)
+            else:
+                handler.resume()
+        except Exception:
+            self.handle_error(request, client_address)
+        else:
+            if handler.idle:
+                if self._park(request, client_address, handler):
+                    return
+                handler.close()
+        self.shutdown_request(request)
+
+    def _park(self, request, client_address, handler):
+        """Hand a connection to the idle thread; False once it has stopped."""
+        with self._lock:
+            if self._stopping:
+                return False
+            self._parked.append((request, client_address, handler))
+        self._wake()
+        return True
+
+    def _wake(self):
+        try:
+            self._waker.send(b"\0")
+        except BlockingIOError:
+            pass  # the idle thread has wakeups pending already
+
+    def _close_idle(self, request, handler):
+        if handler is not None:
+            handler.close()
+        self.shutdown_request(request)
+
+    def _watch_idle(self):
+        """Wait on idle connections, then serve or close each one."""
+        idle = {}  # socket -> (client_address, handler, deadline), oldest first
+        with selectors.DefaultSelector() as selector:
+            selector.register(self._wakeup, selectors.EVENT_READ)
+            while True:
+                with self._lock:
+                    parked, self._parked = self._parked, []
+                    stopping = self._stopping
+                now = time.monotonic()
+                for request, client_address, handler in parked:
+                    selector.register(request, selectors.EVENT_READ)
+                    idle[request] = (client_address, handler, now + self.keep_alive)
+                if stopping:
+                    break
+
+                timeout = None
+                for request, (_, handler, deadline) in list(idle.items()):
+                    if deadline > now:
+                        timeout = deadline - now
+                        break
+                    selector.unregister(request)
+                    del idle[request]
+                    self._close_idle(request, handler)
+
+                for key, _ in selector.select(timeout):
+                    if key.fileobj is self._wakeup:
+                        try:
+                            while self._wakeup.recv(4096):
+                                pass
+                        except BlockingIOError:
+                            pass
+                        continue
+                    selector.unregister(key.fileobj)
+                    client_address, handler, _ = idle.pop(key.fileobj)
+                    self._pool.submit(
+                        self._process_request, key.fileobj, client_address, handler
+                    )
+        for request, (_, handler, _) in idle.items():
+            self._close_idle(request, handler)
+
+    def _stop_watching(self):
+        """Close the idle connections and stop the idle thread."""
+        with self._lock:
+            self._stopping = True
+        self._wake()
+        self._idle_thread.join()
+
+    def track(self, connection):
+        with self._lock:
+            self._connections.add(connection)
+            draining = self.draining
+        if draining:
+            self._stop_reading(connection)
+
+    def untrack(self, connection):
+        with self._lock:
+            self._connections.discard(connection)
+
+    @staticmethod
+    def _stop_reading(connection):
+        """End a connection after its current response."""
+        try:
+            connection.shutdown(socket.SHUT_RD)
+        except OSError:
+            pass
+
+    def drain(self):
+        """
+        Stop accepting and wait until every connection is finished.
+
+        Call from a thread other than the one running ``serve_forever``.
+        Idle connections are closed. Reads on busy connections are shut
+        down, so they close after their current request instead of going
+        idle.
+        """
+        self.shutdown()
+        with self._lock:
+            self.draining = True
+            connections = list(self._connections)
+        for connection in connections:
+            self._stop_reading(connection)
+        self._stop_watching()
+        self._pool.shutdown(wait=True)
+
+    def server_close(self):
+        if self._idle_thread.is_alive():
+            self._stop_watching()
+        super().server_close()
+        self._wakeup.close()
+        self._waker.close()
+
+
+def load_app(spec):
+    """Import a WSGI app given as ``module:attribute``."""
+    module, _, attribute = spec.partition(":")
+    return getattr(importlib.import_module(module), attribute or "app")
+
+
+def run_worker(listener, app, threads, keep_alive, access_log, multiprocess=False):
+    """Serve ``app`` on the shared ``listener`` socket until SIGTERM or SIGINT."""
+    server = PooledWSGIServer(listener, app, threads, keep_alive, access_log)
+    server.multiprocess = multiprocess
+    # serve_forever runs in this thread, so the drain must run in another
+    drainer = threading.Thread(target=server.drain)
+
+    def stop(signum, frame):
+        if drainer.ident is None:
+            drainer.start()
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    try:
+        server.serve_forever()
+    finally:
+        if drainer.ident is None:
+            drainer.start()
+        drainer.join()
+        server.server_close()
+
+
+def serve(
+    app,
+    host="127.0.0.1",
+    port=5000,
+    workers=2,
+    threads=8,
+    keep_alive=5.0,
+    graceful_timeout=30.0,
+    access_log=False,
+    backlog=1024,
+    log=print,
+):
+    """
+    Run the pre-fork server until SIGTERM or SIGINT.
+
+    Returns:
+        int: Process exit code
+    """
+    listener = socket.create_server((host, port), backlog=backlog)
+    host, port = listener.getsockname()[:2]
+    log(f"Listening on http://{host}:{port} ({workers} workers x {threads} threads)")
+
+    if workers <= 1 or not hasattr(os, "fork"):
+        run_worker(listener, app, threads, keep_alive, access_log)
+        return 0
+
+    children = {}  # pid -> start time
+    stopping = threading.Event()
+
+    def spawn():
+        pid = os.fork()
+        if pid == 0:
+            code = 0
+            try:
+                run_worker(listener, app, threads, keep_alive, access_log, True)
+            except BaseException:
+                traceback.print_exc()
+                code = 1
+            finally:
+                os._exit(code)
+        children[pid] = time.monotonic()
+
+    def kill_remaining():
+        for pid in list(children):
+            try:
+                os.kill(pid, signal.SIGKILL)
+            except ProcessLookupError:
+                pass
+
+    def stop(signum, frame):
+        if stopping.is_set():
+            return
+        stopping.set()
+        log("Shutting down: finishing in-flight requests")
+        for pid in list(children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+        timer = threading.Timer(graceful_timeout, kill_remaining)
+        timer.daemon = True
+        timer.start()
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    for _ in range(workers):
+        spawn()
+
+    exit_code = 0
+    while children:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        started = children.pop(pid, None)
+        if started is None:
+            continue
+        if stopping.is_set():
+            if os.waitstatus_to_exitcode(status) != 0:
+                exit_code = 1
+        else:
+            log(f"Worker {pid} exited with status {status}; restarting")
+            if time.monotonic() - started < 1:
+                time.sleep(1)  # do not spin on a worker that crashes at start
+            spawn()
+    listener.close()
+    return exit_code
+
+
+def bench(url, names=NAMES, requests=10_000, concurrency=8, timeout=10.0):
+    """
+    Load-test GET /api/greet/<name> on the server at ``url``.
+
+    Each of ``concurrency`` threads sends its share of ``requests`` over one
+    keep-alive connection, cycling through ``names``.
+
+    Returns:
+        dict: ok and error counts, seconds, req_per_s and p50/p90/p99 in ms
+    """
+    parts = urlsplit(url)
+    paths = [f"/api/greet/{quote(name)}" for name in names]
+    latencies = [[] for _ in range(concurrency)]
+    errors = [0] * concurrency
+    ready = threading.Barrier(concurrency + 1)
+
+    def client(n):
+        count = requests // concurrency + (n < requests % concurrency)
+        conn = http.client.HTTPConnection(parts.hostname, parts.port, timeout=timeout)
+        ready.wait()
+        for i in range(count):
+            path = paths[(n + i) % len(paths)]
+            start = time.perf_counter()
+            try:
+                conn.request("GET", path)
+                response = conn.getresponse()
+                response.read()
+                ok = response.status == 200
+            except (OSError, http.client.HTTPException):
+                conn.close()
+                ok = False
+            if ok:
+                latencies[n].append(time.perf_counter() - start)
+            else:
+                errors[n] += 1
+        conn.close()
+
+    threads = [threading.Thread(target=client, args=(n,)) for n in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    ready.wait()
+    start = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    seconds = time.perf_counter() - start
+
+    samples = [latency for per_thread in latencies for latency in per_thread]
+    result = {"ok": len(samples), "errors": sum(errors), "seconds": seconds}
+    result["req_per_s"] = len(samples) / seconds if seconds else 0.0
+    for name, fraction in (("p50_ms", 0.50), ("p90_ms", 0.90), ("p99_ms", 0.99)):
+        result[name] = percentile(samples, fraction) * 1e3 if samples else None
+    return result
+
+
+def _start_local_server(args):
+    """Start a server on a free port in a subprocess; return (process, url)."""
+    here = os.path.dirname(os.path.abspath(__file__))
+    if args.stack == "asgi":
+        command = [
+            sys.executable, os.path.join(here, "asgi_server.py"),
+            "--app", args.app or "asgi_app:app", "--port", "0",
+        ]  # fmt: skip
+    else:
+        command = [
+            sys.executable, os.path.join(here, "serve.py"), "serve",
+            "--app", args.app or "flask_app:app", "--port", "0",
+            "--workers", str(args.workers), "--threads", str(args.threads),
+        ]  # fmt: skip
+    process = subprocess.Popen(command, stdout=subprocess.PIPE, text=True)
+    line = process.stdout.readline()
+    if not line.startswith("Listening on "):
+        process.kill()
+        raise RuntimeError(f"Server did not start: {line!r}")
+    return process, line.split()[2]
+
+
+def main(argv=None):
+    """Command-line entry point; returns the process exit code."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    serve_cmd = commands.add_parser("serve", help="run the pre-fork server")
+    serve_cmd.add_argument("--app", default="flask_app:app", help="module:attribute")
+    serve_cmd.add_argument("--host", default="127.0.0.1")
+    serve_cmd.add_argument("--port", type=int, default=5000)
+    serve_cmd.add_argument("--keep-alive", type=float, default=5.0, help="idle seconds")
+    serve_cmd.add_argument("--graceful-timeout", type=float, default=30.0)
+    serve_cmd.add_argument("--backlog", type=int, default=1024)
+    serve_cmd.add_argument("--access-log", action="store_true")
+
+    bench_cmd = commands.add_parser("bench", help="load-test /api/greet/<name>")
+    bench_cmd.add_argument("--url", help="server to test (default: start one)")
+    bench_cmd.add_argument("--requests", type=int, default=10_000)
+    bench_cmd.add_argument("--concurrency", type=int, default=8)
+    bench_cmd.add_argument("--names", nargs="+", default=list(NAMES))
+    bench_cmd.add_argument(
+        "--stack",
+        choices=("wsgi", "asgi"),
+        default="wsgi",
+        help="start serve.py with flask_app, or asgi_server.py with asgi_app",
+    )
+    bench_cmd.add_argument("--app", help="module:attribute (default: the stack's app)")
+
+    for command in (serve_cmd, bench_cmd):
+        command.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+        command.add_argument("--threads", type=int, default=8)
+
+    args = parser.parse_args(argv)
+
+    if args.command == "serve":
+        app = load_app(args.app)
+        return serve(
+            app,
+            args.host,
+            args.port,
+            args.workers,
+            args.threads,
+            args.keep_alive,
+            args.graceful_timeout,
+            args.access_log,
+            args.backlog,
+            log=lambda message: print(message, flush=True),
+        )
+
+    process = None
+    url = args.url
+    if url is None:
+        process, url = _start_local_server(args)
+    try:
+        result = bench(url, args.names, args.requests, args.concurrency)
+    finally:
+        if process is not None:
+            process.send_signal(signal.SIGTERM)
+            process.wait(timeout=30)
+    summary = (
+        f"{result['ok']} requests in {result['seconds']:.2f}s "
+        f"({result['errors']} errors): {result['req_per_s']:.0f} req/s"
+    )
+    if result["ok"]:
+        summary += (
+            f", p50 {result['p50_ms']:.2f} ms, p90 {result['p90_ms']:.2f} ms, "
+            f"p99 {result['p99_ms']:.2f} ms"
+        )
+    print(summary)
+    return 1 if result["errors"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,187 @@
+"""Benchmarks for TaskManager and its storage engines.
+
+The ``register``-ed benchmarks below are run through the harness, e.g.
+``python benchmark.py run task_benchmarks -o results.json``. The ``add_*``
+benchmarks build a store of ``size`` tasks, so their ``peak_bytes`` tracks
+the memory a store of that size needs. ``save_<format>``/``load_<format>``
+time each task file format and ``mmap_open_find`` a single lookup in a
+memory-mapped binary file. ``search_*`` time search_tasks queries.
+
+Run ``python task_benchmarks.py`` to print the memory held per task by dict
+records, by the ``__slots__`` records MemoryStorage uses, and by a whole
+MemoryStorage including its indexes.
+"""
+
+import gc
+import os
+import random
+import tempfile
+import tracemalloc
+
+from benchmark import register
+from task_formats import EXTENSIONS, TaskFile
+from task_storage import MemoryStorage, SQLiteStorage, _TaskRecord
+from tasks import TaskManager
+
+STORAGES = {"memory": MemoryStorage, "sqlite": SQLiteStorage}
+FORMAT_EXTENSIONS = {"json": ".json", **{f: e for e, f in EXTENSIONS.items()}}
+# Task files written by the save/load benchmarks; removed at exit
+TEMP_DIR = tempfile.TemporaryDirectory()
+
+
+def task_batch(size):
+    """Return ``size`` (description, priority) pairs with mixed priorities."""
+    return [(f"Task {i}", i % 10) for i in range(size)]
+
+
+def filled_manager(storage, size):
+    """Return a TaskManager on a new ``storage`` engine holding ``size`` tasks."""
+    manager = TaskManager(storage=STORAGES[storage]())
+    manager.add_tasks(task_batch(size))
+    return manager
+
+
+@register("add_memory")
+def bench_add_memory(size):
+    """Bulk-add ``size`` tasks to an empty in-memory store."""
+    batch = task_batch(size)
+    return lambda: TaskManager().add_tasks(batch)
+
+
+@register("add_sqlite")
+def bench_add_sqlite(size):
+    """Bulk-add ``size`` tasks to an empty in-memory SQLite database."""
+    batch = task_batch(size)
+    return lambda: TaskManager(storage=SQLiteStorage()).add_tasks(batch)
+
+
+@register("list_priority_page")
+def bench_list_priority_page(size):
+    """Fetch a 50-task page from the middle of the priority view."""
+    manager = filled_manager("memory", size)
+    return lambda: manager.list_tasks(sort_by="priority", limit=50, offset=size // 2)
+
+
+@register("list_all")
+def bench_list_all(size):
+    """Materialize every task, including completed ones, as dicts."""
+    manager = filled_manager("memory", size)
+    manager.complete_tasks(range(1, size + 1, 2))
+    return lambda: manager.list_tasks(show_completed=True)
+
+
+def search_manager(size, seed=0):
+    """Return a TaskManager holding ``size`` tasks named with 3 of 2000 words."""
+    rng = random.Random(seed)
+    words = [f"word{i}" for i in range(2_000)]
+    manager = TaskManager()
+    manager.add_tasks(
+        f"{rng.choice(words)} {rng.choice(words)} {rng.choice(words)} item{i}"
+        for i in range(size)
+    )
+    return manager
+
+
+@register("search_word")
+def bench_search_word(size):
+    """Search for one word held by about 0.15% of the tasks."""
+    manager = search_manager(size)
+    return lambda: manager.search_tasks("word17")
+
+
+@register("search_two_words")
+def bench_search_two_words(size):
+    """Search for tasks holding two given words."""
+    manager = search_manager(size)
+    return lambda: manager.search_tasks("word17 word42")
+
+
+@register("search_prefix")
+def bench_search_prefix(size):
+    """Prefix search returning the first page of matches."""
+    manager = search_manager(size)
+    return lambda: manager.search_tasks("word17 item1", prefix=True, limit=50)
+
+
+def saved_file(file_format, size):
+    """Save ``size`` tasks in ``file_format`` under TEMP_DIR; return the path."""
+    filename = os.path.join(
+        TEMP_DIR.name, f"tasks_{size}{FORMAT_EXTENSIONS[file_format]}"
+    )
+    if not os.path.exists(filename):
+        filled_manager("memory", size).save_to_file(filename)
+    return filename
+
+
+def _register_format(file_format):
+    """Register save_<format> and load_<format> benchmarks."""
+
+    @register(f"save_{file_format}")
+    def bench_save(size):
+        filename = os.path.join(TEMP_DIR.name, "save" + FORMAT_EXTENSIONS[file_format])
+        manager = filled_manager("memory", size)
+        return lambda: manager.save_to_file(filename)
+
+    @register(f"load_{file_format}")
+    def bench_load(size):
+        filename = saved_file(file_format, size)
+        return lambda: TaskManager().load_from_file(filename)
+
+
+for _file_format in FORMAT_EXTENSIONS:
+    _register_format(_file_format)
+
+
+@register("mmap_open_find")
+def bench_mmap_open_find(size):
+    """Open a binary task file and look up its middle task by ID."""
+    filename = saved_file("binary", size)
+
+    def open_find():
+        with TaskFile(filename) as task_file:
+            return task_file.find(size // 2)
+
+    return open_find
+
+
+def retained_bytes(build):
+    """Return the traced memory still held by the object ``build()`` returns."""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        kept = build()
+        after = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    del kept
+    return after - before
+
+
+def memory_per_task(sizes=(10_000, 100_000, 1_000_000)):
+    """Print retained bytes per task for each task representation.
+
+    Descriptions are built inside each measurement, so every column includes
+    their strings.
+    """
+    layouts = {
+        "dict records": lambda size: {
+            i: {"description": d, "priority": p, "completed": False, "id": i}
+            for i, (d, p) in enumerate(task_batch(size), 1)
+        },
+        "slot records": lambda size: {
+            i: _TaskRecord(d, p, False, i)
+            for i, (d, p) in enumerate(task_batch(size), 1)
+        },
+        "MemoryStorage": lambda size: filled_manager("memory", size),
+    }
+    print(f"{'tasks':>10}" + "".join(f"{name:>16}" for name in layouts))
+    for size in sizes:
+        cells = (
+            retained_bytes(lambda: build(size)) / size for build in layouts.values()
+        )
+        print(f"{size:>10}" + "".join(f"{bytes_:16.1f}" for bytes_ in cells))
+
+
+if __name__ == "__main__":
+    memory_per_task()
@@ -0,0 +1,191 @@
+"""
+Thread-safe and asyncio-facing wrappers around TaskManager.
+
+TaskManager itself is not safe to share between threads: a mutation updates
+several indexes in turn, and ``_next_id`` is read and bumped in separate
+steps. ConcurrentTaskManager puts every public method behind a
+reader-writer lock. Reads (listing and search) run in parallel, and
+mutations, including ID allocation, run one at a time. AsyncTaskManager
+runs those methods in an executor so coroutines can await them without
+blocking the event loop.
+"""
+
+import asyncio
+import functools
+import threading
+from contextlib import contextmanager
+
+from tasks import TaskManager
+
+# Methods that only read tasks. save_to_file is not one of them: two saves
+# to the same file would share its temporary file.
+READ_METHODS = ("list_tasks", "search_tasks")
+WRITE_METHODS = (
+    "add_task",
+    "add_tasks",
+    "remove_task",
+    "remove_tasks",
+    "complete_task",
+    "complete_tasks",
+    "edit_task",
+    "edit_tasks",
+    "next_task",
+    "clear_tasks",
+    "open_journal",
+    "compact_journal",
+    "close_journal",
+    "save_to_file",
+    "load_from_file",
+)
+
+
+class RWLock:
+    """
+    Reader-writer lock: many readers or one writer at a time.
+
+    Writers take priority. Once a writer is waiting, new readers queue
+    behind it, so a steady stream of reads cannot starve mutations. The
+    write lock is reentrant for the thread holding it, which may also take
+    the read lock. A reader cannot upgrade to the write lock.
+    """
+
+    def __init__(self):
+        self._cond = threading.Condition(threading.Lock())
+        self._readers = 0
+        self._writers_waiting = 0
+        self._writer = None  # ident of the thread holding the write lock
+        self._write_depth = 0
+
+    def acquire_read(self):
+        with self._cond:
+            if self._writer == threading.get_ident():
+                self._write_depth += 1
+                return
+            while self._writer is not None or self._writers_waiting:
+                self._cond.wait()
+            self._readers += 1
+
+    def release_read(self):
+        with self._cond:
+            if self._writer == threading.get_ident():
+                self._write_depth -= 1
+                return
+            self._readers -= 1
+            if not self._readers:
+                self._cond.notify_all()
+
+    def acquire_write(self):
+        me = threading.get_ident()
+        with self._cond:
+            if self._writer == me:
+                self._write_depth += 1
+                return
+            self._writers_waiting += 1
+            try:
+                while self._writer is not None or self._readers:
+                    self._cond.wait()
+            finally:
+                self._writers_waiting -= 1
+            self._writer = me
+            self._write_depth = 1
+
+    def release_write(self):
+        with self._cond:
+            self._write_depth -= 1
+            if not self._write_depth:
+                self._writer = None
+                self._cond.notify_all()
+
+    @contextmanager
+    def read_locked(self):
+        """Hold the read lock for the duration of a ``with`` block."""
+        self.acquire_read()
+        try:
+            yield
+        finally:
+            self.release_read()
+
+    @contextmanager
+    def write_locked(self):
+        """Hold the write lock for the duration of a ``with`` block."""
+        self.acquire_write()
+        try:
+            yield
+        finally:
+            self.release_write()
+
+
+class ConcurrentTaskManager(TaskManager):
+    """
+    TaskManager whose public methods are safe to call from many threads.
+
+    READ_METHODS hold the read lock and WRITE_METHODS the write lock. A
+    storage engine that cannot serve concurrent reads (``concurrent_reads``
+    is false) gets the write lock for reads too.
+    """
+
+    def __init__(self, storage=None):
+        super().__init__(storage)
+        self._lock = RWLock()
+        if getattr(self._storage, "concurrent_reads", False):
+            self._read_locked = self._lock.read_locked
+        else:
+            self._read_locked = self._lock.write_locked
+
+
+def _read_method(method):
+    @functools.wraps(method)
+    def locked(self, *args, **kwargs):
+        with self._read_locked():
+            return method(self, *args, **kwargs)
+
+    return locked
+
+
+def _write_method(method):
+    @functools.wraps(method)
+    def locked(self, *args, **kwargs):
+        with self._lock.write_locked():
+            return method(self, *args, **kwargs)
+
+    return locked
+
+
+for _name in READ_METHODS:
+    setattr(ConcurrentTaskManager, _name, _read_method(getattr(TaskManager, _name)))
+for _name in WRITE_METHODS:
+    setattr(ConcurrentTaskManager, _name, _write_method(getattr(TaskManager, _name)))
+
+
+class AsyncTaskManager:
+    """
+    Asyncio facade over a ConcurrentTaskManager.
+
+    Every method of READ_METHODS and WRITE_METHODS is available as a
+    coroutine with the same arguments and result, e.g.
+    ``await tasks.add_task("Write report", priority=2)``. Calls run in
+    ``executor`` (the loop's default executor when None), so journal
+    fsyncs and file I/O do not block the event loop.
+    """
+
+    def __init__(self, manager=None, executor=None):
+        self.manager = ConcurrentTaskManager() if manager is None else manager
+        self._executor = executor
+
+    async def _call(self, name, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        method = functools.partial(getattr(self.manager, name), *args, **kwargs)
+        return await loop.run_in_executor(self._executor, method)
+
+
+def _async_method(name):
+    async def method(self, *args, **kwargs):
+        return await self._call(name, *args, **kwargs)
+
+    method.__name__ = method.__qualname__ = name
+    method.__doc__ = getattr(TaskManager, name).__doc__
+    return method
+
+
+for _name in READ_METHODS + WRITE_METHODS:
+    setattr(AsyncTaskManager, _name, _async_method(_name))
@@ -0,0 +1,226 @@
+"""
+File formats for TaskManager snapshots.
+
+``json``
+    One JSON array of task dicts (the original format), parsed in one go.
+``jsonl``
+    One compact JSON task dict per line, read back in chunks of lines.
+``binary``
+    A struct-packed layout read through ``mmap``; see TaskFile.
+
+The format is picked by the ``file_format`` argument, or else by the file
+extension (``.jsonl``/``.ndjson`` and ``.tasks``), falling back to ``json``.
+Readers yield task dicts lazily, so a storage engine can load a file without
+holding the parsed list in memory.
+"""
+
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+
+FORMATS = ("json", "jsonl", "binary")
+EXTENSIONS = {".jsonl": "jsonl", ".ndjson": "jsonl", ".tasks": "binary"}
+
+# Bytes of ``jsonl`` lines parsed per json.loads call when reading
+JSONL_CHUNK_BYTES = 1 << 20
+_encode_line = json.JSONEncoder(separators=(",", ":"), ensure_ascii=False).encode
+
+# magic, version, task count, offset of the record-offset index
+_HEADER = struct.Struct("<4sHQQ")
+_MAGIC = b"TASK"
+_VERSION = 2
+# Version 1 files have the same record layout, with only _COMPLETED in flags
+_READABLE_VERSIONS = (1, 2)
+# id, priority, flags, UTF-8 description length; the description follows.
+# The priority is an int64, or a double when flags has _FLOAT_PRIORITY set.
+_RECORD = struct.Struct("<qqBI")
+_FLOAT_RECORD = struct.Struct("<qdBI")
+_COMPLETED = 1
+_FLOAT_PRIORITY = 2
+
+
+def detect_format(filename, file_format=None):
+    """
+    Return the format for ``filename``.
+
+    Raises:
+        ValueError: If ``file_format`` is not one of FORMATS
+    """
+    if file_format is None:
+        return EXTENSIONS.get(os.path.splitext(filename)[1].lower(), "json")
+    if file_format not in FORMATS:
+        raise ValueError(f"Unknown task file format: {file_format!r}")
+    return file_format
+
+
+def write_tasks(filename, tasks, file_format):
+    """
+    Write ``tasks`` to ``filename`` in ``file_format`` and fsync it.
+
+    Returns:
+        int: Number of tasks written
+    """
+    if file_format == "binary":
+        with open(filename, "wb") as f:
+            count = _write_binary(f, tasks)
+            f.flush()
+            os.fsync(f.fileno())
+        return count
+
+    with open(filename, "w", encoding="utf-8") as f:
+        if file_format == "jsonl":
+            count = 0
+            for task in tasks:
+                f.write(_encode_line(task) + "\n")
+                count += 1
+        else:
+            tasks = list(tasks)
+            # One C-encoded string is several times faster than json.dump's
+            # chunked writes
+            f.write(json.dumps(tasks))
+            count = len(tasks)
+        f.flush()
+        os.fsync(f.fileno())
+    return count
+
+
+def read_tasks(filename, file_format):
+    """
+    Yield the task dicts stored in ``filename``.
+
+    ``binary`` files are decoded one record at a time and ``jsonl`` files in
+    chunks of about JSONL_CHUNK_BYTES, each parsed by one json.loads call as
+    a JSON array. A ``json`` file has to be parsed whole before the first
+    task is yielded.
+    """
+    if file_format == "binary":
+        with TaskFile(filename) as task_file:
+            yield from task_file
+    elif file_format == "jsonl":
+        with open(filename, "r", encoding="utf-8") as f:
+            while lines := f.readlines(JSONL_CHUNK_BYTES):
+                yield from json.loads(
+                    "[" + ",".join(line for line in lines if line.strip()) + "]"
+                )
+    else:
+        with open(filename, "r") as f:
+            yield from json.load(f)
+
+
+def _write_binary(f, tasks):
+    """Write the binary layout to the binary file ``f``; return the task count."""
+    f.write(_HEADER.pack(_MAGIC, _VERSION, 0, 0))
+    offsets = array("Q")
+    position = _HEADER.size
+    for task in tasks:
+        description = task["description"].encode("utf-8")
+        priority = task["priority"]
+        flags = _COMPLETED if task["completed"] else 0
+        record = _RECORD
+        if isinstance(priority, float):
+            flags |= _FLOAT_PRIORITY
+            record = _FLOAT_RECORD
+        offsets.append(position)
+        f.write(record.pack(task["id"], priority, flags, len(description)))
+        f.write(description)
+        position += _RECORD.size + len(description)
+
+    if sys.byteorder != "little":
+        offsets.byteswap()
+    f.write(offsets.tobytes())
+    f.seek(0)
+    f.write(_HEADER.pack(_MAGIC, _VERSION, len(offsets), position))
+    return len(offsets)
+
+
+class TaskFile:
+    """
+    Read-only, memory-mapped view of a binary task file.
+
+    The file starts with a header holding the task count and the position
+    of an index of record offsets at its end. Opening only reads the
+    header, so a file of any size opens in constant time and the OS pages in
+    just the records that are touched. ``task_file[i]`` decodes the i-th task
+    (in ID order), ``find`` looks a task up by ID with a binary search over
+    the index, and iteration decodes records sequentially.
+    """
+
+    def __init__(self, filename):
+        """Map ``filename`` and check its header."""
+        self._file = open(filename, "rb")
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            magic, version, count, index_offset = _HEADER.unpack_from(self._map)
+            if magic != _MAGIC or version not in _READABLE_VERSIONS:
+                raise ValueError(f"{filename} is not a binary task file")
+            if index_offset + 8 * count > len(self._map):
+                raise ValueError(f"{filename} is truncated")
+        except Exception:
+            self.close()
+            raise
+        self._count = count
+        self._index_offset = index_offset
+
+    def __len__(self):
+        return self._count
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _offset(self, i):
+        """Return the file position of record ``i``."""
+        return struct.unpack_from("<Q", self._map, self._index_offset + 8 * i)[0]
+
+    def _decode(self, position):
+        """Decode the record at ``position``; return it and the next position."""
+        task_id, priority, flags, length = _RECORD.unpack_from(self._map, position)
+        if flags & _FLOAT_PRIORITY:
+            priority = _FLOAT_RECORD.unpack_from(self._map, position)[1]
+        start = position + _RECORD.size
+        task = {
+            "description": self._map[start : start + length].decode("utf-8"),
+            "priority": priority,
+            "completed": bool(flags & _COMPLETED),
+            "id": task_id,
+        }
+        return task, start + length
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += self._count
+        if not 0 <= i < self._count:
+            raise IndexError("task index out of range")
+        return self._decode(self._offset(i))[0]
+
+    def __iter__(self):
+        position = _HEADER.size
+        for _ in range(self._count):
+            task, position = self._decode(position)
+            yield task
+
+    def find(self, task_id):
+        """Return the task with this ID, or None (records are in ID order)."""
+        lo, hi = 0, self._count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            mid_id = _RECORD.unpack_from(self._map, self._offset(mid))[0]
+            if mid_id < task_id:
+                lo = mid + 1
+            elif mid_id > task_id:
+                hi = mid
+            else:
+                return self[mid]
+        return None
+
+    def close(self):
+        """Unmap and close the file."""
+        if getattr(self, "_map", None) is not None:
+            self._map.close()
+            self._map = None
+        self._file.close()
@@ -0,0 +1,730 @@
+"""
+Storage engines for TaskManager.
+
+TaskManager validates input, builds the status messages and journals
+mutations; a storage engine only stores tasks and answers lookups and
+ordered listings. Both engines expose the same methods, so they can be
+swapped with ``TaskManager(storage=...)``.
+
+Tasks cross this boundary as dicts with the keys ``description``,
+``priority``, ``completed`` and ``id``.
+
+Both engines also keep an inverted index from description tokens (see
+``tokenize``) to task IDs, updated on every insert, edit and delete, which
+serves ``search``.
+"""
+
+import re
+import sqlite3
+from bisect import bisect_left, insort
+from heapq import merge, nsmallest
+from itertools import islice
+from operator import attrgetter
+
+# Batches touching more keys than this rebuild the priority orderings in one
+# pass instead of bisecting once per key
+BULK_REORDER_THRESHOLD = 64
+# Parameters bound per ``IN (...)`` lookup, below SQLite's variable limit
+SQLITE_BATCH_SIZE = 500
+
+_TOKEN = re.compile(r"\w+")
+
+
+def tokenize(text):
+    """Return the set of case-folded word tokens in ``text``."""
+    return set(_TOKEN.findall(text.casefold()))
+
+
+class _TaskRecord:
+    """
+    One stored task in MemoryStorage.
+
+    ``__slots__`` keeps a record at about a quarter of the size of the
+    equivalent dict; dicts are only built when a task leaves the store.
+    """
+
+    __slots__ = ("description", "priority", "completed", "id")
+
+    def __init__(self, description, priority, completed, task_id):
+        self.description = description
+        self.priority = priority
+        self.completed = completed
+        self.id = task_id
+
+    @classmethod
+    def from_dict(cls, task):
+        return cls(task["description"], task["priority"], task["completed"], task["id"])
+
+    def as_dict(self):
+        return {
+            "description": self.description,
+            "priority": self.priority,
+            "completed": self.completed,
+            "id": self.id,
+        }
+
+
+class MemoryStorage:
+    """Tasks held in process memory, indexed by ID, description and priority."""
+
+    # Reads never modify the store, so they may run in parallel threads
+    concurrent_reads = True
+
+    def __init__(self):
+        """Initialize an empty store."""
+        self._tasks = {}  # id -> _TaskRecord, kept in ascending ID order
+        self._ids_by_description = {}  # description -> id
+        # Sorted (-priority, id) keys: highest priority first, oldest first on ties
+        self._pending_order = []
+        self._completed_order = []
+        # token -> IDs of the tasks with that token: a bare int for a single
+        # task, which is most tokens and far smaller than a set, else a set
+        self._postings = {}
+        self._tokens = []  # the keys of _postings, sorted for prefix lookups
+
+    def __len__(self):
+        return len(self._tasks)
+
+    def __contains__(self, task_id):
+        return task_id in self._tasks
+
+    def get(self, task_id):
+        """Return the task with this ID, or None."""
+        record = self._tasks.get(task_id)
+        return None if record is None else record.as_dict()
+
+    def get_status(self, task_id):
+        """Return ``(description, completed)`` for the task with this ID, or None."""
+        record = self._tasks.get(task_id)
+        return None if record is None else (record.description, record.completed)
+
+    def find_id(self, description):
+        """Return the ID of the task with this description, or None."""
+        return self._ids_by_description.get(description)
+
+    def find_ids(self, descriptions):
+        """Return ``{description: id}`` for those descriptions that are stored."""
+        ids = self._ids_by_description
+        return {d: ids[d] for d in descriptions if d in ids}
+
+    def get_many(self, task_ids):
+        """Return ``{id: task}`` for those IDs that are stored."""
+        tasks = self._tasks
+        return {i: tasks[i].as_dict() for i in task_ids if i in tasks}
+
+    def missing_ids(self, task_ids):
+        """Return those of ``task_ids`` that are not stored, in the given order."""
+        tasks = self._tasks
+        return [i for i in task_ids if i not in tasks]
+
+    def pending_ids(self, task_ids):
+        """Return the set of ``task_ids`` that are stored and not completed."""
+        tasks = self._tasks
+        return {i for i in task_ids if i in tasks and not tasks[i].completed}
+
+    def max_id(self):
+        """Return the largest stored task ID, or 0 when empty."""
+        return next(reversed(self._tasks), 0)
+
+    def insert(self, task):
+        """Store a new task; its ID must be larger than every stored ID."""
+        record = _TaskRecord.from_dict(task)
+        # Build the ordering key first, so a bad priority changes nothing
+        key = (-record.priority, record.id)
+        self._tasks[record.id] = record
+        self._ids_by_description[record.description] = record.id
+        insort(self._order(record.completed), key)
+        self._index([(record.id, record.description)])
+
+    def insert_many(self, tasks):
+        """Store new tasks, in ascending ID order above every stored ID."""
+        records = [
+            _TaskRecord(t["description"], t["priority"], t["completed"], t["id"])
+            for t in tasks
+        ]
+        # Build the ordering keys first, so a bad priority changes nothing
+        added = [(r.completed, (-r.priority, r.id)) for r in records]
+        for record in records:
+            self._tasks[record.id] = record
+            self._ids_by_description[record.description] = record.id
+        self._reorder((), added)
+        self._index([(r.id, r.description) for r in records])
+
+    def update(self, task_id, description=None, priority=None, completed=None):
+        """Change the given fields of a stored task (None leaves a field as is)."""
+        record = self._tasks[task_id]
+        reorder = priority is not None or completed is not None
+        if reorder:
+            # Build the new ordering key first, so a bad priority changes nothing
+            key = (-(record.priority if priority is None else priority), task_id)
+        if description is not None:
+            del self._ids_by_description[record.description]
+            self._ids_by_description[description] = task_id
+            self._unindex([(task_id, record.description)])
+            self._index([(task_id, description)])
+            record.description = description
+        if reorder:
+            self._remove_from_order(record)
+            if priority is not None:
+                record.priority = priority
+            if completed is not None:
+                record.completed = completed
+            insort(self._order(record.completed), key)
+
+    def update_many(self, updates):
+        """
+        Apply ``(task_id, description, priority, completed)`` updates in order.
+
+        None leaves a field as is, as in ``update``.
+        """
+        updates = list(updates)
+        # Work out the ordering keys before and after the batch first, so a
+        # bad priority changes nothing
+        moved = {}  # id -> (completed, key) before the batch
+        final = {}  # id -> [priority, completed] after the batch
+        for task_id, _, priority, completed in updates:
+            if priority is None and completed is None:
+                continue
+            if task_id not in moved:
+                record = self._tasks[task_id]
+                moved[task_id] = (record.completed, (-record.priority, task_id))
+                final[task_id] = [record.priority, record.completed]
+            if priority is not None:
+                final[task_id][0] = priority
+            if completed is not None:
+                final[task_id][1] = completed
+        added = [(c, (-p, task_id)) for task_id, (p, c) in final.items()]
+
+        renamed = {}  # id -> description before its first rename
+        for task_id, description, priority, completed in updates:
+            record = self._tasks[task_id]
+            if description is not None:
+                del self._ids_by_description[record.description]
+                self._ids_by_description[description] = task_id
+                renamed.setdefault(task_id, record.description)
+                record.description = description
+            if priority is not None:
+                record.priority = priority
+            if completed is not None:
+                record.completed = completed
+        self._reorder(list(moved.values()), added)
+        self._unindex(renamed.items())
+        self._index([(i, self._tasks[i].description) for i in renamed])
+
+    def delete(self, task_id):
+        """Remove and return the task with this ID, or None."""
+        record = self._tasks.pop(task_id, None)
+        if record is None:
+            return None
+        del self._ids_by_description[record.description]
+        self._remove_from_order(record)
+        self._unindex([(task_id, record.description)])
+        return record.as_dict()
+
+    def delete_many(self, task_ids):
+        """Remove the tasks with these (stored, distinct) IDs."""
+        removed = []
+        descriptions = []
+        for task_id in task_ids:
+            record = self._tasks.pop(task_id)
+            del self._ids_by_description[record.description]
+            removed.append((record.completed, (-record.priority, task_id)))
+            descriptions.append((task_id, record.description))
+        self._reorder(removed, ())
+        self._unindex(descriptions)
+
+    def clear(self):
+        """Remove all tasks."""
+        self.__init__()
+
+    def replace_all(self, tasks):
+        """
+        Replace every stored task with ``tasks`` (any iterable of task dicts).
+
+        Raises:
+            ValueError: If two tasks share an ID or a description; the store
+                is left unchanged
+        """
+        records = [
+            _TaskRecord(t["description"], t["priority"], t["completed"], t["id"])
+            for t in tasks
+        ]
+        records.sort(key=attrgetter("id"))
+        by_id = {r.id: r for r in records}
+        ids_by_description = {r.description: r.id for r in records}
+        if not len(records) == len(by_id) == len(ids_by_description):
+            raise ValueError("duplicate task IDs or descriptions")
+        self._tasks = by_id
+        self._ids_by_description = ids_by_description
+        self._pending_order = sorted(
+            (-r.priority, r.id) for r in records if not r.completed
+        )
+        self._completed_order = sorted(
+            (-r.priority, r.id) for r in records if r.completed
+        )
+        self._postings = {}
+        self._tokens = []
+        self._index([(r.id, r.description) for r in records])
+
+    def all(self):
+        """Return every task in ID order."""
+        return [record.as_dict() for record in self._tasks.values()]
+
+    def list(self, sort_by="id", show_completed=False, limit=None, offset=0):
+        """
+        List tasks by ID or by priority (highest first, oldest first on ties).
+
+        Priority views are read from the maintained orderings, so a page of
+        ``limit`` tasks costs O(offset + limit) instead of a full sort.
+        """
+        stop = None if limit is None else offset + limit
+
+        if sort_by == "priority":
+            if show_completed:
+                keys = islice(
+                    merge(self._pending_order, self._completed_order), offset, stop
+                )
+            else:
+                keys = self._pending_order[offset:stop]
+            return [self._tasks[task_id].as_dict() for _, task_id in keys]
+
+        records = self._tasks.values()
+        if not show_completed:
+            records = (r for r in records if not r.completed)
+        return [record.as_dict() for record in islice(records, offset, stop)]
+
+    def first_pending(self):
+        """Return the highest-priority pending task, or None."""
+        if not self._pending_order:
+            return None
+        return self._tasks[self._pending_order[0][1]].as_dict()
+
+    def search(self, query, prefix=False, limit=None):
+        """
+        Return tasks whose descriptions contain every token of ``query``.
+
+        Each token is looked up in the inverted index (with ``prefix``, every
+        indexed token starting with it, found by bisecting the sorted token
+        list) and the ID sets are intersected smallest first. Matches are
+        returned in ID order, at most ``limit`` of them.
+        """
+        tokens = tokenize(query)
+        if not tokens:
+            return []
+        matches = []
+        for token in tokens:
+            if prefix:
+                start = bisect_left(self._tokens, token)
+                stop = start
+                while stop < len(self._tokens) and self._tokens[stop].startswith(token):
+                    stop += 1
+                ids = set().union(*map(self._posting, self._tokens[start:stop]))
+            else:
+                ids = self._posting(token)
+            if not ids:
+                return []
+            matches.append(ids)
+
+        matches.sort(key=len)
+        found = set(matches[0]).intersection(*matches[1:])
+        ids = sorted(found) if limit is None else nsmallest(limit, found)
+        return [self._tasks[task_id].as_dict() for task_id in ids]
+
+    def _order(self, completed):
+        """Return the completed or the pending ordering."""
+        return self._completed_order if completed else self._pending_order
+
+    def _remove_from_order(self, record):
+        """Delete a record's key from its pending or completed ordering."""
+        order = self._order(record.completed)
+        del order[bisect_left(order, (-record.priority, record.id))]
+
+    def _posting(self, token):
+        """Return the IDs of the tasks with ``token`` as a set or tuple."""
+        ids = self._postings.get(token, ())
+        return (ids,) if type(ids) is int else ids
+
+    def _index(self, pairs):
+        """Add ``(task_id, description)`` pairs to the token index."""
+        postings = self._postings
+        new_tokens = []
+        for task_id, description in pairs:
+            for token in tokenize(description):
+                ids = postings.get(token)
+                if ids is None:
+                    postings[token] = task_id
+                    new_tokens.append(token)
+                elif type(ids) is int:
+                    postings[token] = {ids, task_id}
+                else:
+                    ids.add(task_id)
+        if len(new_tokens) <= BULK_REORDER_THRESHOLD:
+            for token in new_tokens:
+                insort(self._tokens, token)
+        else:
+            self._tokens.extend(new_tokens)
+            self._tokens.sort()
+
+    def _unindex(self, pairs):
+        """Remove ``(task_id, description)`` pairs from the token index."""
+        postings = self._postings
+        gone = []
+        for task_id, description in pairs:
+            for token in tokenize(description):
+                ids = postings[token]
+                if type(ids) is int:
+                    del postings[token]
+                    gone.append(token)
+                else:
+                    ids.discard(task_id)
+                    if len(ids) == 1:
+                        postings[token] = ids.pop()
+        if len(gone) <= BULK_REORDER_THRESHOLD:
+            for token in gone:
+                del self._tokens[bisect_left(self._tokens, token)]
+        else:
+            gone = set(gone)
+            self._tokens = [token for token in self._tokens if token not in gone]
+
+    def _reorder(self, removed, added):
+        """
+        Drop the ``removed`` and insert the ``added`` ``(completed, key)`` pairs.
+
+        Large batches filter each ordering once and re-sort it; the new keys
+        arrive as one sorted run, which the sort merges in linear time.
+        """
+        if len(removed) + len(added) <= BULK_REORDER_THRESHOLD:
+            for completed, key in removed:
+                order = self._completed_order if completed else self._pending_order
+                del order[bisect_left(order, key)]
+            for completed, key in added:
+                insort(self._order(completed), key)
+            return
+
+        for completed, attr in ((False, "_pending_order"), (True, "_completed_order")):
+            drop = {key for c, key in removed if bool(c) is completed}
+            keys = sorted(key for c, key in added if bool(c) is completed)
+            if not drop and not keys:
+                continue
+            order = getattr(self, attr)
+            if drop:
+                order = [key for key in order if key not in drop]
+            order.extend(keys)
+            order.sort()
+            setattr(self, attr, order)
+
+
+class SQLiteStorage:
+    """
+    Tasks held in an SQLite database through the stdlib ``sqlite3`` module.
+
+    ``id`` is the primary key, ``description`` carries a unique index and
+    ``(completed, priority DESC, id)`` an index that serves the filtered
+    priority listing. ``priority`` has no type affinity, so int and float
+    priorities come back as they were stored. The ``task_tokens`` table
+    holds one ``(token, task_id)`` row per description token; its primary
+    key serves exact and prefix token lookups. Sorting, filtering and
+    pagination run as SQL. Every statement is a constant parameterized
+    string, so sqlite3's statement cache reuses its prepared form.
+    """
+
+    _COLUMNS = "description, priority, completed, id"
+    _SCHEMA = """
+        CREATE TABLE IF NOT EXISTS tasks (
+            id INTEGER PRIMARY KEY,
+            description TEXT NOT NULL UNIQUE,
+            priority NOT NULL,
+            completed INTEGER NOT NULL DEFAULT 0
+        );
+        CREATE INDEX IF NOT EXISTS tasks_by_completed_priority
+            ON tasks (completed, priority DESC, id);
+        CREATE TABLE IF NOT EXISTS task_tokens (
+            token TEXT NOT NULL,
+            task_id INTEGER NOT NULL,
+            PRIMARY KEY (token, task_id)
+        ) WITHOUT ROWID;
+        CREATE INDEX IF NOT EXISTS task_tokens_by_task ON task_tokens (task_id);
+    """
+    _LIST = {
+        ("id", False): "WHERE completed = 0 ORDER BY id",
+        ("id", True): "ORDER BY id",
+        ("priority", False): "WHERE completed = 0 ORDER BY priority DESC, id",
+        ("priority", True): "ORDER BY priority DESC, id",
+    }
+
+    # Only a serialized-mode SQLite build lets threads share one connection
+    concurrent_reads = sqlite3.threadsafety == 3
+
+    def __init__(self, path=":memory:"):
+        """
+        Open (and create if needed) the database at ``path``.
+
+        The connection may be used from any thread; callers that share it,
+        such as ConcurrentTaskManager, must serialize writes themselves.
+        """
+        self.path = path
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        priority_type = self._conn.execute(
+            "SELECT type FROM pragma_table_info('tasks') WHERE name = 'priority'"
+        ).fetchone()
+        if priority_type == ("INTEGER",):
+            self._migrate_priority_column()
+        self._conn.executescript(self._SCHEMA)
+        # Databases written before the token index existed have no tokens
+        tokens = self._conn.execute("SELECT 1 FROM task_tokens LIMIT 1").fetchone()
+        if tokens is None and len(self):
+            with self._conn:
+                self._index_all()
+
+    def _migrate_priority_column(self):
+        """
+        Rebuild a ``tasks`` table whose priority column has INTEGER affinity.
+
+        Older databases declared ``priority INTEGER``, which stores 2.0 as 2;
+        the current column has no affinity, so values keep the type given.
+        """
+        self._conn.executescript(
+            "BEGIN;"
+            "DROP INDEX IF EXISTS tasks_by_completed_priority;"
+            "ALTER TABLE tasks RENAME TO tasks_old;"
+            + self._SCHEMA
+            + f"INSERT INTO tasks ({self._COLUMNS})"
+            f" SELECT {self._COLUMNS} FROM tasks_old;"
+            "DROP TABLE tasks_old;"
+            "COMMIT;"
+        )
+
+    @staticmethod
+    def _to_task(row):
+        """Convert a ``(description, priority, completed, id)`` row to a task."""
+        description, priority, completed, task_id = row
+        return {
+            "description": description,
+            "priority": priority,
+            "completed": bool(completed),
+            "id": task_id,
+        }
+
+    def __len__(self):
+        return self._conn.execute("SELECT COUNT(*) FROM tasks").fetchone()[0]
+
+    def get(self, task_id):
+        """Return the task with this ID, or None."""
+        row = self._conn.execute(
+            f"SELECT {self._COLUMNS} FROM tasks WHERE id = ?", (task_id,)
+        ).fetchone()
+        return None if row is None else self._to_task(row)
+
+    def __contains__(self, task_id):
+        row = self._conn.execute(
+            "SELECT 1 FROM tasks WHERE id = ?", (task_id,)
+        ).fetchone()
+        return row is not None
+
+    def get_status(self, task_id):
+        """Return ``(description, completed)`` for the task with this ID, or None."""
+        row = self._conn.execute(
+            "SELECT description, completed FROM tasks WHERE id = ?", (task_id,)
+        ).fetchone()
+        return None if row is None else (row[0], bool(row[1]))
+
+    def find_id(self, description):
+        """Return the ID of the task with this description, or None."""
+        row = self._conn.execute(
+            "SELECT id FROM tasks WHERE description = ?", (description,)
+        ).fetchone()
+        return None if row is None else row[0]
+
+    def _select_in(self, columns, key, values):
+        """Yield rows whose ``key`` is one of ``values``, in batched queries."""
+        values = list(values)
+        for start in range(0, len(values), SQLITE_BATCH_SIZE):
+            batch = values[start : start + SQLITE_BATCH_SIZE]
+            placeholders = ", ".join("?" * len(batch))
+            yield from self._conn.execute(
+                f"SELECT {columns} FROM tasks WHERE {key} IN ({placeholders})", batch
+            )
+
+    def find_ids(self, descriptions):
+        """Return ``{description: id}`` for those descriptions that are stored."""
+        return dict(self._select_in("description, id", "description", descriptions))
+
+    def get_many(self, task_ids):
+        """Return ``{id: task}`` for those IDs that are stored."""
+        tasks = map(self._to_task, self._select_in(self._COLUMNS, "id", task_ids))
+        return {task["id"]: task for task in tasks}
+
+    def missing_ids(self, task_ids):
+        """Return those of ``task_ids`` that are not stored, in the given order."""
+        task_ids = list(task_ids)
+        stored = {row[0] for row in self._select_in("id", "id", task_ids)}
+        return [i for i in task_ids if i not in stored]
+
+    def pending_ids(self, task_ids):
+        """Return the set of ``task_ids`` that are stored and not completed."""
+        rows = self._select_in("id, completed", "id", task_ids)
+        return {task_id for task_id, completed in rows if not completed}
+
+    def max_id(self):
+        """Return the largest stored task ID, or 0 when empty."""
+        row = self._conn.execute("SELECT COALESCE(MAX(id), 0) FROM tasks").fetchone()
+        return row[0]
+
+    def insert(self, task):
+        """Store a new task."""
+        self.insert_many([task])
+
+    def insert_many(self, tasks):
+        """Store new tasks in one transaction."""
+        tasks = list(tasks)
+        with self._conn:
+            self._conn.executemany(
+                f"INSERT INTO tasks ({self._COLUMNS}) VALUES (?, ?, ?, ?)",
+                (
+                    (t["description"], t["priority"], t["completed"], t["id"])
+                    for t in tasks
+                ),
+            )
+            self._index((t["id"], t["description"]) for t in tasks)
+
+    def update(self, task_id, description=None, priority=None, completed=None):
+        """Change the given fields of a stored task (None leaves a field as is)."""
+        self.update_many([(task_id, description, priority, completed)])
+
+    def update_many(self, updates):
+        """
+        Apply ``(task_id, description, priority, completed)`` updates in order,
+        in one transaction. None leaves a field as is, as in ``update``.
+        """
+        updates = list(updates)
+        with self._conn:
+            self._conn.executemany(
+                "UPDATE tasks SET description = COALESCE(?, description), "
+                "priority = COALESCE(?, priority), "
+                "completed = COALESCE(?, completed) WHERE id = ?",
+                (
+                    (description, priority, completed, task_id)
+                    for task_id, description, priority, completed in updates
+                ),
+            )
+            renamed = {u[0]: u[1] for u in updates if u[1] is not None}
+            self._unindex(renamed)
+            self._index(renamed.items())
+
+    def delete(self, task_id):
+        """Remove and return the task with this ID, or None."""
+        task = self.get(task_id)
+        if task is not None:
+            self.delete_many([task_id])
+        return task
+
+    def delete_many(self, task_ids):
+        """Remove the tasks with these IDs in one transaction."""
+        task_ids = list(task_ids)
+        with self._conn:
+            self._conn.executemany(
+                "DELETE FROM tasks WHERE id = ?", ((task_id,) for task_id in task_ids)
+            )
+            self._unindex(task_ids)
+
+    def clear(self):
+        """Remove all tasks."""
+        with self._conn:
+            self._conn.execute("DELETE FROM tasks")
+            self._conn.execute("DELETE FROM task_tokens")
+
+    def replace_all(self, tasks):
+        """
+        Replace every stored task with ``tasks`` (any iterable of task dicts)
+        in one transaction.
+
+        Raises:
+            ValueError: If two tasks share an ID or a description; the store
+                is left unchanged
+        """
+        try:
+            with self._conn:
+                self._conn.execute("DELETE FROM tasks")
+                self._conn.execute("DELETE FROM task_tokens")
+                self._conn.executemany(
+                    f"INSERT INTO tasks ({self._COLUMNS}) VALUES (?, ?, ?, ?)",
+                    (
+                        (t["description"], t["priority"], t["completed"], t["id"])
+                        for t in tasks
+                    ),
+                )
+                self._index_all()
+        except sqlite3.IntegrityError as e:
+            raise ValueError("duplicate task IDs or descriptions") from e
+
+    def all(self):
+        """Return every task in ID order."""
+        return self.list(show_completed=True)
+
+    def list(self, sort_by="id", show_completed=False, limit=None, offset=0):
+        """List tasks by ID or by priority (highest first, oldest first on ties)."""
+        key = "priority" if sort_by == "priority" else "id"
+        clause = self._LIST[(key, show_completed)]
+        rows = self._conn.execute(
+            f"SELECT {self._COLUMNS} FROM tasks {clause} LIMIT ? OFFSET ?",
+            (-1 if limit is None else limit, offset),
+        )
+        return [self._to_task(row) for row in rows]
+
+    def first_pending(self):
+        """Return the highest-priority pending task, or None."""
+        tasks = self.list(sort_by="priority", limit=1)
+        return tasks[0] if tasks else None
+
+    def search(self, query, prefix=False, limit=None):
+        """
+        Return tasks whose descriptions contain every token of ``query``.
+
+        Each token becomes an equality (or, with ``prefix``, a range) scan
+        of the ``task_tokens`` primary key, and the scans are combined with
+        INTERSECT. Matches are returned in ID order, at most ``limit`` of
+        them.
+        """
+        tokens = sorted(tokenize(query))
+        if not tokens:
+            return []
+        if prefix:
+            scan = "SELECT task_id FROM task_tokens WHERE token >= ? AND token < ?"
+            # Tokens starting with t sort from t up to t with its last
+            # character incremented
+            params = [p for t in tokens for p in (t, t[:-1] + chr(ord(t[-1]) + 1))]
+        else:
+            scan = "SELECT task_id FROM task_tokens WHERE token = ?"
+            params = tokens
+        rows = self._conn.execute(
+            f"SELECT {self._COLUMNS} FROM tasks WHERE id IN "
+            f"({' INTERSECT '.join([scan] * len(tokens))}) ORDER BY id LIMIT ?",
+            params + [-1 if limit is None else limit],
+        )
+        return [self._to_task(row) for row in rows]
+
+    def _index(self, pairs):
+        """Add token rows for ``(task_id, description)`` pairs."""
+        self._conn.executemany(
+            "INSERT INTO task_tokens (token, task_id) VALUES (?, ?)",
+            (
+                (token, task_id)
+                for task_id, description in pairs
+                for token in tokenize(description)
+            ),
+        )
+
+    def _unindex(self, task_ids):
+        """Delete the token rows of these tasks."""
+        self._conn.executemany(
+            "DELETE FROM task_tokens WHERE task_id = ?",
+            ((task_id,) for task_id in task_ids),
+        )
+
+    def _index_all(self):
+        """Add token rows for every stored task."""
+        self._index(self._conn.execute("SELECT id, description FROM tasks"))
+
+    def close(self):
+        """Close the database connection."""
+        self._conn.close()
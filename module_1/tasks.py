@@ -1,9 +1,115 @@
+import json
+import os
+
+from task_formats import detect_format, read_tasks, write_tasks
+from task_storage import MemoryStorage
+
+
+def _is_priority(value):
+    """
+    Return True if ``value`` is a usable priority: a non-NaN float or an int
+    within the signed 64-bit range that SQLite and binary task files hold.
+    """
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return False
+    if isinstance(value, int):
+        return -(2**63) <= value < 2**63
+    return value == value
+
+
+class TaskJournal:
+    """
+    Append-only log of TaskManager mutations, kept next to a JSON snapshot.
+
+    Each mutation is one compact JSON array per line in ``<snapshot>.journal``:
+    ``["a", id, description, priority]``, ``["r", id]``, ``["c", id]``,
+    ``["e", id, description, priority]`` or ``["x"]`` (clear). Records are
+    fsynced in batches of ``sync_every``; after ``compact_every`` records the
+    owner writes a new snapshot and the journal is truncated.
+    """
+
+    def __init__(self, snapshot, sync_every=64, compact_every=10_000):
+        """Open the journal for ``snapshot`` for appending."""
+        self.snapshot = snapshot
+        self.path = f"{snapshot}.journal"
+        self.sync_every = sync_every
+        self.compact_every = compact_every
+        self._unsynced = 0
+        self._records = 0
+        # Drop a torn record left by a crash so new records start on a clean line
+        valid = sum(len(line) for line, _ in self.read(self.path))
+        self._file = open(self.path, "ab")
+        self._file.truncate(valid)
+
+    @staticmethod
+    def read(path):
+        """
+        Yield ``(raw_line, record)`` for each complete record in a journal.
+
+        Stops at the first partial or unreadable line, which is where a crash
+        interrupted the last write.
+        """
+        if not os.path.exists(path):
+            return
+        with open(path, "rb") as f:
+            for line in f:
+                if not line.endswith(b"\n"):
+                    return
+                try:
+                    yield line, json.loads(line)
+                except ValueError:
+                    return
+
+    def append(self, record):
+        """
+        Write one record, syncing every ``sync_every`` records.
+
+        Returns:
+            bool: True when the journal is due for compaction
+        """
+        self._file.write(
+            json.dumps(record, separators=(",", ":"), ensure_ascii=False).encode()
+            + b"\n"
+        )
+        self._unsynced += 1
+        self._records += 1
+        if self._unsynced >= self.sync_every:
+            self.sync()
+        return self._records >= self.compact_every
+
+    def sync(self):
+        """Flush buffered records and fsync them to disk."""
+        if self._unsynced:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._unsynced = 0
+
+    def truncate(self):
+        """Empty the journal once its records are covered by a snapshot."""
+        self._file.flush()
+        self._file.truncate(0)
+        os.fsync(self._file.fileno())
+        self._unsynced = 0
+        self._records = 0
+
+    def close(self):
+        """Sync and close the journal file."""
+        self.sync()
+        self._file.close()
+
+
 class TaskManager:
-    def __init__(self):
-        """Initialize an empty task list."""
-        self._tasks = []
-        self._completed_tasks = []
-        self._next_id = 1
+    def __init__(self, storage=None):
+        """
+        Initialize a task list.
+
+        Args:
+            storage: Storage engine from task_storage (default: an empty
+                MemoryStorage); tasks already stored in it are kept
+        """
+        self._storage = MemoryStorage() if storage is None else storage
+        self._next_id = self._storage.max_id() + 1
+        self._journal = None
 
     def add_task(self, task, priority=0):
         """
@@ -11,7 +117,7 @@ class TaskManager:
 
         Args:
             task: Task description (string)
-            priority: Task priority (integer), higher means more important
+            priority: Task priority (int or float), higher means more important
 
         Returns:
             dict: Status and message
@@ -22,18 +128,15 @@ class TaskManager:
         if not task.strip():
             return {"status": "error", "message": "Task cannot be empty"}
 
-        if task in [t["description"] for t in self._tasks]:
+        if not _is_priority(priority):
+            return {"status": "error", "message": "Priority must be a number"}
+
+        if self._storage.find_id(task) is not None:
             return {"status": "error", "message": f"Task '{task}' already exists"}
 
         # Add a task with metadata
-        task_obj = {
-            "description": task,
-            "priority": priority,
-            "completed": False,
-            "id": self._next_id,
-        }
-        self._next_id += 1
-        self._tasks.append(task_obj)
+        task_obj = self._insert_task(self._next_id, task, priority)
+        self._log("a", task_obj["id"], task, priority)
         return {
             "status": "success",
             "message": f"Task '{task}' added",
@@ -47,101 +150,444 @@ class TaskManager:
         Returns:
             dict: Status and message
         """
-        for i, task in enumerate(self._tasks):
-            if task["id"] == task_id:
-                removed = self._tasks.pop(i)
-                return {
-                    "status": "success",
-                    "message": f"Task '{removed['description']}' removed",
-                }
+        removed = self._storage.delete(task_id)
+        if removed is None:
+            return {"status": "error", "message": f"Task with ID {task_id} not found"}
 
-        return {"status": "error", "message": f"Task with ID {task_id} not found"}
+        self._log("r", task_id)
+        return {
+            "status": "success",
+            "message": f"Task '{removed['description']}' removed",
+        }
 
     def complete_task(self, task_id):
         """Mark a task as completed."""
-        for task in self._tasks:
-            if task["id"] == task_id:
-                task["completed"] = True
-                return {
-                    "status": "success",
-                    "message": f"Completed task: '{task['description']}'",
-                }
+        status = self._storage.get_status(task_id)
+        if status is None:
+            return {"status": "error", "message": f"Task with ID {task_id} not found"}
 
-        return {"status": "error", "message": f"Task with ID {task_id} not found"}
+        description, completed = status
+        if not completed:
+            self._storage.update(task_id, completed=True)
+        self._log("c", task_id)
+        return {"status": "success", "message": f"Completed task: '{description}'"}
 
     def edit_task(self, task_id, new_description=None, new_priority=None):
         """Edit an existing task's description or priority."""
-        for task in self._tasks:
-            if task["id"] == task_id:
-                if new_description is not None:
-                    if (
-                        not isinstance(new_description, str)
-                        or not new_description.strip()
-                    ):
-                        return {
-                            "status": "error",
-                            "message": "New description must be a non-empty string",
-                        }
-                    task["description"] = new_description
+        if task_id not in self._storage:
+            return {"status": "error", "message": f"Task with ID {task_id} not found"}
 
-                if new_priority is not None:
-                    task["priority"] = new_priority
+        if new_description is not None:
+            if not isinstance(new_description, str) or not new_description.strip():
+                return {
+                    "status": "error",
+                    "message": "New description must be a non-empty string",
+                }
+            if self._storage.find_id(new_description) not in (None, task_id):
+                return {
+                    "status": "error",
+                    "message": f"Task '{new_description}' already exists",
+                }
 
-                return {"status": "success", "message": f"Task {task_id} updated"}
+        if new_priority is not None and not _is_priority(new_priority):
+            return {"status": "error", "message": "Priority must be a number"}
 
-        return {"status": "error", "message": f"Task with ID {task_id} not found"}
+        self._storage.update(
+            task_id, description=new_description, priority=new_priority
+        )
+        self._log("e", task_id, new_description, new_priority)
+        return {"status": "success", "message": f"Task {task_id} updated"}
 
-    def list_tasks(self, sort_by="id", show_completed=False):
+    def list_tasks(self, sort_by="id", show_completed=False, limit=None, offset=0):
         """
-        List all tasks with optional sorting.
+        List all tasks with optional sorting and pagination.
+
+        The storage engine does the ordering: MemoryStorage keeps sorted
+        priority views, SQLiteStorage runs an indexed query.
 
         Args:
             sort_by: Field to sort by ('id', 'priority')
             show_completed: Whether to include completed tasks
+            limit: Maximum number of tasks to return (None for all)
+            offset: Number of matching tasks to skip
 
         Returns:
             list: Tasks matching criteria
         """
-        tasks_to_show = self._tasks
+        return self._storage.list(sort_by, show_completed, limit, offset)
 
-        if not show_completed:
-            tasks_to_show = [t for t in tasks_to_show if not t["completed"]]
+    def next_task(self):
+        """
+        Remove and return the highest-priority pending task.
+
+        Ties go to the oldest task (lowest ID).
+
+        Returns:
+            dict: Status, message and the removed task
+        """
+        task = self._storage.first_pending()
+        if task is None:
+            return {"status": "error", "message": "No pending tasks"}
 
-        if sort_by == "priority":
-            return sorted(tasks_to_show, key=lambda x: x["priority"], reverse=True)
-        else:
-            return sorted(tasks_to_show, key=lambda x: x["id"])
+        self.remove_task(task["id"])
+        return {
+            "status": "success",
+            "message": f"Next task: '{task['description']}'",
+            "task": task,
+        }
+
+    def search_tasks(self, query, prefix=False, limit=None):
+        """
+        Find tasks whose descriptions contain every word in ``query``.
+
+        Matching is case-insensitive on whole words, answered from the
+        storage engine's inverted index rather than by scanning every task.
+
+        Args:
+            query: Words to look for, e.g. 'write report'
+            prefix: Also match words that start with each query word
+            limit: Maximum number of tasks to return (None for all)
+
+        Returns:
+            list: Matching tasks, completed ones included, in ID order
+        """
+        if not isinstance(query, str):
+            return []
+        return self._storage.search(query, prefix, limit)
 
     def clear_tasks(self):
         """Remove all tasks."""
-        task_count = len(self._tasks)
-        self._tasks = []
+        task_count = len(self._storage)
+        self._storage.clear()
+        self._log("x")
         return {"status": "success", "message": f"Cleared {task_count} tasks"}
 
-    def save_to_file(self, filename):
-        """Save tasks to a file."""
+    def add_tasks(self, tasks):
+        """
+        Add many tasks in one batch, all or none.
+
+        The whole batch is validated before anything is stored. Duplicates
+        are caught with a set inside the batch and with one bulk lookup
+        against the stored tasks.
+
+        Args:
+            tasks: Iterable of descriptions or (description, priority) pairs
+
+        Returns:
+            dict: Status, message and the new task IDs; on error nothing is
+                added and ``index`` is the position of the first bad item
+        """
+        batch = []
+        seen = set()
+        for index, item in enumerate(tasks):
+            if isinstance(item, (tuple, list)) and len(item) == 2:
+                description, priority = item
+            else:
+                description, priority = item, 0
+            if not isinstance(description, str):
+                message = "Task must be a string"
+            elif not description.strip():
+                message = "Task cannot be empty"
+            elif description in seen:
+                message = f"Task '{description}' already exists"
+            elif not _is_priority(priority):
+                message = "Priority must be a number"
+            else:
+                seen.add(description)
+                batch.append((description, priority))
+                continue
+            return {"status": "error", "message": message, "index": index}
+
+        existing = self._storage.find_ids(seen)
+        if existing:
+            for index, (description, _) in enumerate(batch):
+                if description in existing:
+                    return {
+                        "status": "error",
+                        "message": f"Task '{description}' already exists",
+                        "index": index,
+                    }
+
+        first_id = self._next_id
+        task_objs = [
+            {
+                "description": description,
+                "priority": priority,
+                "completed": False,
+                "id": task_id,
+            }
+            for task_id, (description, priority) in enumerate(batch, first_id)
+        ]
+        self._storage.insert_many(task_objs)
+        self._next_id = first_id + len(task_objs)
+        self._log_many(
+            ("a", t["id"], t["description"], t["priority"]) for t in task_objs
+        )
+        return {
+            "status": "success",
+            "message": f"Added {len(task_objs)} tasks",
+            "task_ids": list(range(first_id, self._next_id)),
+        }
+
+    def complete_tasks(self, task_ids):
+        """
+        Mark many tasks as completed, all or none.
+
+        Returns:
+            dict: Status and message; on error no task is changed
+        """
+        task_ids = list(dict.fromkeys(task_ids))
+        missing = self._storage.missing_ids(task_ids)
+        if missing:
+            return {
+                "status": "error",
+                "message": f"Task with ID {missing[0]} not found",
+            }
+
+        pending = self._storage.pending_ids(task_ids)
+        self._storage.update_many(
+            (task_id, None, None, True) for task_id in task_ids if task_id in pending
+        )
+        self._log_many(("c", task_id) for task_id in task_ids)
+        return {"status": "success", "message": f"Completed {len(task_ids)} tasks"}
+
+    def remove_tasks(self, task_ids):
+        """
+        Remove many tasks by ID, all or none.
+
+        Returns:
+            dict: Status and message; on error no task is removed
+        """
+        task_ids = list(dict.fromkeys(task_ids))
+        missing = self._storage.missing_ids(task_ids)
+        if missing:
+            return {
+                "status": "error",
+                "message": f"Task with ID {missing[0]} not found",
+            }
+
+        self._storage.delete_many(task_ids)
+        self._log_many(("r", task_id) for task_id in task_ids)
+        return {"status": "success", "message": f"Removed {len(task_ids)} tasks"}
+
+    def edit_tasks(self, edits):
+        """
+        Edit many tasks, all or none.
+
+        A new description must be unique within the batch and must not belong
+        to another task before the batch is applied, so descriptions cannot
+        be swapped in one call.
+
+        Args:
+            edits: Mapping of task ID to a (new_description, new_priority)
+                pair; None leaves a field unchanged, as in edit_task
+
+        Returns:
+            dict: Status and message; on error no task is changed
+        """
+        edits = {task_id: tuple(change) for task_id, change in dict(edits).items()}
+        missing = set(self._storage.missing_ids(edits))
+        new_descriptions = set()
+        for task_id, (description, priority) in edits.items():
+            if task_id in missing:
+                return {
+                    "status": "error",
+                    "message": f"Task with ID {task_id} not found",
+                }
+            if priority is not None and not _is_priority(priority):
+                return {"status": "error", "message": "Priority must be a number"}
+            if description is None:
+                continue
+            if not isinstance(description, str) or not description.strip():
+                return {
+                    "status": "error",
+                    "message": "New description must be a non-empty string",
+                }
+            if description in new_descriptions:
+                return {
+                    "status": "error",
+                    "message": f"Task '{description}' already exists",
+                }
+            new_descriptions.add(description)
+
+        holders = self._storage.find_ids(new_descriptions)
+        for task_id, (description, _) in edits.items():
+            if holders.get(description, task_id) != task_id:
+                return {
+                    "status": "error",
+                    "message": f"Task '{description}' already exists",
+                }
+
+        self._storage.update_many(
+            (task_id, description, priority, None)
+            for task_id, (description, priority) in edits.items()
+        )
+        self._log_many(
+            ("e", task_id, description, priority)
+            for task_id, (description, priority) in edits.items()
+        )
+        return {"status": "success", "message": f"Updated {len(edits)} tasks"}
+
+    def _insert_task(self, task_id, description, priority):
+        """Store a new pending task under ``task_id``."""
+        task_obj = {
+            "description": description,
+            "priority": priority,
+            "completed": False,
+            "id": task_id,
+        }
+        self._storage.insert(task_obj)
+        self._next_id = max(self._next_id, task_id + 1)
+        return task_obj
+
+    def _log(self, *record):
+        """Append a mutation to the journal, compacting it when due."""
+        if self._journal is not None and self._journal.append(record):
+            self.compact_journal()
+
+    def _log_many(self, records):
+        """Append a batch of mutations to the journal, compacting at most once."""
+        if self._journal is None:
+            return
+        due = False
+        for record in records:
+            due = self._journal.append(record) or due
+        if due:
+            self.compact_journal()
+
+    def _replay(self, record):
+        """
+        Apply one journal record without logging it again.
+
+        Replay is idempotent: re-applying records already reflected in the
+        snapshot (after a crash between compaction steps) changes nothing.
+        """
+        op, args = record[0], record[1:]
+        if op == "a":
+            task_id, description, priority = args
+            if (
+                task_id not in self._storage
+                and self._storage.find_id(description) is None
+            ):
+                self._insert_task(task_id, description, priority)
+        elif op == "r":
+            self.remove_task(*args)
+        elif op == "c":
+            self.complete_task(*args)
+        elif op == "e":
+            self.edit_task(*args)
+        elif op == "x":
+            self.clear_tasks()
+
+    def open_journal(self, filename, sync_every=64, compact_every=10_000):
+        """
+        Load ``filename`` plus its journal and log every later mutation.
+
+        Instead of rewriting the whole file on each save, mutations are
+        appended to ``<filename>.journal`` and folded into the snapshot every
+        ``compact_every`` records.
+
+        Args:
+            filename: Snapshot file; created if it does not exist
+            sync_every: Records written between fsyncs
+            compact_every: Records written between snapshots
+
+        Returns:
+            dict: Status and message
+        """
         try:
-            import json
+            self.close_journal()
+            if os.path.exists(filename):
+                result = self.load_from_file(filename)
+            else:
+                result = self.save_to_file(filename)
+            if result["status"] == "error":
+                return result
+            self._journal = TaskJournal(filename, sync_every, compact_every)
+            return {"status": "success", "message": f"Journaling to {filename}"}
+        except Exception as e:
+            return {"status": "error", "message": f"Failed to open journal: {str(e)}"}
+
+    def compact_journal(self):
+        """Write a fresh snapshot and empty the journal."""
+        if self._journal is None:
+            return {"status": "error", "message": "No journal is open"}
+        self._journal.sync()
+        result = self.save_to_file(self._journal.snapshot)
+        if result["status"] == "success":
+            self._journal.truncate()
+        return result
+
+    def close_journal(self):
+        """Sync and close the journal, if one is open."""
+        if self._journal is None:
+            return {"status": "success", "message": "No journal is open"}
+        self._journal.close()
+        self._journal = None
+        return {"status": "success", "message": "Journal closed"}
+
+    def save_to_file(self, filename, file_format=None):
+        """
+        Save tasks to a file.
 
-            with open(filename, "w") as f:
-                json.dump(self._tasks, f)
+        The tasks are written to a temporary file that then replaces
+        ``filename``, so a crash mid-write never leaves a truncated file.
+
+        Args:
+            filename: Destination file
+            file_format: 'json', 'jsonl' or 'binary' (default: chosen by
+                the extension, see task_formats)
+        """
+        temp_filename = f"{filename}.tmp"
+        try:
+            file_format = detect_format(filename, file_format)
+            count = write_tasks(temp_filename, self._storage.all(), file_format)
+            os.replace(temp_filename, filename)
             return {
                 "status": "success",
-                "message": f"Saved {len(self._tasks)} tasks to {filename}",
+                "message": f"Saved {count} tasks to {filename}",
             }
         except Exception as e:
+            try:
+                os.remove(temp_filename)
+            except OSError:
+                pass
             return {"status": "error", "message": f"Failed to save tasks: {str(e)}"}
 
-    def load_from_file(self, filename):
-        """Load tasks from a file."""
-        try:
-            import json
+    def load_from_file(self, filename, file_format=None):
+        """
+        Load tasks from a file.
+
+        ``jsonl`` and ``binary`` files are streamed into storage record by
+        record instead of being parsed into one list first. If a
+        ``<filename>.journal`` written by open_journal exists, its records
+        are replayed on top of the snapshot. If a journal is open, it is
+        compacted right after, so that it replays onto the loaded tasks.
 
-            with open(filename, "r") as f:
-                self._tasks = json.load(f)
+        Args:
+            filename: Source file
+            file_format: 'json', 'jsonl' or 'binary' (default: chosen by
+                the extension, see task_formats)
+        """
+        try:
+            file_format = detect_format(filename, file_format)
+            self._storage.replace_all(read_tasks(filename, file_format))
+            # Never hand out an ID that is already in use
+            self._next_id = max(self._next_id, self._storage.max_id() + 1)
+
+            journal, self._journal = self._journal, None
+            try:
+                for _, record in TaskJournal.read(f"{filename}.journal"):
+                    self._replay(record)
+            finally:
+                self._journal = journal
+            if self._journal is not None:
+                result = self.compact_journal()
+                if result["status"] == "error":
+                    return result
             return {
                 "status": "success",
-                "message": f"Loaded {len(self._tasks)} tasks from {filename}",
+                "message": f"Loaded {len(self._storage)} tasks from {filename}",
             }
         except Exception as e:
             return {"status": "error", "message": f"Failed to load tasks: {str(e)}"}
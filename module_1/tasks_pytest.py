@@ -1,13 +1,29 @@
 import pytest
+import asyncio
 import os
+import random
+import sqlite3
+import sys
 import tempfile
+import threading
 from tasks import TaskManager
+from task_concurrency import AsyncTaskManager, ConcurrentTaskManager, RWLock
+from task_formats import TaskFile
+from task_storage import MemoryStorage, SQLiteStorage
+
+STORAGES = {"memory": MemoryStorage, "sqlite": SQLiteStorage}
+
+
+@pytest.fixture(params=sorted(STORAGES))
+def make_manager(request):
+    """Return a factory for TaskManagers on the parametrized storage engine."""
+    return lambda: TaskManager(storage=STORAGES[request.param]())
 
 
 @pytest.fixture
-def task_manager():
+def task_manager(make_manager):
     """Create a fresh TaskManager instance for each test."""
-    return TaskManager()
+    return make_manager()
 
 
 def test_add_task_basic(task_manager):
@@ -162,6 +178,29 @@ def test_edit_nonexistent_task(task_manager):
     assert "not found" in result["message"]
 
 
+@pytest.mark.parametrize(
+    "priority", ["high", None, True, float("nan"), [1], 2**63, -(2**63) - 1, 2**64]
+)
+def test_priority_validation(task_manager, priority):
+    """Test that a non-numeric or out-of-range priority changes nothing."""
+    result = task_manager.add_task("Bad", priority)
+    assert result == {"status": "error", "message": "Priority must be a number"}
+    assert task_manager.add_tasks([("Bad", priority)])["status"] == "error"
+
+    task_manager.add_task("Good", priority=2.5)
+    assert task_manager.edit_task(1, new_priority=priority)["status"] == (
+        "success" if priority is None else "error"
+    )
+    if priority is not None:
+        assert task_manager.edit_tasks({1: ("Renamed", priority)})["status"] == "error"
+
+    assert task_manager.list_tasks(sort_by="priority") == [
+        {"description": "Good", "priority": 2.5, "completed": False, "id": 1}
+    ]
+    assert task_manager.add_task("Bad")["task_id"] == 2
+    assert task_manager.remove_task(1)["status"] == "success"
+
+
 def test_list_tasks_default_sorting(task_manager):
     """Test default sorting (by ID) in list_tasks."""
     task_manager.add_task("Low priority", priority=1)
@@ -206,6 +245,135 @@ def test_list_tasks_completed_filter(task_manager):
     assert len(tasks) == 2
 
 
+def test_list_tasks_priority_ties_keep_id_order(task_manager):
+    """Test that tasks with equal priority are listed oldest first."""
+    task_manager.add_task("First", priority=2)
+    task_manager.add_task("Second", priority=2)
+    task_manager.add_task("Urgent", priority=9)
+
+    tasks = task_manager.list_tasks(sort_by="priority")
+    assert [t["description"] for t in tasks] == ["Urgent", "First", "Second"]
+
+
+def test_list_tasks_priority_view_follows_edits(task_manager):
+    """Test that the priority view reflects edits and completions."""
+    task_manager.add_task("Task 1", priority=1)
+    task_manager.add_task("Task 2", priority=2)
+    task_manager.add_task("Task 3", priority=3)
+
+    task_manager.edit_task(1, new_priority=10)
+    task_manager.complete_task(3)
+
+    tasks = task_manager.list_tasks(sort_by="priority")
+    assert [t["id"] for t in tasks] == [1, 2]
+
+    tasks = task_manager.list_tasks(sort_by="priority", show_completed=True)
+    assert [t["id"] for t in tasks] == [1, 3, 2]
+
+
+@pytest.mark.parametrize("sort_by", ["id", "priority"])
+def test_list_tasks_pagination(task_manager, sort_by):
+    """Test limit and offset on both sort orders."""
+    for i in range(10):
+        task_manager.add_task(f"Task {i}", priority=i)
+    task_manager.complete_task(5)
+
+    everything = task_manager.list_tasks(sort_by=sort_by)
+    assert len(everything) == 9
+    assert task_manager.list_tasks(sort_by=sort_by, limit=3) == everything[:3]
+    assert task_manager.list_tasks(sort_by=sort_by, offset=7) == everything[7:]
+    assert task_manager.list_tasks(sort_by=sort_by, limit=4, offset=3) == everything[3:7]
+
+    everything = task_manager.list_tasks(sort_by=sort_by, show_completed=True)
+    page = task_manager.list_tasks(
+        sort_by=sort_by, show_completed=True, limit=5, offset=2
+    )
+    assert len(everything) == 10
+    assert page == everything[2:7]
+
+
+def test_next_task(task_manager):
+    """Test popping tasks in priority order."""
+    task_manager.add_task("Low", priority=1)
+    task_manager.add_task("High", priority=5)
+    task_manager.add_task("Done", priority=9)
+    task_manager.complete_task(3)
+
+    result = task_manager.next_task()
+    assert result["status"] == "success"
+    assert result["task"]["description"] == "High"
+
+    assert task_manager.next_task()["task"]["description"] == "Low"
+    assert task_manager.next_task()["status"] == "error"
+    assert len(task_manager.list_tasks(show_completed=True)) == 1
+
+
+def test_listed_tasks_are_copies(task_manager):
+    """Test that changing a returned task dict does not change the stored task."""
+    task_manager.add_task("Task 1", priority=1)
+
+    task_manager.list_tasks()[0]["priority"] = 9
+    task_manager.list_tasks(sort_by="priority")[0]["description"] = "Changed"
+
+    assert task_manager.list_tasks() == [
+        {"description": "Task 1", "priority": 1, "completed": False, "id": 1}
+    ]
+
+
+def test_search_tasks(task_manager):
+    """Test whole-word, case-insensitive, all-words-must-match search."""
+    task_manager.add_tasks(
+        ["Write report", "Review REPORT draft", "Write tests", "Reporting tools"]
+    )
+    task_manager.complete_task(3)
+
+    def ids(query, **kwargs):
+        return [t["id"] for t in task_manager.search_tasks(query, **kwargs)]
+
+    assert ids("report") == [1, 2]
+    assert ids("write") == [1, 3]
+    assert ids("Write, report!") == [1]
+    assert ids("rep") == []
+    assert ids("rep", prefix=True) == [1, 2, 4]
+    assert ids("wr rep", prefix=True) == [1]
+    assert ids("report", limit=1) == [1]
+    assert ids("") == []
+    assert task_manager.search_tasks(None) == []
+
+
+def test_search_index_follows_changes(task_manager, tmp_path):
+    """Test that the search index tracks edits, removals, clears and loads."""
+    task_manager.add_tasks(["Buy milk", "Buy bread", "Sell car"])
+    task_manager.edit_task(1, new_description="Drink milk")
+    task_manager.remove_task(2)
+    assert task_manager.search_tasks("buy") == []
+    assert [t["id"] for t in task_manager.search_tasks("milk")] == [1]
+
+    task_manager.edit_tasks({1: ("Buy car", None)})
+    assert [t["id"] for t in task_manager.search_tasks("car")] == [1, 3]
+    filename = str(tmp_path / "tasks.json")
+    task_manager.save_to_file(filename)
+
+    task_manager.clear_tasks()
+    assert task_manager.search_tasks("car") == []
+    task_manager.load_from_file(filename)
+    assert [t["id"] for t in task_manager.search_tasks("ca", prefix=True)] == [1, 3]
+
+
+def test_sqlite_search_index_survives_reopen(tmp_path):
+    """Test that a database file keeps, or rebuilds, its search index."""
+    path = str(tmp_path / "tasks.db")
+    storage = SQLiteStorage(path)
+    TaskManager(storage=storage).add_tasks(["Plan trip", "Pack bags"])
+    storage._conn.execute("DELETE FROM task_tokens")  # as if written before search
+    storage._conn.commit()
+    storage.close()
+
+    manager = TaskManager(storage=SQLiteStorage(path))
+    assert [t["id"] for t in manager.search_tasks("pa", prefix=True)] == [2]
+    assert manager.add_task("Pack lunch")["task_id"] == 3
+
+
 def test_clear_tasks(task_manager):
     """Test clearing all tasks."""
     task_manager.add_task("Task 1")
@@ -216,7 +384,134 @@ def test_clear_tasks(task_manager):
     assert len(task_manager.list_tasks()) == 0
 
 
-def test_persistence_save_and_load():
+def test_add_tasks(task_manager):
+    """Test adding a batch of descriptions and (description, priority) pairs."""
+    task_manager.add_task("Existing")
+
+    result = task_manager.add_tasks(["A", ("B", 5), ["C", 2]])
+    assert result["status"] == "success"
+    assert result["task_ids"] == [2, 3, 4]
+
+    tasks = task_manager.list_tasks(sort_by="priority")
+    assert [t["description"] for t in tasks] == ["B", "C", "Existing", "A"]
+    assert task_manager.add_task("D")["task_id"] == 5
+
+
+@pytest.mark.parametrize(
+    "batch, index",
+    [
+        (["A", None], 1),
+        (["A", "  "], 1),
+        (["A", "B", "A"], 2),
+        (["A", "Existing"], 1),
+        ([("A", 1), ("B", "x"), ("C", 2)], 1),
+    ],
+)
+def test_add_tasks_is_atomic(task_manager, batch, index):
+    """Test that one bad item rejects the whole batch."""
+    task_manager.add_task("Existing")
+
+    result = task_manager.add_tasks(batch)
+    assert result["status"] == "error"
+    assert result["index"] == index
+    assert len(task_manager.list_tasks()) == 1
+    assert task_manager.add_task("New")["task_id"] == 2
+
+
+def test_complete_and_remove_tasks(task_manager):
+    """Test bulk completion and removal, including the all-or-none rule."""
+    task_manager.add_tasks([f"Task {i}" for i in range(5)])
+
+    assert task_manager.complete_tasks([1, 2, 99])["status"] == "error"
+    assert len(task_manager.list_tasks()) == 5
+
+    result = task_manager.complete_tasks([1, 2, 2])
+    assert result["message"] == "Completed 2 tasks"
+    assert [t["id"] for t in task_manager.list_tasks()] == [3, 4, 5]
+
+    assert task_manager.remove_tasks([3, 99])["status"] == "error"
+    assert len(task_manager.list_tasks(show_completed=True)) == 5
+
+    assert task_manager.remove_tasks([1, 3])["status"] == "success"
+    assert [t["id"] for t in task_manager.list_tasks(show_completed=True)] == [2, 4, 5]
+
+
+def test_edit_tasks(task_manager):
+    """Test bulk edits and their duplicate checks."""
+    task_manager.add_tasks(["A", "B", "C"])
+
+    # Renaming onto another task's description, even one being renamed away
+    assert task_manager.edit_tasks({1: ("B", None), 2: ("Z", None)})["status"] == "error"
+    assert task_manager.edit_tasks({1: ("X", None), 2: ("X", None)})["status"] == "error"
+    assert task_manager.edit_tasks({1: ("", None)})["status"] == "error"
+    assert task_manager.edit_tasks({1: (None, 3), 9: (None, 1)})["status"] == "error"
+    assert [t["description"] for t in task_manager.list_tasks()] == ["A", "B", "C"]
+
+    result = task_manager.edit_tasks({1: ("A", 1), 2: ("Y", None), 3: (None, 7)})
+    assert result["status"] == "success"
+    tasks = task_manager.list_tasks(sort_by="priority")
+    assert [(t["description"], t["priority"]) for t in tasks] == [
+        ("C", 7),
+        ("A", 1),
+        ("Y", 0),
+    ]
+    assert task_manager.add_task("B")["status"] == "success"
+
+
+def test_bulk_operations_keep_priority_order(task_manager):
+    """Test that large batches keep the priority views consistent."""
+    task_manager.add_tasks((f"Task {i}", i % 7) for i in range(200))
+    task_manager.complete_tasks(range(1, 201, 3))
+    task_manager.edit_tasks({i: (None, -i % 5) for i in range(2, 201, 4)})
+    task_manager.remove_tasks(range(5, 201, 5))
+
+    everything = task_manager.list_tasks(show_completed=True)
+    expected = sorted(everything, key=lambda t: (-t["priority"], t["id"]))
+    assert task_manager.list_tasks(sort_by="priority", show_completed=True) == expected
+    pending = [t for t in expected if not t["completed"]]
+    assert task_manager.list_tasks(sort_by="priority") == pending
+
+
+@pytest.mark.parametrize("size", [3, 100])
+def test_memory_storage_bad_priority_changes_nothing(size):
+    """Test that batches with an unorderable priority leave the store intact."""
+    storage = MemoryStorage()
+    tasks = [
+        {"description": f"T{i}", "priority": i, "completed": False, "id": i}
+        for i in range(1, size + 1)
+    ]
+    storage.insert_many(tasks[:-1])
+    before = storage.list(sort_by="priority", show_completed=True)
+
+    with pytest.raises(TypeError):
+        storage.insert_many([tasks[-1], dict(tasks[-1], id=size + 1, priority="x")])
+    with pytest.raises(TypeError):
+        storage.update_many([(1, "Renamed", 5, True), (2, None, "x", None)])
+    assert storage.list(sort_by="priority", show_completed=True) == before
+    assert storage.find_id("Renamed") is None
+    assert storage.max_id() == size - 1
+
+
+@pytest.mark.parametrize("storage", sorted(STORAGES))
+def test_storage_id_lookups(storage):
+    """Test the membership and status lookups TaskManager validates with."""
+    storage = STORAGES[storage]()
+    storage.insert_many(
+        {"description": f"T{i}", "priority": 0, "completed": i == 2, "id": i}
+        for i in range(1, 4)
+    )
+
+    assert 1 in storage and 4 not in storage
+    assert storage.get_status(2) == ("T2", True)
+    assert storage.get_status(3) == ("T3", False)
+    assert storage.get_status(4) is None
+    assert storage.missing_ids([5, 1, 4, 3]) == [5, 4]
+    assert storage.missing_ids(iter([3, 2])) == []
+    assert storage.pending_ids([1, 2, 3, 4]) == {1, 3}
+    assert storage.pending_ids([]) == set()
+
+
+def test_persistence_save_and_load(make_manager):
     """Test saving and loading tasks from a file."""
     # Create a temporary file
     with tempfile.NamedTemporaryFile(delete=False) as temp_file:
@@ -224,7 +519,7 @@ def test_persistence_save_and_load():
 
     try:
         # Add some tasks and save them
-        manager1 = TaskManager()
+        manager1 = make_manager()
         manager1.add_task("Task 1", priority=3)
         manager1.add_task("Task 2", priority=5)
         manager1.complete_task(1)
@@ -233,7 +528,7 @@ def test_persistence_save_and_load():
         assert result["status"] == "success"
 
         # Create a new task manager and load the tasks
-        manager2 = TaskManager()
+        manager2 = make_manager()
         result = manager2.load_from_file(temp_filename)
         assert result["status"] == "success"
 
@@ -274,6 +569,357 @@ def test_persistence_save_to_invalid_path(task_manager):
     assert result["status"] == "error"
 
 
+def test_failed_save_removes_temp_file(task_manager, tmp_path, monkeypatch):
+    """Test that a save failing mid-write leaves no temporary file behind."""
+    import tasks
+
+    def write_then_fail(filename, tasks, file_format):
+        with open(filename, "w") as f:
+            f.write("[")
+        raise OSError("disk full")
+
+    monkeypatch.setattr(tasks, "write_tasks", write_then_fail)
+    task_manager.add_task("Task 1")
+    assert task_manager.save_to_file(str(tmp_path / "tasks.json"))["status"] == "error"
+    assert os.listdir(tmp_path) == []
+
+
+@pytest.mark.parametrize("extension", [".json", ".jsonl", ".tasks"])
+def test_persistence_formats_round_trip(make_manager, tmp_path, extension):
+    """Test that every file format, picked by extension, round-trips tasks."""
+    filename = str(tmp_path / f"tasks{extension}")
+    manager1 = make_manager()
+    manager1.add_tasks([("Plain", 3), ("Ünïcode ✓", -2), ('Quote " and\nnewline', 7)])
+    manager1.complete_task(2)
+    assert manager1.save_to_file(filename)["status"] == "success"
+
+    manager2 = make_manager()
+    assert manager2.load_from_file(filename)["status"] == "success"
+    assert manager2.list_tasks(show_completed=True) == manager1.list_tasks(
+        show_completed=True
+    )
+    assert manager2.add_task("Next")["task_id"] == 4
+
+
+@pytest.mark.parametrize("extension", [".json", ".jsonl", ".tasks"])
+def test_persistence_float_priorities_round_trip(make_manager, tmp_path, extension):
+    """Test that float and large int priorities keep their values and types."""
+    filename = str(tmp_path / f"tasks{extension}")
+    manager1 = make_manager()
+    manager1.add_tasks([("Half", 2.5), ("Whole", 2.0), ("Big", 2**62), ("Low", -0.125)])
+    assert manager1.save_to_file(filename)["status"] == "success"
+    assert os.listdir(tmp_path) == [f"tasks{extension}"]
+
+    manager2 = make_manager()
+    assert manager2.load_from_file(filename)["status"] == "success"
+    expected = manager1.list_tasks(sort_by="priority")
+    loaded = manager2.list_tasks(sort_by="priority")
+    assert loaded == expected
+    assert [type(t["priority"]) for t in loaded] == [
+        type(t["priority"]) for t in expected
+    ]
+
+
+@pytest.mark.parametrize("path", [":memory:", "tasks.db"])
+def test_priority_types_match_across_storages(tmp_path, path):
+    """Test that SQLite returns priorities with the types MemoryStorage keeps."""
+    priorities = [2.0, 2, 2.5, -0.0, 2**63 - 1, -(2**63), float("inf")]
+    tasks = [(f"Task {i}", priority) for i, priority in enumerate(priorities)]
+    path = path if path == ":memory:" else str(tmp_path / path)
+    memory = TaskManager(storage=MemoryStorage())
+    sqlite = TaskManager(storage=SQLiteStorage(path))
+    for manager in (memory, sqlite):
+        manager.add_tasks(tasks[:4])
+        for description, priority in tasks[4:]:
+            manager.add_task(description, priority)
+        manager.edit_task(1, new_priority=3.0)
+    if path != ":memory:":
+        sqlite = TaskManager(storage=SQLiteStorage(path))
+
+    expected = memory.list_tasks(sort_by="priority")
+    listed = sqlite.list_tasks(sort_by="priority")
+    assert listed == expected
+    assert [type(t["priority"]) for t in listed] == [
+        type(t["priority"]) for t in expected
+    ]
+
+
+def test_sqlite_migrates_integer_priority_column(tmp_path):
+    """Test that a database with an INTEGER priority column is rebuilt."""
+    path = str(tmp_path / "tasks.db")
+    conn = sqlite3.connect(path)
+    conn.executescript(
+        SQLiteStorage._SCHEMA.replace("priority NOT NULL", "priority INTEGER NOT NULL")
+    )
+    with conn:
+        conn.execute("INSERT INTO tasks VALUES (1, 'Old task', 2.0, 0)")
+    conn.close()
+
+    manager = TaskManager(storage=SQLiteStorage(path))
+    assert manager.list_tasks() == [
+        {"description": "Old task", "priority": 2, "completed": False, "id": 1}
+    ]
+    manager.edit_task(1, new_priority=2.0)
+    assert manager.add_task("New task", 1.5)["status"] == "success"
+    assert [t["priority"] for t in manager.search_tasks("task")] == [2.0, 1.5]
+    assert type(manager.list_tasks()[0]["priority"]) is float
+
+
+def test_persistence_format_argument(task_manager, tmp_path):
+    """Test that an explicit format overrides the extension."""
+    filename = str(tmp_path / "tasks.json")
+    task_manager.add_task("Task 1")
+    task_manager.save_to_file(filename, file_format="binary")
+
+    assert task_manager.load_from_file(filename)["status"] == "error"
+    assert task_manager.load_from_file(filename, file_format="binary")["status"] == "success"
+    assert task_manager.save_to_file(filename, file_format="xml")["status"] == "error"
+
+
+def test_binary_task_file_random_access(task_manager, tmp_path):
+    """Test reading a binary task file through the memory-mapped view."""
+    filename = str(tmp_path / "tasks.tasks")
+    task_manager.add_tasks(f"Task {i}" for i in range(100))
+    task_manager.remove_tasks(range(2, 101, 2))
+    task_manager.save_to_file(filename)
+
+    expected = task_manager.list_tasks(show_completed=True)
+    with TaskFile(filename) as task_file:
+        assert len(task_file) == 50
+        assert task_file[0] == expected[0]
+        assert task_file[-1] == expected[-1]
+        assert list(task_file) == expected
+        assert task_file.find(51) == {
+            "description": "Task 50",
+            "priority": 0,
+            "completed": False,
+            "id": 51,
+        }
+        assert task_file.find(50) is None
+
+
+def test_truncated_binary_file_leaves_tasks_unchanged(task_manager, tmp_path):
+    """Test that a damaged binary file is rejected without losing tasks."""
+    filename = str(tmp_path / "tasks.tasks")
+    task_manager.add_tasks(["Task 1", "Task 2"])
+    task_manager.save_to_file(filename)
+    with open(filename, "r+b") as f:
+        f.truncate(os.path.getsize(filename) - 4)
+
+    assert task_manager.load_from_file(filename)["status"] == "error"
+    assert len(task_manager.list_tasks()) == 2
+
+
+def test_journal_replays_mutations(make_manager, tmp_path):
+    """Test that journaled mutations survive a restart without a save."""
+    filename = str(tmp_path / "tasks.json")
+
+    manager1 = make_manager()
+    assert manager1.open_journal(filename)["status"] == "success"
+    manager1.add_task("Task 1", priority=1)
+    manager1.add_task("Task 2", priority=2)
+    manager1.add_task("Task 3")
+    manager1.complete_task(1)
+    manager1.edit_task(2, new_description="Task 2 edited", new_priority=7)
+    manager1.remove_task(3)
+    manager1.close_journal()
+
+    manager2 = make_manager()
+    assert manager2.load_from_file(filename)["status"] == "success"
+    assert manager2.list_tasks(show_completed=True) == manager1.list_tasks(
+        show_completed=True
+    )
+    assert manager2.add_task("Task 4")["task_id"] == 4
+
+
+def test_journal_ignores_torn_record(make_manager, tmp_path):
+    """Test that a record cut short by a crash is dropped, not fatal."""
+    filename = str(tmp_path / "tasks.json")
+
+    manager1 = make_manager()
+    manager1.open_journal(filename)
+    manager1.add_task("Task 1")
+    manager1.close_journal()
+    with open(f"{filename}.journal", "ab") as f:
+        f.write(b'["a",2,"Half writ')
+
+    manager2 = make_manager()
+    assert manager2.open_journal(filename)["status"] == "success"
+    manager2.add_task("Task 2")
+    manager2.close_journal()
+
+    manager3 = make_manager()
+    manager3.load_from_file(filename)
+    tasks = manager3.list_tasks()
+    assert [t["description"] for t in tasks] == ["Task 1", "Task 2"]
+
+
+def test_journal_replays_bulk_operations(make_manager, tmp_path):
+    """Test that batches are journaled and replayed like single mutations."""
+    filename = str(tmp_path / "tasks.json")
+
+    manager1 = make_manager()
+    manager1.open_journal(filename)
+    manager1.add_tasks([("A", 1), ("B", 2), ("C", 3)])
+    manager1.complete_tasks([1])
+    manager1.edit_tasks({2: ("B2", 5)})
+    manager1.remove_tasks([3])
+    manager1.close_journal()
+
+    manager2 = make_manager()
+    assert manager2.open_journal(filename)["status"] == "success"
+    assert manager2.list_tasks(show_completed=True) == manager1.list_tasks(
+        show_completed=True
+    )
+    manager2.close_journal()
+
+
+def test_journal_follows_load_from_file(make_manager, tmp_path):
+    """Test that loading another file while journaling survives a restart."""
+    filename = str(tmp_path / "tasks.json")
+    other = str(tmp_path / "other.json")
+    source = make_manager()
+    source.add_tasks(["B1", "B2"])
+    source.save_to_file(other)
+
+    manager1 = make_manager()
+    manager1.open_journal(filename)
+    manager1.add_task("A1")
+    assert manager1.load_from_file(other)["status"] == "success"
+    manager1.remove_task(1)
+    manager1.close_journal()
+
+    manager2 = make_manager()
+    assert manager2.load_from_file(filename)["status"] == "success"
+    assert [t["description"] for t in manager2.list_tasks()] == ["B2"]
+
+
+def test_journal_compaction(make_manager, tmp_path):
+    """Test that the journal is folded into the snapshot periodically."""
+    filename = str(tmp_path / "tasks.json")
+
+    manager1 = make_manager()
+    manager1.open_journal(filename, compact_every=3)
+    for i in range(7):
+        manager1.add_task(f"Task {i}")
+    manager1.close_journal()
+
+    # Two compactions happened; only the last record is still journaled
+    with open(f"{filename}.journal", "rb") as f:
+        assert len(f.readlines()) == 1
+
+    manager2 = make_manager()
+    manager2.load_from_file(filename)
+    assert len(manager2.list_tasks()) == 7
+
+
+@pytest.mark.parametrize("storage", sorted(STORAGES))
+def test_concurrent_task_manager_stress(storage):
+    """Test that many threads mutating and reading at once keep every invariant."""
+    manager = ConcurrentTaskManager(storage=STORAGES[storage]())
+    thread_count, rounds = 8, 150
+    added = [[] for _ in range(thread_count)]
+    removed = [0] * thread_count
+    errors = []
+
+    def worker(n):
+        rng = random.Random(n)
+        try:
+            for i in range(rounds):
+                result = manager.add_task(f"Worker {n} task {i}", rng.randint(0, 5))
+                added[n].append(result["task_id"])
+                target = rng.randint(1, (i + 1) * thread_count)
+                op = rng.random()
+                if op < 0.2:
+                    if manager.remove_task(target)["status"] == "success":
+                        removed[n] += 1
+                elif op < 0.35:
+                    manager.complete_task(target)
+                elif op < 0.5:
+                    manager.edit_task(target, new_priority=rng.randint(0, 5))
+                elif op < 0.6:
+                    batch = [f"Worker {n} batch {i} item {j}" for j in range(3)]
+                    added[n].extend(manager.add_tasks(batch)["task_ids"])
+                else:
+                    tasks = manager.list_tasks(sort_by="priority")
+                    priorities = [t["priority"] for t in tasks]
+                    assert priorities == sorted(priorities, reverse=True)
+        except Exception as e:  # surfaced by the main thread below
+            errors.append(e)
+
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)  # switch threads often to provoke races
+    try:
+        threads = [threading.Thread(target=worker, args=(n,)) for n in range(thread_count)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        sys.setswitchinterval(interval)
+
+    assert not errors
+    ids = [task_id for ids in added for task_id in ids]
+    assert len(ids) == len(set(ids))
+
+    tasks = manager.list_tasks(show_completed=True)
+    assert len(tasks) == len(ids) - sum(removed)
+    assert {t["id"] for t in tasks} <= set(ids)
+    assert len({t["description"] for t in tasks}) == len(tasks)
+    assert manager.list_tasks(sort_by="priority", show_completed=True) == sorted(
+        tasks, key=lambda t: (-t["priority"], t["id"])
+    )
+    assert manager.add_task("Last")["task_id"] == max(ids) + 1
+
+
+def test_rwlock_readers_share_writers_exclude():
+    """Test that readers overlap while a writer waits for them to leave."""
+    lock = RWLock()
+    both_reading = threading.Barrier(2, timeout=5)
+
+    def reader():
+        with lock.read_locked():
+            both_reading.wait()  # times out unless both readers hold the lock
+
+    readers = [threading.Thread(target=reader) for _ in range(2)]
+    for thread in readers:
+        thread.start()
+    for thread in readers:
+        thread.join()
+    assert not both_reading.broken
+
+    writing = threading.Event()
+
+    def writer():
+        with lock.write_locked():
+            with lock.read_locked():  # reentrant for the writing thread
+                writing.set()
+
+    with lock.read_locked():
+        thread = threading.Thread(target=writer)
+        thread.start()
+        assert not writing.wait(0.05)
+    assert writing.wait(5)
+    thread.join()
+
+
+def test_async_task_manager():
+    """Test the asyncio facade from concurrent coroutines."""
+
+    async def scenario():
+        tasks = AsyncTaskManager()
+        results = await asyncio.gather(
+            *(tasks.add_task(f"Task {i}", priority=i % 3) for i in range(20))
+        )
+        assert sorted(r["task_id"] for r in results) == list(range(1, 21))
+        assert (await tasks.complete_task(1))["status"] == "success"
+        return await tasks.list_tasks(sort_by="priority")
+
+    listed = asyncio.run(scenario())
+    assert len(listed) == 19
+    assert listed[0]["priority"] == 2
+
+
 def test_task_id_after_removal(task_manager):
     """Test that task IDs don't get reused after removal."""
     task_manager.add_task("Task 1")  # ID: 1
@@ -317,7 +963,7 @@ def test_unicode_task_description(task_manager):
     assert tasks[0]["description"] == description
 
 
-def test_file_format_corruption():
+def test_file_format_corruption(make_manager):
     """Test loading from a corrupted JSON file."""
     # Create a temporary file with invalid JSON content
     with tempfile.NamedTemporaryFile(delete=False, mode="w") as temp_file:
@@ -325,7 +971,7 @@ def test_file_format_corruption():
         temp_filename = temp_file.name
 
     try:
-        manager = TaskManager()
+        manager = make_manager()
         result = manager.load_from_file(temp_filename)
 
         assert result["status"] == "error"
@@ -334,6 +980,55 @@ def test_file_format_corruption():
             os.remove(temp_filename)
 
 
+def test_edit_task_to_existing_description(task_manager):
+    """Test that editing cannot create a duplicate description."""
+    task_manager.add_task("Task 1")
+    task_manager.add_task("Task 2")
+
+    result = task_manager.edit_task(2, new_description="Task 1")
+    assert result["status"] == "error"
+    assert "already exists" in result["message"]
+
+    # Renaming a task to its own description is a no-op, not a duplicate
+    result = task_manager.edit_task(1, new_description="Task 1")
+    assert result["status"] == "success"
+
+
+def test_description_index_follows_edit_and_remove(task_manager):
+    """Test that freed descriptions can be reused after edit and remove."""
+    task_manager.add_task("Old name")
+    task_manager.add_task("Removed")
+    task_manager.edit_task(1, new_description="New name")
+    task_manager.remove_task(2)
+
+    assert task_manager.add_task("Old name")["status"] == "success"
+    assert task_manager.add_task("Removed")["status"] == "success"
+    assert task_manager.add_task("New name")["status"] == "error"
+
+
+def test_load_does_not_reuse_task_ids(make_manager):
+    """Test that IDs handed out after loading do not collide with loaded ones."""
+    with tempfile.NamedTemporaryFile(delete=False) as temp_file:
+        temp_filename = temp_file.name
+
+    try:
+        manager1 = make_manager()
+        manager1.add_task("Task 1")
+        manager1.add_task("Task 2")
+        manager1.save_to_file(temp_filename)
+
+        manager2 = make_manager()
+        manager2.load_from_file(temp_filename)
+        result = manager2.add_task("Task 3")
+
+        assert result["task_id"] == 3
+        assert manager2.add_task("Task 1")["status"] == "error"
+        assert len(manager2.list_tasks()) == 3
+    finally:
+        if os.path.exists(temp_filename):
+            os.remove(temp_filename)
+
+
 def test_empty_taskmanager_operations(task_manager):
     """Test operations on an empty TaskManager."""
     # List tasks on empty manager
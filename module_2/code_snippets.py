@@ -8,30 +8,37 @@ data manipulation examples using pandas and numpy.
 import pandas as pd
 import numpy as np
 
+try:
+    from .sorting import sort
+    from .weather import DEFAULT_CHUNKSIZE, load_wind, load_wind_cached
+except ImportError:  # imported from inside module_2 rather than as a package
+    from sorting import sort
+    from weather import DEFAULT_CHUNKSIZE, load_wind, load_wind_cached
+
 
 def bubble_sort(arr):
     """
-    Sort an array using the bubble sort algorithm.
+    Sort an array in place and return it.
+
+    Kept for callers of the original bubble sort. The sorting itself is done
+    by ``sorting.sort``, which picks an algorithm suited to the input
+    instead of the O(n^2) neighbour swaps.
 
     Parameters
     ----------
-    arr : list
+    arr : list or numpy.ndarray
         The input array to be sorted.
 
     Returns
     -------
-    list
-        The sorted array in ascending order.
+    list or numpy.ndarray
+        The same array, sorted in ascending order.
     """
-    n = len(arr)
-    for i in range(n):
-        for j in range(0, n - i - 1):
-            if arr[j] > arr[j + 1]:
-                arr[j], arr[j + 1] = arr[j + 1], arr[j]
+    arr[:] = sort(arr)
     return arr
 
 
-def process_weather_data(filename="weather.csv"):
+def process_weather_data(filename="weather.csv", chunksize=None, cache=False):
     """
     Process weather data from a CSV file.
 
@@ -40,6 +47,15 @@ def process_weather_data(filename="weather.csv"):
     filename : str, optional
         Path to the CSV file containing weather data.
         Default is 'weather.csv'.
+    chunksize : int, optional
+        Stream the file this many rows at a time, parsing only the two wind
+        columns, as float32 and int16 (see ``weather.load_wind``). Use it
+        for files too large to load whole. Default is None, which reads the
+        whole file with pandas' default dtypes.
+    cache : bool, optional
+        Read the wind columns through the binary cache of
+        ``weather.load_wind_cached``: parsed in chunks and saved on first
+        use, then memory-mapped until the file changes. Default is False.
 
     Returns
     -------
@@ -53,6 +69,15 @@ def process_weather_data(filename="weather.csv"):
         If the specified file cannot be found.
     """
     try:
+        if cache:
+            wind_speed, wind_direction = load_wind_cached(
+                filename, chunksize=chunksize or DEFAULT_CHUNKSIZE
+            )
+            return wind_speed, wind_direction, np.deg2rad(wind_direction)
+        if chunksize is not None:
+            wind_speed, wind_direction = load_wind(filename, chunksize)
+            return wind_speed, wind_direction, np.deg2rad(wind_direction)
+
         weather_df = pd.read_csv(filename)
 
         # Numpy is faster so convert
@@ -0,0 +1,133 @@
+"""
+Adaptive sorting that picks an algorithm from the shape of the input.
+
+``sort`` returns the same result as ``sorted`` and dispatches as follows:
+
+- Input that is mostly in ascending or descending runs, judged from a small
+  sample of neighbouring pairs, goes to ``sorted``. Its Timsort finds the
+  runs and merges them, in close to linear time for nearly sorted data.
+- Large lists of ``int`` values, without a ``key``, are sorted by value
+  in NumPy: a counting sort when the range of values is bounded,
+  ``np.sort`` otherwise.
+- 1-D NumPy arrays are sorted the same way and returned as arrays.
+- Anything else uses ``sorted``. That includes every call with a ``key``
+  and lists of floats, where converting to and from an array costs about
+  as much as NumPy saves.
+"""
+
+import numpy as np
+
+# Smallest int lists worth a NumPy round trip: for a counting sort, and for
+# np.sort when the values are too spread out to count
+COUNTING_MIN_SIZE = 2_048
+NUMPY_SORT_MIN_SIZE = 16_384
+# Neighbouring pairs sampled to decide whether the input is mostly in runs
+RUN_PROBES = 64
+# Counting sort is used while max - min stays within the larger of this and
+# twice the number of values
+COUNTING_MIN_SPAN = 1 << 16
+
+
+def _mostly_in_runs(values, probes=RUN_PROBES):
+    """
+    Guess whether ``values`` is nearly sorted, ascending or descending.
+
+    Compares ``probes`` evenly spaced neighbouring pairs and reports True when
+    at most one in sixteen of the ordered pairs goes against the majority.
+    """
+    step = max(1, (len(values) - 1) // probes)
+    ascending = descending = 0
+    for i in range(0, len(values) - 1, step):
+        if values[i + 1] < values[i]:
+            descending += 1
+        elif values[i] < values[i + 1]:
+            ascending += 1
+    return min(ascending, descending) <= (ascending + descending) // 16
+
+
+def _int_array(values):
+    """
+    Return ``values`` as an int64 array, or None unless all are plain ints.
+
+    Subclasses such as bool are refused, so ``tolist`` on the sorted array
+    gives back values equal to and of the same type as the input's.
+    """
+    if set(map(type, values)) != {int}:
+        return None
+    try:
+        return np.array(values, dtype=np.int64)
+    except OverflowError:
+        return None
+
+
+def _counting_sort(array, reverse):
+    """Sort an integer array by counting each value, or return None if too spread."""
+    low, high = array.min(), array.max()
+    if int(high) - int(low) > max(COUNTING_MIN_SPAN, 2 * array.size):
+        return None
+    offset_type = np.uint64 if array.dtype.kind == "u" else np.int64
+    offsets = np.subtract(array, low, dtype=offset_type)
+    counts = np.bincount(offsets.astype(np.intp))
+    levels = (np.arange(counts.size, dtype=offset_type) + low).astype(array.dtype)
+    if reverse:
+        levels, counts = levels[::-1], counts[::-1]
+    return np.repeat(levels, counts)
+
+
+def _sort_array(array, reverse, counting_only=False):
+    """Sort a 1-D array; with ``counting_only``, None when too spread to count."""
+    if array.dtype.kind in "iu" and array.size:
+        result = _counting_sort(array, reverse)
+        if result is not None or counting_only:
+            return result
+    result = np.sort(array)
+    if not reverse:
+        return result
+    if result.dtype.kind in "fc" and result.size and np.isnan(result[-1]):
+        # np.sort puts NaNs last; keep them there and reverse the rest
+        first_nan = int(np.isnan(result).argmax())
+        result[:first_nan] = result[:first_nan][::-1]
+        return result
+    return result[::-1].copy()
+
+
+def sort(values, key=None, reverse=False):
+    """
+    Return a sorted copy of ``values``, choosing the algorithm adaptively.
+
+    Parameters
+    ----------
+    values : iterable or numpy.ndarray
+        Values to sort. The input is not modified.
+    key : callable, optional
+        Function of one argument giving the sort key of each value, as for
+        ``sorted``.
+    reverse : bool, optional
+        Sort in descending order. Equal values keep their input order.
+        Default is False.
+
+    Returns
+    -------
+    list or numpy.ndarray
+        A new array when ``values`` is a 1-D array and no ``key`` is given,
+        in which case NaNs sort last as in ``np.sort``, with ``reverse`` too;
+        otherwise a new list equal to
+        ``sorted(values, key=key, reverse=reverse)``.
+    """
+    if isinstance(values, np.ndarray) and values.ndim == 1 and key is None:
+        return _sort_array(values, reverse)
+    if not isinstance(values, list):
+        values = list(values)
+    if (
+        key is None
+        and len(values) >= COUNTING_MIN_SIZE
+        and type(values[0]) is int
+        and not _mostly_in_runs(values)
+    ):
+        array = _int_array(values)
+        if array is not None:
+            counting_only = len(values) < NUMPY_SORT_MIN_SIZE
+            result = _sort_array(array, reverse, counting_only)
+            if result is not None:
+                return result.tolist()
+    return sorted(values, key=key, reverse=reverse)
@@ -0,0 +1,112 @@
+"""
+Benchmark sorting.sort against sorted() across input distributions.
+
+Usage:
+    python sorting_benchmarks.py
+    python sorting_benchmarks.py --sizes 1000 100000 --repeat 5
+
+Each distribution is timed as a list of floats, a list of ints and a NumPy
+array. The original bubble sort is timed as well on sizes up to
+BUBBLE_MAX_SIZE, beyond which it takes too long.
+"""
+
+import argparse
+import random
+import time
+
+import numpy as np
+
+from sorting import sort
+
+SIZES = (1_000, 100_000, 1_000_000)
+BUBBLE_MAX_SIZE = 2_000
+
+
+def legacy_bubble_sort(arr):
+    """The O(n^2) bubble sort that code_snippets.bubble_sort used to run."""
+    n = len(arr)
+    for i in range(n):
+        for j in range(0, n - i - 1):
+            if arr[j] > arr[j + 1]:
+                arr[j], arr[j + 1] = arr[j + 1], arr[j]
+    return arr
+
+
+def distributions(size, seed=0):
+    """
+    Return test inputs of ``size`` values by distribution name.
+
+    Parameters
+    ----------
+    size : int
+        Number of values in each input.
+    seed : int, optional
+        Seed for the random values. Default is 0.
+
+    Returns
+    -------
+    dict
+        Maps "random", "sorted", "reversed", "nearly sorted" and
+        "few unique" to lists of floats.
+    """
+    rng = random.Random(seed)
+    values = [rng.uniform(0, 1_000_000) for _ in range(size)]
+    nearly = sorted(values)
+    for _ in range(size // 100):
+        i, j = rng.randrange(size), rng.randrange(size)
+        nearly[i], nearly[j] = nearly[j], nearly[i]
+    return {
+        "random": values,
+        "sorted": sorted(values),
+        "reversed": sorted(values, reverse=True),
+        "nearly sorted": nearly,
+        "few unique": [float(rng.randrange(8)) for _ in range(size)],
+    }
+
+
+def best_time(func, data, repeat):
+    """Return the best of ``repeat`` runs of ``func`` on copies of ``data``, in ms."""
+    best = float("inf")
+    for _ in range(repeat):
+        copy = data.copy()
+        start = time.perf_counter()
+        func(copy)
+        best = min(best, time.perf_counter() - start)
+    return best * 1e3
+
+
+def run(sizes=SIZES, repeat=3):
+    """Print a table of sort times in ms per size and distribution."""
+    columns = {
+        "sorted floats": lambda data: (sorted, data),
+        "sort floats": lambda data: (sort, data),
+        "sorted ints": lambda data: (sorted, [int(x) for x in data]),
+        "sort ints": lambda data: (sort, [int(x) for x in data]),
+        "sort ndarray": lambda data: (sort, np.array(data)),
+        "bubble floats": lambda data: (legacy_bubble_sort, data),
+    }
+    header = "".join(f"{name:>15}" for name in columns)
+    print(f"{'size':>9} {'distribution':<14}{header}")
+    for size in sizes:
+        for name, data in distributions(size).items():
+            cells = []
+            for column, prepare in columns.items():
+                if column.startswith("bubble") and size > BUBBLE_MAX_SIZE:
+                    cells.append(f"{'-':>15}")
+                    continue
+                func, prepared = prepare(data)
+                cells.append(f"{best_time(func, prepared, repeat):15.2f}")
+            print(f"{size:>9} {name:<14}" + "".join(cells))
+
+
+def main(argv=None):
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(SIZES))
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+    run(args.sizes, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
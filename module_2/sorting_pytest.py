@@ -0,0 +1,170 @@
+import pytest
+import random
+
+import numpy as np
+
+import sorting
+from code_snippets import bubble_sort
+from sorting import COUNTING_MIN_SIZE, NUMPY_SORT_MIN_SIZE, sort
+
+INT64_MIN, INT64_MAX = -(2**63), 2**63 - 1
+
+
+def shuffled(values, seed=0):
+    """Return ``values`` as a list in random order."""
+    values = list(values)
+    random.Random(seed).shuffle(values)
+    return values
+
+
+def ints(low, high, count, seed=0):
+    """Return ``count`` random integers in ``[low, high)``."""
+    rng = random.Random(seed)
+    return [rng.randrange(low, high) for _ in range(count)]
+
+
+def nearly_sorted(count, swaps, seed=0):
+    """Return ``range(count)`` as a list with ``swaps`` random pairs swapped."""
+    rng = random.Random(seed)
+    values = list(range(count))
+    for _ in range(swaps):
+        i, j = rng.randrange(count), rng.randrange(count)
+        values[i], values[j] = values[j], values[i]
+    return values
+
+
+@pytest.fixture
+def dispatch(monkeypatch):
+    """Record which algorithm sorted each list: sorted, counting or np.sort."""
+    paths = []
+    sort_array, counting_sort = sorting._sort_array, sorting._counting_sort
+
+    def record_sort_array(array, reverse, counting_only=False):
+        counted = len(paths)
+        result = sort_array(array, reverse, counting_only)
+        if result is not None and len(paths) == counted:
+            paths.append("np.sort")
+        return result
+
+    def record_counting_sort(array, reverse):
+        result = counting_sort(array, reverse)
+        if result is not None:
+            paths.append("counting")
+        return result
+
+    monkeypatch.setattr(sorting, "_sort_array", record_sort_array)
+    monkeypatch.setattr(sorting, "_counting_sort", record_counting_sort)
+    return paths
+
+
+# Sizes that reach the counting sort and np.sort for int lists
+SIZE = 2 * COUNTING_MIN_SIZE
+BIG = 2 * NUMPY_SORT_MIN_SIZE
+WIDE = 10**12
+# Name: (values, algorithm sort should pick)
+LIST_CASES = {
+    "small": ([3, 1, 2], "sorted"),
+    "ascending runs": (list(range(SIZE)) * 2, "sorted"),
+    "descending": (list(range(SIZE, 0, -1)), "sorted"),
+    "nearly sorted": (nearly_sorted(SIZE, 20), "sorted"),
+    "narrow ints": (ints(-50, 50, SIZE), "counting"),
+    "wide ints, mid size": (ints(-WIDE, WIDE, SIZE), "sorted"),
+    "wide ints": (ints(-WIDE, WIDE, BIG), "np.sort"),
+    "int64 extremes": (shuffled([INT64_MIN, INT64_MAX, 0, -1] * SIZE), "np.sort"),
+    "int64 top": (shuffled(range(INT64_MAX - SIZE, INT64_MAX + 1)), "counting"),
+    "beyond int64": (shuffled([INT64_MAX + 1, INT64_MIN - 1, *range(BIG)]), "sorted"),
+    "bool and int": (shuffled([True, False, 1, 0, 2] * SIZE), "sorted"),
+    "int then bool": ([1] + shuffled([True, 0, False, 3] * SIZE), "sorted"),
+    "int then float": ([1] + [n / 7 for n in ints(0, 100, SIZE)], "sorted"),
+    "floats": ([n / 7 for n in ints(-WIDE, WIDE, BIG)], "sorted"),
+    "strings": ([str(n) for n in ints(0, WIDE, SIZE)], "sorted"),
+    "empty": ([], "sorted"),
+}
+
+
+@pytest.mark.parametrize("values, path", LIST_CASES.values(), ids=list(LIST_CASES))
+@pytest.mark.parametrize("reverse", [False, True])
+def test_sort_matches_sorted(dispatch, values, path, reverse):
+    """Test each dispatch path against sorted, values and types alike."""
+    original = list(values)
+    result = sort(values, reverse=reverse)
+    expected = sorted(values, reverse=reverse)
+
+    assert result == expected
+    assert list(map(type, result)) == list(map(type, expected))
+    assert dispatch == ([] if path == "sorted" else [path])
+    assert values == original
+
+
+def test_sort_key_and_reverse_are_stable(dispatch):
+    """Test that a key always goes to sorted and keeps equal keys in order."""
+    pairs = [(n, i) for i, n in enumerate(ints(0, 10, SIZE))]
+    for reverse in (False, True):
+        assert sort(pairs, key=lambda p: p[0], reverse=reverse) == sorted(
+            pairs, key=lambda p: p[0], reverse=reverse
+        )
+    numbers = ints(0, 100, BIG)
+    assert sort(numbers, key=lambda n: -n) == sorted(numbers, key=lambda n: -n)
+    assert sort(iter(numbers[:5])) == sorted(numbers[:5])
+    assert dispatch == []
+
+
+@pytest.mark.parametrize(
+    "values",
+    [
+        pytest.param(np.array([5, -3, 0, 5, 127, -128], dtype=np.int8), id="int8"),
+        pytest.param(np.arange(1000).astype(np.uint8)[::-1], id="uint8"),
+        pytest.param(np.array([INT64_MAX, INT64_MIN, 0, 7] * 50), id="int64"),
+        pytest.param(np.array([2**64 - 1, 0, 2**63, 5] * 50, np.uint64), id="uint64"),
+        pytest.param(
+            np.array(shuffled(range(2**64 - SIZE, 2**64)), np.uint64), id="top"
+        ),
+        pytest.param(np.array([0.5, -1.0, 2.0, -0.0, 0.5]), id="float"),
+        pytest.param(np.array([True, False, True]), id="bool"),
+        pytest.param(np.array([], dtype=np.int64), id="empty"),
+    ],
+)
+@pytest.mark.parametrize("reverse", [False, True])
+def test_sort_arrays(values, reverse):
+    """Test that arrays come back as new arrays of the same dtype, like np.sort."""
+    original = values.copy()
+    result = sort(values, reverse=reverse)
+    expected = np.sort(values)[::-1] if reverse else np.sort(values)
+
+    assert isinstance(result, np.ndarray)
+    assert result.dtype == values.dtype
+    np.testing.assert_array_equal(result, expected)
+    np.testing.assert_array_equal(values, original)
+
+
+@pytest.mark.parametrize("dtype", [np.float64, np.float32, np.complex128])
+def test_sort_arrays_keep_nans_last(dtype):
+    """Test that NaNs sort last in both directions, as in np.sort."""
+    values = np.array([2.0, np.nan, -1.0, 3.0, np.nan, 0.0], dtype=dtype)
+
+    np.testing.assert_array_equal(sort(values), [-1.0, 0.0, 2.0, 3.0, np.nan, np.nan])
+    result = sort(values, reverse=True)
+    np.testing.assert_array_equal(result, [3.0, 2.0, 0.0, -1.0, np.nan, np.nan])
+    assert result.dtype == dtype
+    assert np.isnan(sort(np.array([np.nan, np.nan], dtype=dtype), reverse=True)).all()
+
+
+@pytest.mark.parametrize(
+    "values",
+    [
+        [3, 1, 2],
+        ints(-50, 50, SIZE),
+        np.array([3.0, 1.0, np.nan, 2.0]),
+        np.array(ints(0, 1000, SIZE)),
+    ],
+)
+def test_bubble_sort_sorts_in_place(values):
+    """Test that bubble_sort sorts the object it is given and returns it."""
+    expected = sort(values)
+    result = bubble_sort(values)
+
+    assert result is values
+    if isinstance(values, np.ndarray):
+        np.testing.assert_array_equal(values, expected)
+    else:
+        assert values == expected
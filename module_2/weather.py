@@ -0,0 +1,189 @@
+"""
+Streaming loader and binary cache for the wind columns of weather CSV files.
+
+``process_weather_data`` reads the whole CSV, with all of its columns and
+pandas' default dtypes, to keep two of them. The functions here read only
+the wind speed and direction columns, parse them straight into float32 and
+int16, and go through the file ``chunksize`` rows at a time. Memory use is
+then set by one chunk rather than by the size of the file.
+
+``load_wind_cached`` also saves the parsed columns as ``.npy`` files in a
+cache directory, keyed by the CSV's path, modification time and size.
+Later calls memory-map those files instead of parsing the CSV again, and a
+changed CSV gets a new entry that replaces the old one.
+"""
+
+import hashlib
+import os
+import shutil
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+WIND_SPEED = "Data.Wind.Speed"
+WIND_DIRECTION = "Data.Wind.Direction"
+WIND_DTYPES = {WIND_SPEED: np.float32, WIND_DIRECTION: np.int16}
+# Rows parsed at a time; each chunk holds about 6 bytes per row once parsed
+DEFAULT_CHUNKSIZE = 100_000
+# Cache directory created next to the CSV file unless one is given
+CACHE_DIRNAME = ".weather_cache"
+# Part of every cache key; bump it when the cached layout changes
+CACHE_VERSION = 1
+
+
+def iter_wind_chunks(filename="weather.csv", chunksize=DEFAULT_CHUNKSIZE):
+    """
+    Yield the wind columns of a weather CSV file one chunk at a time.
+
+    Parameters
+    ----------
+    filename : str or path-like, optional
+        Path to the CSV file. Default is 'weather.csv'.
+    chunksize : int, optional
+        Number of rows in each chunk. Default is DEFAULT_CHUNKSIZE.
+
+    Yields
+    ------
+    tuple of numpy.ndarray
+        ``(wind_speed, wind_direction)`` for the next ``chunksize`` rows,
+        as float32 and int16 arrays.
+
+    Raises
+    ------
+    FileNotFoundError
+        If the file cannot be found.
+    ValueError
+        If a wind column is missing, or a value does not fit its dtype
+        (for example a blank wind direction).
+    """
+    reader = pd.read_csv(
+        filename,
+        usecols=list(WIND_DTYPES),
+        dtype=WIND_DTYPES,
+        chunksize=chunksize,
+    )
+    with reader:
+        for chunk in reader:
+            yield chunk[WIND_SPEED].to_numpy(), chunk[WIND_DIRECTION].to_numpy()
+
+
+def load_wind(filename="weather.csv", chunksize=DEFAULT_CHUNKSIZE):
+    """
+    Read the wind columns of a weather CSV file in chunks.
+
+    Parameters
+    ----------
+    filename : str or path-like, optional
+        Path to the CSV file. Default is 'weather.csv'.
+    chunksize : int, optional
+        Number of rows parsed at a time. Default is DEFAULT_CHUNKSIZE.
+
+    Returns
+    -------
+    tuple of numpy.ndarray
+        ``(wind_speed, wind_direction)`` for the whole file, as float32 and
+        int16 arrays.
+    """
+    speeds, directions = [], []
+    for speed, direction in iter_wind_chunks(filename, chunksize):
+        speeds.append(speed)
+        directions.append(direction)
+    if not speeds:
+        return np.empty(0, np.float32), np.empty(0, np.int16)
+    return np.concatenate(speeds), np.concatenate(directions)
+
+
+def _cache_entry(filename, cache_dir):
+    """Return ``(cache_dir, path_prefix, entry_name)`` for ``filename`` as it is now."""
+    path = os.path.realpath(filename)
+    stat = os.stat(path)
+    if cache_dir is None:
+        cache_dir = os.path.join(os.path.dirname(path), CACHE_DIRNAME)
+    prefix = hashlib.sha1(os.fsencode(path)).hexdigest()[:16]
+    name = f"{prefix}-v{CACHE_VERSION}-{stat.st_mtime_ns}-{stat.st_size}"
+    return cache_dir, prefix, name
+
+
+def _load_entry(entry):
+    """Memory-map the cached columns in ``entry``, read-only."""
+    return tuple(
+        np.load(os.path.join(entry, f"{column}.npy"), mmap_mode="r")
+        for column in WIND_DTYPES
+    )
+
+
+def _store_entry(cache_dir, prefix, name, columns):
+    """
+    Save ``columns`` as the cache entry ``name`` and drop older entries.
+
+    The files are written to a temporary directory that is then renamed,
+    so readers never see a partial entry. If another process stores the
+    same entry first, or the cache directory is not writable, nothing is
+    cached.
+    """
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        tmp = tempfile.mkdtemp(prefix=".tmp-", dir=cache_dir)
+    except OSError:
+        return
+    try:
+        for column, values in zip(WIND_DTYPES, columns):
+            np.save(os.path.join(tmp, f"{column}.npy"), values)
+        os.rename(tmp, os.path.join(cache_dir, name))
+    except OSError:
+        shutil.rmtree(tmp, ignore_errors=True)
+        return
+    for other in os.listdir(cache_dir):
+        if other.startswith(prefix + "-") and other != name:
+            shutil.rmtree(os.path.join(cache_dir, other), ignore_errors=True)
+
+
+def load_wind_cached(
+    filename="weather.csv", cache_dir=None, chunksize=DEFAULT_CHUNKSIZE
+):
+    """
+    Read the wind columns of a weather CSV file through a binary cache.
+
+    The first call for a given version of the file parses it with
+    ``load_wind`` and saves the columns as ``.npy`` files. Later calls
+    memory-map those files, so only the pages that are used get read.
+    Changing the file (its modification time or size) invalidates the cache.
+
+    Parameters
+    ----------
+    filename : str or path-like, optional
+        Path to the CSV file. Default is 'weather.csv'.
+    cache_dir : str or path-like, optional
+        Directory holding the cache. Default is CACHE_DIRNAME next to the
+        CSV file.
+    chunksize : int, optional
+        Number of rows parsed at a time when the cache is built. Default is
+        DEFAULT_CHUNKSIZE.
+
+    Returns
+    -------
+    tuple of numpy.ndarray
+        ``(wind_speed, wind_direction)`` as float32 and int16 arrays. These
+        are read-only memory maps when they come from the cache.
+
+    Raises
+    ------
+    FileNotFoundError
+        If the CSV file cannot be found.
+    """
+    cache_dir, prefix, name = _cache_entry(filename, cache_dir)
+    entry = os.path.join(cache_dir, name)
+    try:
+        return _load_entry(entry)
+    except (FileNotFoundError, ValueError):
+        # No entry, or one missing a file, truncated or corrupt. A partial
+        # entry would block the rename that stores the new one, so remove it
+        shutil.rmtree(entry, ignore_errors=True)
+
+    columns = load_wind(filename, chunksize)
+    # Skip caching if the file changed while it was being read
+    if _cache_entry(filename, cache_dir)[2] == name:
+        _store_entry(cache_dir, prefix, name, columns)
+    return columns
+
@@ -0,0 +1,109 @@
+"""
+Benchmark the eager and streaming paths of process_weather_data.
+
+Usage:
+    python weather_benchmarks.py
+    python weather_benchmarks.py --copies 500 --chunksize 200000
+
+Builds a large CSV file by repeating the rows of weather.csv ``--copies``
+times, then times each mode in a fresh subprocess and reports its peak
+resident memory above the interpreter's baseline:
+
+- ``eager``: ``process_weather_data(filename)``, the full read.
+- ``streaming``: ``process_weather_data(filename, chunksize)``.
+- ``chunks``: iterating ``weather.iter_wind_chunks`` without keeping the
+  arrays, the memory floor for a consumer that aggregates per chunk.
+- ``cache_miss`` then ``cache_hit``: ``process_weather_data(filename,
+  chunksize, cache=True)``, first building the ``.npy`` cache and then
+  memory-mapping it.
+
+Peak memory comes from ``resource.getrusage``, so this runs on Unix only.
+"""
+
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+from code_snippets import process_weather_data
+from weather import DEFAULT_CHUNKSIZE, iter_wind_chunks
+
+MODES = ("eager", "streaming", "chunks", "cache_miss", "cache_hit")
+
+
+def peak_rss_bytes():
+    """Return this process's peak resident set size in bytes."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def write_large_csv(path, copies, source="weather.csv"):
+    """Write ``source`` with its data rows repeated ``copies`` times to ``path``."""
+    with open(source, "rb") as f:
+        header = f.readline()
+        rows = f.read()
+    if not rows.endswith(b"\n"):
+        rows += b"\n"
+    with open(path, "wb") as f:
+        f.write(header)
+        for _ in range(copies):
+            f.write(rows)
+
+
+def measure(mode, filename, chunksize):
+    """Run one mode in this process; return its seconds and peak memory growth."""
+    baseline = peak_rss_bytes()
+    start = time.perf_counter()
+    if mode == "eager":
+        rows = len(process_weather_data(filename)[0])
+    elif mode == "streaming":
+        rows = len(process_weather_data(filename, chunksize)[0])
+    elif mode in ("cache_miss", "cache_hit"):
+        rows = len(process_weather_data(filename, chunksize, cache=True)[0])
+    else:
+        rows = sum(len(speed) for speed, _ in iter_wind_chunks(filename, chunksize))
+    seconds = time.perf_counter() - start
+    return {"rows": rows, "seconds": seconds, "peak_bytes": peak_rss_bytes() - baseline}
+
+
+def run(copies=100, chunksize=DEFAULT_CHUNKSIZE):
+    """Print time and peak memory of each mode on a ``copies``-times weather.csv."""
+    with tempfile.TemporaryDirectory() as tmp:
+        filename = os.path.join(tmp, "weather_large.csv")
+        write_large_csv(filename, copies)
+        size_mb = os.path.getsize(filename) / 1e6
+        print(f"{filename}: {size_mb:.0f} MB, chunksize {chunksize}")
+        print(f"{'mode':<10}{'rows':>12}{'seconds':>10}{'peak MB':>10}")
+        for mode in MODES:
+            output = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), "--measure", mode,
+                 "--file", filename, "--chunksize", str(chunksize)],
+                check=True, capture_output=True, text=True,
+            ).stdout  # fmt: skip
+            result = json.loads(output)
+            print(
+                f"{mode:<10}{result['rows']:>12}{result['seconds']:>10.2f}"
+                f"{result['peak_bytes'] / 1e6:>10.1f}"
+            )
+
+
+def main(argv=None):
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--copies", type=int, default=100)
+    parser.add_argument("--chunksize", type=int, default=DEFAULT_CHUNKSIZE)
+    parser.add_argument("--measure", choices=MODES, help=argparse.SUPPRESS)
+    parser.add_argument("--file", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+    if args.measure:
+        print(json.dumps(measure(args.measure, args.file, args.chunksize)))
+    else:
+        run(args.copies, args.chunksize)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+import pytest
+import os
+
+import numpy as np
+import pandas as pd
+
+from code_snippets import process_weather_data
+from weather import (
+    CACHE_DIRNAME,
+    WIND_DIRECTION,
+    WIND_SPEED,
+    iter_wind_chunks,
+    load_wind,
+    load_wind_cached,
+)
+
+WEATHER_CSV = os.path.join(os.path.dirname(os.path.abspath(__file__)), "weather.csv")
+ROWS = 16_743
+
+
+@pytest.fixture(scope="module")
+def eager():
+    """Return process_weather_data's result for weather.csv read whole."""
+    return process_weather_data(WEATHER_CSV)
+
+
+@pytest.fixture
+def empty_csv(tmp_path):
+    """Write a weather CSV file with a header and no rows."""
+    path = tmp_path / "empty.csv"
+    path.write_text(f'"Station.Code","{WIND_DIRECTION}","{WIND_SPEED}"\n')
+    return str(path)
+
+
+@pytest.fixture
+def small_csv(tmp_path):
+    """Write a small weather CSV file; the cache goes next to it."""
+    path = tmp_path / "weather.csv"
+    frame = pd.DataFrame(
+        {"Station.Code": ["A", "B", "A"], WIND_DIRECTION: [350, 10, 180]}
+    )
+    frame[WIND_SPEED] = [1.5, 2.25, 0.0]
+    frame.to_csv(path, index=False)
+    return path
+
+
+def cache_entries(csv_path):
+    """Return the names of the cache entries next to ``csv_path``."""
+    return sorted(os.listdir(csv_path.parent / CACHE_DIRNAME))
+
+
+def assert_same_wind(chunked, eager):
+    """Assert that chunked columns hold the eager values in compact dtypes."""
+    speed, direction = chunked[:2]
+    assert speed.dtype == np.float32
+    assert direction.dtype == np.int16
+    np.testing.assert_array_equal(speed, eager[0].astype(np.float32))
+    np.testing.assert_array_equal(direction, eager[1])
+
+
+# 997 and 1000 leave a short last chunk, 5581 divides the rows into three
+@pytest.mark.parametrize("chunksize", [997, 1000, 5581, ROWS, 100_000])
+def test_chunked_matches_eager(eager, chunksize):
+    """Test every chunked reader against the whole-file pandas read."""
+    assert len(eager[0]) == ROWS
+
+    chunks = list(iter_wind_chunks(WEATHER_CSV, chunksize))
+    full, rest = divmod(ROWS, chunksize)
+    expected = [chunksize] * full + ([rest] if rest else [])
+    assert [len(speed) for speed, _ in chunks] == expected
+    assert all(len(speed) == len(direction) for speed, direction in chunks)
+    assert_same_wind(tuple(map(np.concatenate, zip(*chunks))), eager)
+
+    assert_same_wind(load_wind(WEATHER_CSV, chunksize), eager)
+
+    speed, direction, direction_rad = process_weather_data(WEATHER_CSV, chunksize)
+    assert_same_wind((speed, direction), eager)
+    np.testing.assert_allclose(direction_rad, eager[2], rtol=1e-6)
+
+
+def test_chunked_empty_file(empty_csv):
+    """Test that a header-only file gives empty columns on every path."""
+    # pandas yields one empty chunk rather than none
+    assert all(len(speed) == 0 for speed, _ in iter_wind_chunks(empty_csv, 10))
+
+    speed, direction = load_wind(empty_csv, 10)
+    assert speed.dtype == np.float32 and speed.shape == (0,)
+    assert direction.dtype == np.int16 and direction.shape == (0,)
+
+    eager = process_weather_data(empty_csv)
+    chunked = process_weather_data(empty_csv, chunksize=10)
+    assert [len(values) for values in eager] == [0, 0, 0]
+    assert [len(values) for values in chunked] == [0, 0, 0]
+
+
+def test_chunked_rejects_missing_direction(tmp_path):
+    """Test that a blank direction, which int16 cannot hold, is an error."""
+    path = tmp_path / "blank.csv"
+    frame = pd.DataFrame({WIND_DIRECTION: [10, None], WIND_SPEED: [1.5, 2.0]})
+    frame.to_csv(path, index=False)
+
+    with pytest.raises(ValueError):
+        load_wind(path, 1)
+
+
+def test_cache_hit_returns_memory_maps(small_csv):
+    """Test that the first call parses and stores, and later ones memory-map."""
+    first = load_wind_cached(small_csv)
+    assert not isinstance(first[0], np.memmap)
+    assert len(cache_entries(small_csv)) == 1
+
+    second = load_wind_cached(small_csv)
+    assert all(isinstance(values, np.memmap) for values in second)
+    assert_same_wind(second, load_wind(small_csv))
+    assert not second[0].flags.writeable
+
+    speed, direction, direction_rad = process_weather_data(small_csv, cache=True)
+    assert isinstance(speed, np.memmap)
+    np.testing.assert_allclose(direction_rad, np.deg2rad([350, 10, 180]), rtol=1e-6)
+
+
+@pytest.mark.parametrize("change", ["mtime", "size"])
+def test_cache_changed_file_replaces_entry(small_csv, change):
+    """Test that a new modification time or size gives a new entry."""
+    load_wind_cached(small_csv)
+    [old] = cache_entries(small_csv)
+
+    if change == "mtime":
+        stat = os.stat(small_csv)
+        os.utime(small_csv, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    else:
+        stat = os.stat(small_csv)
+        with open(small_csv, "a") as f:
+            f.write("C,90,4.5\n")
+        os.utime(small_csv, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+
+    speed, direction = load_wind_cached(small_csv)
+    [new] = cache_entries(small_csv)
+    assert new != old
+    expected = [350, 10, 180] + [90] * (change == "size")
+    np.testing.assert_array_equal(direction, expected)
+    assert isinstance(load_wind_cached(small_csv)[0], np.memmap)
+
+
+@pytest.mark.parametrize("damage", ["truncated", "garbage", "missing"])
+def test_cache_damaged_entry_is_rebuilt(small_csv, damage):
+    """Test that a corrupt or incomplete entry is replaced, not trusted."""
+    load_wind_cached(small_csv)
+    [entry] = cache_entries(small_csv)
+    column = small_csv.parent / CACHE_DIRNAME / entry / f"{WIND_SPEED}.npy"
+    if damage == "truncated":
+        column.write_bytes(column.read_bytes()[:-4])
+    elif damage == "garbage":
+        column.write_bytes(b"not an array")
+    else:
+        column.unlink()
+
+    assert_same_wind(load_wind_cached(small_csv), load_wind(small_csv))
+    assert cache_entries(small_csv) == [entry]
+    rebuilt = load_wind_cached(small_csv)
+    assert all(isinstance(values, np.memmap) for values in rebuilt)
+    assert_same_wind(rebuilt, load_wind(small_csv))
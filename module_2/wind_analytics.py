@@ -0,0 +1,260 @@
+"""
+Vectorized wind analytics on the arrays process_weather_data returns.
+
+Directions follow the meteorological convention: the angle the wind blows
+from, clockwise from north. ``wind_components`` splits wind into its
+eastward (u) and northward (v) components, and ``circular_mean`` averages
+directions on the circle, so 350 and 10 degrees average to 0 rather than
+180. ``grouped_wind_stats`` computes both per group, for example per
+station or per station and day, with one ``np.bincount`` pass per
+statistic instead of a Python loop over groups, and returns a structured
+array with one record per group.
+"""
+
+import numpy as np
+import pandas as pd
+
+try:
+    from .code_snippets import process_weather_data
+except ImportError:  # imported from inside module_2 rather than as a package
+    from code_snippets import process_weather_data
+
+STATION = "Station.Code"
+DATE = "Date.Full"
+# Statistics in each grouped_wind_stats record, after the key fields
+STATS_DTYPE = [
+    ("count", np.int32),
+    ("mean_speed", np.float32),
+    ("mean_u", np.float32),
+    ("mean_v", np.float32),
+    ("mean_direction", np.float32),
+    ("steadiness", np.float32),
+]
+_TAU = 2 * np.pi
+
+
+def wind_components(speed, direction_rad):
+    """
+    Split wind into its eastward and northward components.
+
+    Parameters
+    ----------
+    speed : numpy.ndarray
+        Wind speeds.
+    direction_rad : numpy.ndarray
+        Directions the wind blows from, in radians clockwise from north.
+
+    Returns
+    -------
+    tuple of numpy.ndarray
+        ``(u, v)``: the eastward and northward components. A wind from the
+        north (direction 0) has a negative v.
+    """
+    return -speed * np.sin(direction_rad), -speed * np.cos(direction_rad)
+
+
+def _direction(sin_sum, cos_sum, dtype=np.float64):
+    """
+    Return the angle of the vector sum in radians, in [0, 2*pi), as ``dtype``.
+
+    ``np.mod`` rounds a tiny negative angle up to 2*pi, and a cast to
+    float32 can round an angle just below it up too; such angles become 0.
+    """
+    angle = np.mod(np.arctan2(sin_sum, cos_sum), _TAU).astype(dtype)
+    return np.where(angle < _TAU, angle, angle.dtype.type(0))
+
+
+def circular_mean(direction_rad, weights=None):
+    """
+    Return the mean of angles on the circle.
+
+    Parameters
+    ----------
+    direction_rad : numpy.ndarray
+        Angles in radians.
+    weights : numpy.ndarray, optional
+        Weight of each angle, for example the wind speed. Default is None,
+        weighting every angle equally.
+
+    Returns
+    -------
+    float
+        The direction of the sum of unit vectors at the given angles, in
+        radians within [0, 2*pi). It is 0 for no angles or when the
+        vectors cancel out.
+    """
+    sin, cos = np.sin(direction_rad), np.cos(direction_rad)
+    if weights is not None:
+        sin, cos = sin * weights, cos * weights
+    return float(_direction(sin.sum(dtype=np.float64), cos.sum(dtype=np.float64)))
+
+
+def load_group_keys(filename="weather.csv", columns=(STATION, DATE)):
+    """
+    Read grouping columns of a weather CSV file as categoricals.
+
+    The rows line up with the arrays ``process_weather_data`` returns for
+    the same file. Each column is parsed straight into a categorical, so
+    every distinct value is stored once. ``Date.Full`` values are converted
+    to dates.
+
+    Parameters
+    ----------
+    filename : str or path-like, optional
+        Path to the CSV file. Default is 'weather.csv'.
+    columns : sequence of str, optional
+        Columns to read. Default is Station.Code and Date.Full.
+
+    Returns
+    -------
+    dict
+        Maps each column name to a ``pandas.Categorical``.
+    """
+    columns = list(columns)
+    frame = pd.read_csv(
+        filename, usecols=columns, dtype={column: "category" for column in columns}
+    )
+    keys = {}
+    for column in columns:
+        values = frame[column].array
+        if column == DATE:
+            values = values.rename_categories(pd.to_datetime(values.categories))
+        keys[column] = values
+    return keys
+
+
+def _factorize(values):
+    """
+    Return ``(codes, uniques)`` for ``values``, with the uniques sorted.
+
+    Categoricals with sorted categories, as ``load_group_keys`` returns,
+    already hold their codes, which saves hashing every value.
+    """
+    if isinstance(values, pd.Categorical) and values.categories.is_monotonic_increasing:
+        return values.codes, values.categories
+    return pd.factorize(values, sort=True)
+
+
+def _dense_codes(combined):
+    """
+    Renumber non-negative ``combined`` codes as 0, 1, ... in sorted order.
+
+    Returns the new code of each row and the original code of each new one.
+    Codes spanning no more than the number of rows go through a lookup
+    table, which is cheaper than hashing them.
+    """
+    span = int(combined.max()) + 1 if combined.size else 0
+    if span > combined.size:
+        return pd.factorize(combined, sort=True)
+    present = np.flatnonzero(np.bincount(combined, minlength=span))
+    lookup = np.empty(span, dtype=np.intp)
+    lookup[present] = np.arange(present.size)
+    return lookup[combined], present
+
+
+def _key_values(values):
+    """Return key ``values`` as an array with a fixed-size dtype, strings as str."""
+    values = np.asarray(values)
+    return values.astype(str) if values.dtype.kind == "O" else values
+
+
+def grouped_wind_stats(keys, speed, direction_rad):
+    """
+    Compute wind statistics per group of rows.
+
+    Parameters
+    ----------
+    keys : dict
+        Maps key names to array-likes (such as the categoricals
+        ``load_group_keys`` returns), each with one value per row. Rows
+        sharing all key values form a group.
+    speed : numpy.ndarray
+        Wind speed of each row.
+    direction_rad : numpy.ndarray
+        Wind direction of each row, in radians.
+
+    Returns
+    -------
+    numpy.ndarray
+        A structured array with one record per group, sorted by the keys.
+        Each record has a field per key, then ``count``, ``mean_speed``,
+        ``mean_u`` and ``mean_v`` (the mean wind vector), ``mean_direction``
+        (the circular mean of the directions, ignoring speed) and
+        ``steadiness`` (the length of the mean unit direction vector: 1 when
+        every direction is the same, near 0 when they scatter).
+
+    Raises
+    ------
+    ValueError
+        If a key and the wind arrays differ in length.
+    """
+    rows = len(speed)
+    if len(direction_rad) != rows or any(len(v) != rows for v in keys.values()):
+        raise ValueError("keys, speed and direction_rad must have the same length")
+
+    # One integer code per row for the combination of key values
+    combined = np.zeros(rows, dtype=np.int64)
+    key_uniques = []
+    for values in keys.values():
+        codes, uniques = _factorize(values)
+        if rows and codes.min() < 0:
+            raise ValueError("keys must not contain missing values")
+        combined = combined * len(uniques) + codes
+        key_uniques.append(uniques)
+    group, group_codes = _dense_codes(combined)
+    groups = len(group_codes)
+
+    # Recover each key's value per group from the combined code
+    key_fields = []
+    remainder = group_codes
+    for name, uniques in reversed(list(zip(keys, key_uniques))):
+        remainder, index = np.divmod(remainder, len(uniques))
+        key_fields.append((name, _key_values(uniques)[index]))
+    key_fields.reverse()
+
+    def total(weights=None):
+        return np.bincount(group, weights=weights, minlength=groups)
+
+    count = total()
+    u, v = wind_components(speed, direction_rad)
+    sin_sum, cos_sum = total(np.sin(direction_rad)), total(np.cos(direction_rad))
+
+    key_dtype = [(name, values.dtype) for name, values in key_fields]
+    result = np.empty(groups, dtype=key_dtype + STATS_DTYPE)
+    for name, values in key_fields:
+        result[name] = values
+    with np.errstate(invalid="ignore", divide="ignore"):
+        result["count"] = count
+        result["mean_speed"] = total(speed) / count
+        result["mean_u"] = total(u) / count
+        result["mean_v"] = total(v) / count
+        result["mean_direction"] = _direction(
+            sin_sum, cos_sum, result.dtype["mean_direction"]
+        )
+        result["steadiness"] = np.hypot(sin_sum, cos_sum) / count
+    return result
+
+
+def station_wind_stats(
+    filename="weather.csv", by=(STATION,), chunksize=None, cache=False
+):
+    """
+    Compute ``grouped_wind_stats`` for a weather CSV file.
+
+    Parameters
+    ----------
+    filename : str or path-like, optional
+        Path to the CSV file. Default is 'weather.csv'.
+    by : sequence of str, optional
+        Columns to group by, e.g. ``(STATION, DATE)`` for daily figures per
+        station. Default is Station.Code alone.
+    chunksize, cache
+        Passed to ``process_weather_data`` to read the wind columns.
+
+    Returns
+    -------
+    numpy.ndarray
+        The structured array ``grouped_wind_stats`` returns.
+    """
+    speed, _, direction_rad = process_weather_data(filename, chunksize, cache)
+    return grouped_wind_stats(load_group_keys(filename, by), speed, direction_rad)
@@ -0,0 +1,149 @@
+"""
+Benchmark wind_analytics against a Python loop and a pandas groupby.
+
+Usage:
+    python wind_analytics_benchmarks.py
+    python wind_analytics_benchmarks.py --rows 1000000 --stations 50
+
+Generates ``--rows`` synthetic observations spread over ``--stations``
+stations and ``--days`` days, as float32 speeds, radian directions and
+categorical keys like those ``load_group_keys`` returns. It then times, in
+seconds:
+
+- ``components``: ``wind_components`` on every row.
+- ``circular mean``: ``circular_mean`` of every direction.
+- ``by station`` and ``by station, day``: ``grouped_wind_stats``.
+- ``pandas``: the same statistics by station and day with
+  ``DataFrame.groupby``.
+- ``python loop``: a per-row loop accumulating the same statistics in
+  dicts, run on the first LOOP_ROWS rows and scaled up to ``--rows``.
+"""
+
+import argparse
+import math
+import time
+
+import numpy as np
+import pandas as pd
+
+from wind_analytics import (
+    DATE,
+    STATION,
+    circular_mean,
+    grouped_wind_stats,
+    wind_components,
+)
+
+ROWS = 10_000_000
+LOOP_ROWS = 200_000
+
+
+def synthetic_wind(rows, stations=300, days=365, seed=0):
+    """
+    Return random wind observations and their group keys.
+
+    Returns
+    -------
+    tuple
+        ``(keys, speed, direction_rad)``: a dict of categorical station
+        codes and dates, float32 speeds and float32 directions in radians.
+    """
+    rng = np.random.default_rng(seed)
+    codes = np.array([f"S{i:03d}" for i in range(stations)])
+    dates = pd.date_range("2016-01-01", periods=days)
+    keys = {
+        STATION: pd.Categorical.from_codes(rng.integers(stations, size=rows), codes),
+        DATE: pd.Categorical.from_codes(rng.integers(days, size=rows), dates),
+    }
+    speed = rng.gamma(2.0, 3.0, size=rows).astype(np.float32)
+    direction_rad = rng.uniform(0, 2 * np.pi, size=rows).astype(np.float32)
+    return keys, speed, direction_rad
+
+
+def python_loop_stats(stations, dates, speed, direction_rad):
+    """Accumulate per-(station, day) statistics one row at a time."""
+    sums = {}
+    for station, date, s, d in zip(stations, dates, speed, direction_rad):
+        total = sums.setdefault((station, date), [0, 0.0, 0.0, 0.0, 0.0, 0.0])
+        sin, cos = math.sin(d), math.cos(d)
+        total[0] += 1
+        total[1] += s
+        total[2] -= s * sin
+        total[3] -= s * cos
+        total[4] += sin
+        total[5] += cos
+    return {
+        key: (n, s / n, u / n, v / n, math.atan2(sin, cos) % math.tau)
+        for key, (n, s, u, v, sin, cos) in sorted(sums.items())
+    }
+
+
+def pandas_stats(keys, speed, direction_rad):
+    """Compute the per-(station, day) statistics with ``DataFrame.groupby``."""
+    u, v = wind_components(speed, direction_rad)
+    frame = pd.DataFrame(
+        {**keys, "speed": speed, "u": u, "v": v,
+         "sin": np.sin(direction_rad), "cos": np.cos(direction_rad)}
+    )  # fmt: skip
+    grouped = frame.groupby(list(keys), observed=True, sort=True)
+    result = grouped[["speed", "u", "v"]].mean()
+    sums = grouped[["sin", "cos"]].sum()
+    result["direction"] = np.mod(np.arctan2(sums["sin"], sums["cos"]), 2 * np.pi)
+    result["count"] = grouped.size()
+    return result
+
+
+def timed(func, *args):
+    """Return the seconds taken by ``func(*args)`` and its result."""
+    start = time.perf_counter()
+    result = func(*args)
+    return time.perf_counter() - start, result
+
+
+def run(rows=ROWS, stations=300, days=365):
+    """Print the time of each operation on ``rows`` synthetic observations."""
+    keys, speed, direction_rad = synthetic_wind(rows, stations, days)
+    by_station = {STATION: keys[STATION]}
+    loop_rows = min(rows, LOOP_ROWS)
+    loop_args = [
+        keys[STATION][:loop_rows].astype(str).tolist(),
+        keys[DATE][:loop_rows].astype("datetime64[ns]").tolist(),
+        speed[:loop_rows].tolist(),
+        direction_rad[:loop_rows].tolist(),
+    ]
+    cases = {
+        "components": (wind_components, speed, direction_rad),
+        "circular mean": (circular_mean, direction_rad),
+        "by station": (grouped_wind_stats, by_station, speed, direction_rad),
+        "by station, day": (grouped_wind_stats, keys, speed, direction_rad),
+        "pandas": (pandas_stats, keys, speed, direction_rad),
+        "python loop": (python_loop_stats, *loop_args),
+    }
+    print(f"{rows} rows, {stations} stations, {days} days")
+    print(f"{'operation':<18}{'seconds':>10}{'groups':>10}")
+    for name, (func, *args) in cases.items():
+        seconds, result = timed(func, *args)
+        groups = len(result) if name not in ("components", "circular mean") else "-"
+        note = ""
+        if name == "python loop" and loop_rows < rows:
+            seconds *= rows / loop_rows
+            groups, note = "-", f"  (estimated from {loop_rows} rows)"
+        print(f"{name:<18}{seconds:>10.2f}{groups:>10}{note}")
+
+    stats = grouped_wind_stats(keys, speed, direction_rad)
+    size = f"{stats.nbytes / 1e6:.1f} MB, {stats.dtype.itemsize} bytes per group"
+    print(f"result: {size}")
+
+
+def main(argv=None):
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--rows", type=int, default=ROWS)
+    parser.add_argument("--stations", type=int, default=300)
+    parser.add_argument("--days", type=int, default=365)
+    args = parser.parse_args(argv)
+    run(args.rows, args.stations, args.days)
+
+
+if __name__ == "__main__":
+    main()
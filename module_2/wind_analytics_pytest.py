@@ -0,0 +1,179 @@
+import pytest
+
+import numpy as np
+import pandas as pd
+
+from wind_analytics import (
+    DATE,
+    STATION,
+    circular_mean,
+    grouped_wind_stats,
+    load_group_keys,
+    station_wind_stats,
+    wind_components,
+)
+
+TAU = 2 * np.pi
+
+
+def circular_distance(a, b):
+    """Return the distance between angles ``a`` and ``b`` on the circle."""
+    difference = np.mod(np.asarray(a, np.float64) - b, TAU)
+    return np.minimum(difference, TAU - difference)
+
+
+def random_wind(rows, seed=0):
+    """Return ``(keys, speed, direction_rad)`` with station and date keys."""
+    rng = np.random.default_rng(seed)
+    stations = np.array(["BHM", "HSV", "MOB", "MGM", "ANC"])
+    dates = pd.date_range("2016-01-03", periods=4, freq="W")
+    keys = {
+        STATION: pd.Categorical(stations[rng.integers(len(stations), size=rows)]),
+        DATE: pd.Categorical(dates[rng.integers(len(dates), size=rows)]),
+    }
+    speed = rng.gamma(2.0, 3.0, size=rows).astype(np.float32)
+    direction_rad = np.deg2rad(rng.integers(0, 360, size=rows)).astype(np.float32)
+    return keys, speed, direction_rad
+
+
+def pandas_reference(keys, speed, direction_rad):
+    """Compute the grouped statistics with ``DataFrame.groupby``."""
+    u, v = wind_components(speed.astype(np.float64), direction_rad)
+    frame = pd.DataFrame(
+        {**keys, "speed": speed, "u": u, "v": v,
+         "sin": np.sin(direction_rad), "cos": np.cos(direction_rad)}
+    )  # fmt: skip
+    grouped = frame.groupby(list(keys), observed=True, sort=True)
+    result = grouped[["speed", "u", "v"]].mean()
+    sums = grouped[["sin", "cos"]].sum()
+    result["count"] = grouped.size()
+    result["direction"] = np.arctan2(sums["sin"], sums["cos"])
+    result["steadiness"] = np.hypot(sums["sin"], sums["cos"]) / result["count"]
+    return result
+
+
+@pytest.mark.parametrize(
+    "degrees, u, v",
+    [(0, 0, -2), (90, -2, 0), (180, 0, 2), (270, 2, 0), (45, -(2**0.5), -(2**0.5))],
+)
+def test_wind_components_signs(degrees, u, v):
+    """Test that wind from the north blows south: u east, v north, both negated."""
+    result = wind_components(np.array([2.0]), np.deg2rad([degrees]))
+    np.testing.assert_allclose(result, [[u], [v]], atol=1e-12)
+
+
+@pytest.mark.parametrize(
+    "degrees, expected",
+    [
+        ([350, 10], 0),
+        ([359, 1, 3], 1),
+        ([90, 180], 135),
+        ([270, 280, 260], 270),
+        ([355], 355),
+    ],
+)
+def test_circular_mean_wraps_around(degrees, expected):
+    """Test means across north, which must land in [0, 2*pi) and not at 180."""
+    for dtype in (np.float64, np.float32):
+        result = circular_mean(np.deg2rad(degrees).astype(dtype))
+        assert isinstance(result, float)
+        assert 0 <= result < TAU
+        assert circular_distance(result, np.deg2rad(expected)) < 1e-6
+
+    assert circular_mean(np.deg2rad([350, 10])) == 0
+
+
+def test_circular_mean_weights_and_empty_input():
+    """Test weighting by speed, and that no angles average to 0."""
+    directions = np.deg2rad([0, 90])
+    weighted = circular_mean(directions, weights=np.array([1.0, 3.0]))
+    assert weighted == pytest.approx(np.arctan2(3, 1))
+    assert circular_mean(np.zeros(0)) == 0
+
+
+@pytest.mark.parametrize("by", [(STATION,), (STATION, DATE), (DATE, STATION)])
+def test_grouped_wind_stats_matches_pandas(by):
+    """Test every statistic against a pandas groupby, for one and two keys."""
+    keys, speed, direction_rad = random_wind(5000)
+    keys = {name: keys[name] for name in by}
+    result = grouped_wind_stats(keys, speed, direction_rad)
+    reference = pandas_reference(keys, speed, direction_rad)
+
+    assert len(result) == len(reference)
+    for level, name in enumerate(by):
+        expected = reference.index.get_level_values(level)
+        if name == STATION:
+            assert result[name].tolist() == expected.tolist()
+        else:
+            np.testing.assert_array_equal(result[name], expected.to_numpy())
+    np.testing.assert_array_equal(result["count"], reference["count"])
+    for field, column in [("mean_speed", "speed"), ("mean_u", "u"), ("mean_v", "v")]:
+        np.testing.assert_allclose(
+            result[field], reference[column], rtol=1e-4, atol=1e-4
+        )
+    np.testing.assert_allclose(result["steadiness"], reference["steadiness"], atol=1e-5)
+    distance = circular_distance(result["mean_direction"], reference["direction"])
+    assert distance.max() < 1e-4
+    assert (result["mean_direction"].astype(np.float64) < TAU).all()
+
+
+def test_grouped_wind_stats_key_types():
+    """Test plain arrays of strings and ints as keys, and no rows."""
+    speed = np.array([1.0, 2.0, 3.0, 4.0], dtype=np.float32)
+    direction_rad = np.array([TAU - 5e-8, np.deg2rad(350), TAU - 5e-8, np.deg2rad(10)])
+    keys = {"code": np.array(["b", "a", "b", "a"], dtype=object), "n": [7, 7, 7, 7]}
+
+    result = grouped_wind_stats(keys, speed, direction_rad)
+    assert result["code"].tolist() == ["a", "b"]
+    assert result["n"].tolist() == [7, 7]
+    assert result["count"].tolist() == [2, 2]
+    np.testing.assert_allclose(result["mean_speed"], [3.0, 2.0])
+    # np.mod turns "a" into 2*pi; "b" is just below it until the float32 cast
+    assert result["mean_direction"].tolist() == [0, 0]
+
+    empty = grouped_wind_stats(
+        {"code": np.array([], dtype=object)}, speed[:0], speed[:0]
+    )
+    assert len(empty) == 0
+
+
+def test_grouped_wind_stats_errors():
+    """Test that mismatched lengths and missing key values are rejected."""
+    speed = np.ones(3, dtype=np.float32)
+    direction_rad = np.zeros(3, dtype=np.float32)
+
+    with pytest.raises(ValueError, match="same length"):
+        grouped_wind_stats({"k": [1, 2, 3]}, speed, direction_rad[:2])
+    with pytest.raises(ValueError, match="same length"):
+        grouped_wind_stats({"k": [1, 2]}, speed, direction_rad)
+    with pytest.raises(ValueError, match="missing values"):
+        grouped_wind_stats({"k": ["a", None, "b"]}, speed, direction_rad)
+    with pytest.raises(ValueError, match="missing values"):
+        grouped_wind_stats(
+            {"k": pd.Categorical(["a", np.nan, "a"])}, speed, direction_rad
+        )
+
+
+def test_station_wind_stats_reads_weather_csv(tmp_path):
+    """Test the CSV entry point against grouping the loaded columns directly."""
+    path = tmp_path / "weather.csv"
+    pd.DataFrame(
+        {
+            STATION: ["BHM", "HSV", "BHM", "HSV"],
+            DATE: ["2016-01-03", "2016-01-03", "2016-01-10", "2016-01-10"],
+            "Data.Wind.Direction": [350, 90, 10, 90],
+            "Data.Wind.Speed": [4.0, 2.0, 4.0, 6.0],
+        }
+    ).to_csv(path, index=False)
+
+    by_station = station_wind_stats(path)
+    assert by_station[STATION].tolist() == ["BHM", "HSV"]
+    np.testing.assert_allclose(by_station["mean_speed"], [4.0, 4.0])
+    assert circular_distance(by_station["mean_direction"], [0, np.pi / 2]).max() < 1e-6
+    assert (by_station["mean_direction"].astype(np.float64) < TAU).all()
+
+    daily = station_wind_stats(path, by=(STATION, DATE), chunksize=3)
+    assert daily[STATION].tolist() == ["BHM", "BHM", "HSV", "HSV"]
+    dates = load_group_keys(path)[DATE].categories.to_numpy()
+    np.testing.assert_array_equal(daily[DATE], dates[[0, 1, 0, 1]])
+    assert daily["count"].tolist() == [1, 1, 1, 1]